@@ -1,15 +1,47 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, get_flashed_messages
-from flask_sqlalchemy import SQLAlchemy
-from werkzeug.security import generate_password_hash, check_password_hash
-from datetime import datetime, timedelta
+from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, get_flashed_messages, Response, stream_with_context, stream_template, g
+from datetime import datetime
 import os
+import json
+import click
 from dotenv import load_dotenv
+from sqlalchemy.exc import IntegrityError
+from werkzeug.http import is_resource_modified
+from models import db, Usuario, Alumno, Docente, Materia, Matricula, Nota, convertir_ciclo_a_texto
+import migraciones
+import conexiones
+import estado_docentes
+import contadores
+import identidad
+import claves
+import boletin
+import metricas_sql
+import solo_lectura
+from filtros import FiltrosNotas
+from paginacion import PaginaKeyset, paginar_keyset
+from estadisticas import estadisticas_notas
+import exportaciones
+import importaciones
+import estaticos
+import compresion
+import plantillas
+import busqueda
+import flujos
+from calificaciones import (
+    ErrorLote, alumnos_activos_materia, cambiar_publicacion_en_lote,
+    leer_notas_formulario, registrar_notas_en_lote
+)
 
 # Cargar variables de entorno
 load_dotenv()
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'tu_clave_secreta_aqui_cambiar_en_produccion')
+
+# Método y costo del hash de contraseñas (formato de Werkzeug, ver claves.py)
+app.config['PASSWORD_HASH_METODO'] = os.environ.get('PASSWORD_HASH_METODO', claves.METODO_POR_DEFECTO)
+
+# Segundos mínimos entre dos registros de la última actividad de un docente al iniciar sesión
+app.config['ACTIVIDAD_DOCENTES_INTERVALO'] = int(os.environ.get('ACTIVIDAD_DOCENTES_INTERVALO', 3600))
 # Configuración de base de datos
 database_url = os.environ.get('DATABASE_URL', 'sqlite:///sistema_notas.db')
 
@@ -20,49 +52,77 @@ if database_url.startswith('postgres://'):
 app.config['SQLALCHEMY_DATABASE_URI'] = database_url
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
-db = SQLAlchemy(app)
+# Pool de conexiones por worker (solo PostgreSQL, ver conexiones.py)
+app.config['DB_POOL_SIZE'] = int(os.environ.get('DB_POOL_SIZE', 5))
+app.config['DB_MAX_OVERFLOW'] = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+app.config['DB_POOL_TIMEOUT'] = int(os.environ.get('DB_POOL_TIMEOUT', 30))
+app.config['DB_POOL_RECYCLE'] = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+app.config['DB_POOL_PRE_PING'] = os.environ.get('DB_POOL_PRE_PING', '1') == '1'
+app.config['DB_STATEMENT_TIMEOUT'] = int(os.environ.get('DB_STATEMENT_TIMEOUT', 30000))
+app.config['DB_POOL_AVISO_ESPERA'] = int(os.environ.get('DB_POOL_AVISO_ESPERA', 100))
+
+# Perfil de SQLite para varios workers: WAL, espera ante bloqueos y más caché (ver conexiones.py)
+app.config['SQLITE_RENDIMIENTO'] = os.environ.get('SQLITE_RENDIMIENTO', '0') == '1'
+app.config['SQLITE_BUSY_TIMEOUT'] = int(os.environ.get('SQLITE_BUSY_TIMEOUT', 5000))
+app.config['SQLITE_CACHE_MB'] = int(os.environ.get('SQLITE_CACHE_MB', 64))
+app.config['SQLITE_MMAP_MB'] = int(os.environ.get('SQLITE_MMAP_MB', 256))
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = conexiones.opciones_motor(app.config)
+
+# Cantidad de filas por página en los listados paginados
+app.config['NOTAS_POR_PAGINA'] = int(os.environ.get('NOTAS_POR_PAGINA', 50))
+
+# Minutos entre actualizaciones automáticas del estado de los docentes (0 = solo por CLI)
+app.config['ESTADO_DOCENTES_INTERVALO'] = int(os.environ.get('ESTADO_DOCENTES_INTERVALO', 0))
+
+# Caché del boletín de cada alumno: cantidad máxima por proceso y segundos de vigencia
+app.config['BOLETIN_CACHE_MAXIMO'] = int(os.environ.get('BOLETIN_CACHE_MAXIMO', 2000))
+app.config['BOLETIN_CACHE_TTL'] = int(os.environ.get('BOLETIN_CACHE_TTL', 300))
+
+# Consultas SQL por petición: cabecera Server-Timing y página /admin/rendimiento.
+# Solo en desarrollo salvo que se active explícitamente: la cabecera llega a cualquier visitante
+app.config['METRICAS_SQL'] = os.environ.get(
+    'METRICAS_SQL',
+    '1' if os.environ.get('FLASK_ENV') == 'development' or os.environ.get('FLASK_DEBUG') == '1' else '0'
+) == '1'
+app.config['METRICAS_SQL_REPETICIONES'] = int(os.environ.get('METRICAS_SQL_REPETICIONES', 5))
+app.config['METRICAS_SQL_HISTORIAL'] = int(os.environ.get('METRICAS_SQL_HISTORIAL', 200))
+
+# Compresión gzip/Brotli de las respuestas HTML y JSON
+app.config['COMPRESION'] = os.environ.get('COMPRESION', '1') == '1'
+app.config['COMPRESION_MINIMO'] = int(os.environ.get('COMPRESION_MINIMO', compresion.MINIMO))
+app.config['COMPRESION_NIVEL'] = int(os.environ.get('COMPRESION_NIVEL', compresion.NIVEL_GZIP))
+app.config['COMPRESION_NIVEL_BROTLI'] = int(os.environ.get('COMPRESION_NIVEL_BROTLI', compresion.NIVEL_BROTLI))
+
+# Plantillas sin recarga, con caché de bytecode y precompiladas al arrancar
+app.config['PLANTILLAS_PRODUCCION'] = os.environ.get(
+    'PLANTILLAS_PRODUCCION', '1' if os.environ.get('FLASK_ENV') == 'production' else '0'
+) == '1'
+app.config['PLANTILLAS_CACHE_DIR'] = os.environ.get('PLANTILLAS_CACHE_DIR')
+
+# Fallar si una petición GET intenta escribir en la base de datos (desarrollo y pruebas)
+app.config['GUARDIA_ESCRITURA_GET'] = os.environ.get('GUARDIA_ESCRITURA_GET', '0') == '1'
+
+db.init_app(app)
+conexiones.init_app(app)
+metricas_sql.init_app(app)
+identidad.init_app(app)
+migraciones.init_app(app)
+estado_docentes.init_app(app)
+contadores.init_app(app)
+busqueda.init_app(app)
+importaciones.init_app(app)
+estaticos.init_app(app)
+flujos.init_app(app)
+compresion.init_app(app)
+plantillas.init_app(app)
+boletin.init_app(app)
+solo_lectura.init_app(app)
 
 # Función auxiliar para limpiar mensajes flash
 def clear_flash_messages():
     """Limpia todos los mensajes flash de la sesión"""
     get_flashed_messages()
 
-# Función auxiliar para verificar estado del docente
-def verificar_estado_docente():
-    """Verifica si el docente actual está activo"""
-    if session.get('tipo') == 'docente':
-        usuario = Usuario.query.get(session.get('user_id'))
-        if usuario and usuario.docente:
-            if usuario.docente.estado == 'inactivo':
-                session.clear()
-                flash('Tu cuenta de docente está inactiva. Contacta al administrador para reactivarla.', 'error')
-                return False
-            elif usuario.docente.estado == 'suspendido':
-                session.clear()
-                flash('Tu cuenta de docente está suspendida. Contacta al administrador para más información.', 'error')
-                return False
-    return True
-
-# Función auxiliar para convertir números de ciclo a texto
-def convertir_ciclo_a_texto(ciclo):
-    """Convierte números de ciclo a texto y normaliza a minúsculas"""
-    if ciclo is None:
-        return None
-    
-    # Convertir números a texto y normalizar
-    ciclo_map = {
-        '1': 'primero', '2': 'segundo', '3': 'tercero',
-        '4': 'cuarto', '5': 'quinto', '6': 'sexto',
-        'I': 'primero', 'II': 'segundo', 'III': 'tercero',
-        'IV': 'cuarto', 'V': 'quinto', 'VI': 'sexto',
-        'Primero': 'primero', 'Segundo': 'segundo', 'Tercero': 'tercero',
-        'Cuarto': 'cuarto', 'Quinto': 'quinto', 'Sexto': 'sexto',
-        'primero': 'primero', 'segundo': 'segundo', 'tercero': 'tercero',
-        'cuarto': 'cuarto', 'quinto': 'quinto', 'sexto': 'sexto'
-    }
-    
-    return ciclo_map.get(str(ciclo), str(ciclo).lower())
-
 # Context processor para limpiar mensajes flash automáticamente
 @app.context_processor
 def inject_flash_cleanup():
@@ -72,85 +132,6 @@ def inject_flash_cleanup():
         'convertir_ciclo_a_texto': convertir_ciclo_a_texto
     }
 
-# Modelos de la base de datos
-class Usuario(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    username = db.Column(db.String(80), unique=True, nullable=False)
-    email = db.Column(db.String(120), unique=True, nullable=False)
-    password_hash = db.Column(db.String(120), nullable=False)
-    tipo = db.Column(db.String(20), nullable=False)  # 'admin', 'docente' o 'alumno'
-    fecha_creacion = db.Column(db.DateTime, default=datetime.utcnow)
-
-class Alumno(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    dni = db.Column(db.String(20), unique=True, nullable=False)
-    nombre = db.Column(db.String(100), nullable=False)
-    apellido = db.Column(db.String(100), nullable=False)
-    email = db.Column(db.String(120))
-    telefono = db.Column(db.String(20))
-    fecha_nacimiento = db.Column(db.Date)
-    ciclo = db.Column(db.String(20), nullable=False)  # primero, segundo, tercero, cuarto, quinto, sexto
-    fecha_registro = db.Column(db.DateTime, default=datetime.utcnow)
-    usuario_id = db.Column(db.Integer, db.ForeignKey('usuario.id'), nullable=True)  # Relación con Usuario
-    usuario = db.relationship('Usuario', backref=db.backref('alumno', uselist=False))
-
-class Docente(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    dni = db.Column(db.String(20), unique=True, nullable=False)
-    nombre = db.Column(db.String(100), nullable=False)
-    apellido = db.Column(db.String(100), nullable=False)
-    email = db.Column(db.String(120))
-    telefono = db.Column(db.String(20))
-    direccion = db.Column(db.String(200))
-    fecha_nacimiento = db.Column(db.Date)
-    especialidad = db.Column(db.String(100))
-    fecha_registro = db.Column(db.DateTime, default=datetime.utcnow)
-    usuario_id = db.Column(db.Integer, db.ForeignKey('usuario.id'), nullable=True)  # Relación con Usuario
-    usuario = db.relationship('Usuario', backref=db.backref('docente', uselist=False))
-    
-    # Campos para gestión de estado
-    estado = db.Column(db.String(20), default='activo')  # 'activo', 'inactivo', 'suspendido'
-    fecha_ultima_actividad = db.Column(db.DateTime, default=datetime.utcnow)
-    motivo_inactividad = db.Column(db.String(200))  # Razón de inactividad
-    fecha_cambio_estado = db.Column(db.DateTime, default=datetime.utcnow)
-
-class Materia(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    nombre = db.Column(db.String(100), nullable=False)
-    codigo = db.Column(db.String(20), unique=True, nullable=False)
-    docente_id = db.Column(db.Integer, db.ForeignKey('docente.id'), nullable=False)
-    docente = db.relationship('Docente', backref=db.backref('materias', lazy=True))
-    fecha_creacion = db.Column(db.DateTime, default=datetime.utcnow)
-
-class Matricula(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    alumno_id = db.Column(db.Integer, db.ForeignKey('alumno.id'), nullable=False)
-    materia_id = db.Column(db.Integer, db.ForeignKey('materia.id'), nullable=False)
-    fecha_matricula = db.Column(db.DateTime, default=datetime.utcnow)
-    estado = db.Column(db.String(20), default='activa')  # 'activa', 'completada', 'cancelada'
-    observaciones = db.Column(db.Text)
-    
-    # Relaciones
-    alumno = db.relationship('Alumno', backref=db.backref('matriculas', lazy=True))
-    materia = db.relationship('Materia', backref=db.backref('matriculas', lazy=True))
-    
-    # Índice único para evitar matrículas duplicadas
-    __table_args__ = (db.UniqueConstraint('alumno_id', 'materia_id', name='unique_matricula'),)
-
-class Nota(db.Model):
-    id = db.Column(db.Integer, primary_key=True)
-    alumno_id = db.Column(db.Integer, db.ForeignKey('alumno.id'), nullable=False)
-    materia_id = db.Column(db.Integer, db.ForeignKey('materia.id'), nullable=False)
-    nota = db.Column(db.Float, nullable=False)
-    tipo_evaluacion = db.Column(db.String(50), nullable=False)  # 'parcial', 'final', 'trabajo', etc.
-    fecha = db.Column(db.DateTime, default=datetime.utcnow)
-    observaciones = db.Column(db.Text)
-    publicada = db.Column(db.Boolean, default=False)  # Campo para controlar publicación
-    fecha_publicacion = db.Column(db.DateTime)  # Fecha cuando se publicó la nota
-    
-    alumno = db.relationship('Alumno', backref=db.backref('notas', lazy=True))
-    materia = db.relationship('Materia', backref=db.backref('notas', lazy=True))
-
 # Rutas principales
 @app.route('/')
 def index():
@@ -165,30 +146,27 @@ def login():
         username = request.form['username']
         password = request.form['password']
         
-        usuario = Usuario.query.filter_by(username=username).first()
+        # Usuario y docente en una sola consulta
+        usuario, docente, _ = identidad.buscar_por_username(username)
         
-        if usuario and check_password_hash(usuario.password_hash, password):
+        if usuario and claves.verificar_password(usuario, password):
             # Verificar si es un docente y si está activo
-            if usuario.tipo == 'docente':
-                docente = Docente.query.filter_by(usuario_id=usuario.id).first()
-                if docente and docente.estado == 'inactivo':
-                    flash('Tu cuenta de docente está inactiva. Contacta al administrador para reactivarla.', 'error')
-                    return render_template('login_moderno.html')
-                elif docente and docente.estado == 'suspendido':
-                    flash('Tu cuenta de docente está suspendida. Contacta al administrador para más información.', 'error')
-                    return render_template('login_moderno.html')
+            if usuario.tipo == 'docente' and docente and docente.estado in identidad.MENSAJES_ESTADO_DOCENTE:
+                flash(identidad.MENSAJES_ESTADO_DOCENTE[docente.estado], 'error')
+                return render_template('login_moderno.html')
             
             # Si todo está bien, crear la sesión
             session['user_id'] = usuario.id
             session['username'] = usuario.username
             session['tipo'] = usuario.tipo
             
-            # Actualizar última actividad si es docente
-            if usuario.tipo == 'docente':
-                docente = Docente.query.filter_by(usuario_id=usuario.id).first()
-                if docente:
-                    docente.fecha_ultima_actividad = datetime.utcnow()
-                    db.session.commit()
+            # Última actividad del docente, como mucho una vez por intervalo
+            if usuario.tipo == 'docente' and docente:
+                estado_docentes.registrar_actividad(docente, app.config['ACTIVIDAD_DOCENTES_INTERVALO'])
+            
+            # Un solo commit para el hash actualizado al método configurado y la actividad
+            if db.session.dirty:
+                db.session.commit()
             
             if usuario.tipo == 'admin':
                 return redirect(url_for('admin_dashboard'))
@@ -212,45 +190,27 @@ def admin_dashboard():
         return redirect(url_for('login'))
     
     try:
-        # Actualizar estados automáticamente antes de mostrar dashboard
-        actualizar_estado_docentes_automatico()
-        
-        # Obtener datos de forma segura
-        usuarios = Usuario.query.all() or []
-        alumnos = Alumno.query.all() or []
-        docentes = Docente.query.all() or []
-        materias = Materia.query.all() or []
-        
-        # Calcular estadísticas de docentes
-        docentes_activos = len([d for d in docentes if d.estado == 'activo'])
-        docentes_inactivos = len([d for d in docentes if d.estado == 'inactivo'])
-        
-        # Agregar contador de notas a cada materia para el dashboard
-        materias_con_notas = []
-        for materia in materias:
-            try:
-                notas_count = Nota.query.filter_by(materia_id=materia.id).count()
-                materias_con_notas.append((materia, notas_count))
-            except Exception as e:
-                print(f"Error al contar notas para materia {materia.id}: {e}")
-                materias_con_notas.append((materia, 0))
+        # Leer los contadores agregados en lugar de cargar todas las tablas
+        totales = contadores.obtener_contadores()
         
         return render_template('admin/dashboard_moderno.html', 
-                             usuarios=usuarios, 
-                             alumnos=alumnos, 
-                             docentes=docentes,
-                             docentes_activos=docentes_activos,
-                             docentes_inactivos=docentes_inactivos,
-                             materias=materias_con_notas)
+                             total_usuarios=totales['usuarios'], 
+                             total_alumnos=totales['alumnos'], 
+                             docentes_activos=totales['docentes:activo'],
+                             docentes_inactivos=totales['docentes:inactivo'],
+                             total_materias=totales['materias'],
+                             total_notas=totales['notas'])
     
     except Exception as e:
         print(f"Error en admin_dashboard: {e}")
         # En caso de error, renderizar con datos vacíos
         return render_template('admin/dashboard_moderno.html', 
-                             usuarios=[], 
-                             alumnos=[], 
-                             docentes=[],
-                             materias=[])
+                             total_usuarios=0, 
+                             total_alumnos=0, 
+                             docentes_activos=0,
+                             docentes_inactivos=0,
+                             total_materias=0,
+                             total_notas=0)
 
 @app.route('/admin/crear_usuario', methods=['GET', 'POST'])
 def crear_usuario():
@@ -274,7 +234,7 @@ def crear_usuario():
                 usuario = Usuario(
                     username=username,
                     email=email,
-                    password_hash=generate_password_hash(password),
+                    password_hash=claves.generar_hash(password),
                     tipo=tipo
                 )
                 db.session.add(usuario)
@@ -358,7 +318,7 @@ def crear_usuario_docente():
                 usuario = Usuario(
                     username=username,
                     email=email,
-                    password_hash=generate_password_hash(password),
+                    password_hash=claves.generar_hash(password),
                     tipo='docente'
                 )
                 db.session.add(usuario)
@@ -418,7 +378,7 @@ def crear_usuario_alumno():
                 usuario = Usuario(
                     username=username,
                     email=email,
-                    password_hash=generate_password_hash(password),
+                    password_hash=claves.generar_hash(password),
                     tipo='alumno'
                 )
                 db.session.add(usuario)
@@ -442,6 +402,69 @@ def crear_usuario_alumno():
     alumnos_sin_usuario = Alumno.query.filter_by(usuario_id=None).all()
     return render_template('admin/crear_usuario_alumno_moderno.html', alumnos=alumnos_sin_usuario)
 
+@app.route('/admin/importar', methods=['GET', 'POST'])
+def admin_importar():
+    """Importación masiva de alumnos, docentes o matrículas desde un CSV"""
+    if not session.get('user_id') or session.get('tipo') != 'admin':
+        return redirect(url_for('login'))
+    
+    tipo = request.values.get('tipo', 'alumnos')
+    if tipo not in importaciones.TIPOS:
+        tipo = 'alumnos'
+    resultado = None
+    
+    if request.method == 'POST':
+        archivo = request.files.get('archivo')
+        if not archivo or not archivo.filename:
+            flash('Selecciona un archivo CSV', 'error')
+        else:
+            try:
+                resultado = importaciones.importar_csv(tipo, archivo.stream)
+                if resultado['errores']:
+                    flash(f"{resultado['insertadas']} de {resultado['procesadas']} filas importadas; revisa los errores", 'error')
+                else:
+                    flash(f"{resultado['insertadas']} filas importadas exitosamente", 'success')
+            except UnicodeDecodeError:
+                db.session.rollback()
+                flash('El archivo debe estar codificado en UTF-8', 'error')
+            except Exception as e:
+                db.session.rollback()
+                flash('Error al importar el archivo. Inténtalo de nuevo.', 'error')
+                print(f"Error al importar {tipo}: {e}")
+    
+    return render_template('admin/importar_moderno.html',
+                         tipo=tipo,
+                         columnas=importaciones.COLUMNAS,
+                         resultado=resultado)
+
+@app.route('/admin/rendimiento')
+def admin_rendimiento():
+    """Últimas peticiones con sus consultas SQL y posibles N+1"""
+    if not session.get('user_id') or session.get('tipo') != 'admin':
+        return redirect(url_for('login'))
+    
+    peticiones = metricas_sql.historial.recientes()
+    if request.args.get('solo_n1'):
+        peticiones = [peticion for peticion in peticiones if peticion['repetidas']]
+    
+    return render_template('admin/rendimiento_moderno.html',
+                         peticiones=peticiones,
+                         activo=app.config['METRICAS_SQL'],
+                         compresion_activa=app.config['COMPRESION'],
+                         compresion=compresion.estadisticas.resumen(),
+                         umbral=app.config['METRICAS_SQL_REPETICIONES'],
+                         solo_n1=bool(request.args.get('solo_n1')))
+
+@app.route('/admin/rendimiento/limpiar', methods=['POST'])
+def admin_rendimiento_limpiar():
+    if not session.get('user_id') or session.get('tipo') != 'admin':
+        return redirect(url_for('login'))
+    
+    metricas_sql.historial.limpiar()
+    compresion.estadisticas.limpiar()
+    flash('Historial de peticiones vaciado', 'success')
+    return redirect(url_for('admin_rendimiento'))
+
 @app.route('/admin/registrar_docente', methods=['GET', 'POST'])
 def registrar_docente():
     if not session.get('user_id') or session.get('tipo') != 'admin':
@@ -577,13 +600,27 @@ def admin_ver_notas():
     if not session.get('user_id') or session.get('tipo') != 'admin':
         return redirect(url_for('login'))
     
+    filtros = FiltrosNotas.desde_request(request.args)
+    por_pagina = min(request.args.get('por_pagina', app.config['NOTAS_POR_PAGINA'], type=int) or app.config['NOTAS_POR_PAGINA'], 200)
+    
     try:
-        # Obtener todas las notas con información de alumno, materia y docente
-        notas_query = db.session.query(Nota, Alumno, Materia, Docente).join(Alumno, Nota.alumno_id == Alumno.id).join(Materia, Nota.materia_id == Materia.id).join(Docente, Materia.docente_id == Docente.id).order_by(Nota.fecha.desc()).all()
+        # Consulta base con información de alumno, materia y docente, filtrada en SQL
+        notas_query = filtros.aplicar(
+            db.session.query(Nota, Alumno, Materia, Docente).join(Alumno, Nota.alumno_id == Alumno.id).join(Materia, Nota.materia_id == Materia.id).join(Docente, Materia.docente_id == Docente.id)
+        )
+        
+        # Obtener solo una página, continuando desde el cursor (fecha, id)
+        pagina = paginar_keyset(
+            notas_query, Nota.fecha, Nota.id,
+            clave=lambda fila: (fila[0].fecha, fila[0].id),
+            por_pagina=por_pagina,
+            despues=request.args.get('despues'),
+            antes=request.args.get('antes')
+        )
         
         # Crear una lista con objetos nota que tengan las relaciones cargadas
         notas = []
-        for nota, alumno, materia, docente in notas_query:
+        for nota, alumno, materia, docente in pagina.items:
             # Asignar las relaciones al objeto nota
             nota.alumno = alumno
             nota.materia = materia
@@ -597,45 +634,35 @@ def admin_ver_notas():
             
             notas.append(nota)
         
-        # Calcular estadísticas
-        total_notas = len(notas)
-        notas_aprobadas = len([n for n in notas if n.nota >= 13])
-        notas_recuperacion = len([n for n in notas if 10 <= n.nota < 13])
-        notas_desaprobadas = len([n for n in notas if 5 <= n.nota < 10])
-        
-        # Calcular promedio general
-        if total_notas > 0:
-            promedio_general = round(sum([n.nota for n in notas]) / total_notas, 2)
-        else:
-            promedio_general = 0
+        # Calcular estadísticas sobre todas las notas filtradas en una sola consulta
+        estadisticas = estadisticas_notas(filtros)
         
-        # Contar materias y alumnos únicos con notas
-        materias_con_notas = len(set([n.materia.id for n in notas if n.materia]))
-        alumnos_con_notas = len(set([n.alumno.id for n in notas if n.alumno]))
-        
-        # Obtener materias y alumnos para los filtros
-        materias = Materia.query.all()
-        alumnos = Alumno.query.all()
+        # Obtener materias, alumnos y docentes para los filtros (solo las columnas necesarias)
+        materias = db.session.query(Materia.id, Materia.nombre).order_by(Materia.nombre).all()
+        alumnos = db.session.query(Alumno.id, Alumno.nombre, Alumno.apellido).order_by(Alumno.nombre, Alumno.apellido).all()
+        docentes = db.session.query(Docente.id, Docente.nombre, Docente.apellido).order_by(Docente.nombre, Docente.apellido).all()
         
         return render_template('admin/ver_notas_moderno.html', 
                              notas=notas, 
+                             pagina=pagina,
+                             filtros=filtros,
+                             por_pagina=por_pagina,
                              materias=materias, 
                              alumnos=alumnos,
-                             total_notas=total_notas,
-                             promedio_general=promedio_general,
-                             materias_con_notas=materias_con_notas,
-                             alumnos_con_notas=alumnos_con_notas,
-                             notas_aprobadas=notas_aprobadas,
-                             notas_recuperacion=notas_recuperacion,
-                             notas_desaprobadas=notas_desaprobadas)
+                             docentes=docentes,
+                             **estadisticas)
     
     except Exception as e:
         print(f"Error en admin_ver_notas: {e}")
         # En caso de error, devolver listas vacías
         return render_template('admin/ver_notas_moderno.html', 
                              notas=[], 
+                             pagina=PaginaKeyset([]),
+                             filtros=filtros,
+                             por_pagina=por_pagina,
                              materias=[], 
                              alumnos=[],
+                             docentes=[],
                              total_notas=0,
                              promedio_general=0,
                              materias_con_notas=0,
@@ -644,6 +671,23 @@ def admin_ver_notas():
                              notas_recuperacion=0,
                              notas_desaprobadas=0)
 
+def respuesta_csv(generador, prefijo):
+    """Envía el CSV a medida que se genera, sin armarlo en memoria"""
+    return Response(
+        stream_with_context(generador),
+        mimetype='text/csv',
+        headers={'Content-Disposition': f'attachment; filename={exportaciones.nombre_archivo(prefijo)}'}
+    )
+
+@app.route('/admin/exportar_notas')
+def admin_exportar_notas():
+    """Exportar en CSV las notas con los mismos filtros que /admin/ver_notas"""
+    if not session.get('user_id') or session.get('tipo') != 'admin':
+        return redirect(url_for('login'))
+    
+    filtros = FiltrosNotas.desde_request(request.args)
+    return respuesta_csv(exportaciones.exportar_notas(filtros), 'notas')
+
 @app.route('/admin/editar_materia/<int:materia_id>', methods=['GET', 'POST'])
 def admin_editar_materia(materia_id):
     if not session.get('user_id') or session.get('tipo') != 'admin':
@@ -745,48 +789,6 @@ def admin_ver_usuarios():
                          docente_count=docente_count,
                          alumno_count=alumno_count)
 
-# Funciones para gestión de estado de docentes
-def obtener_ultima_actividad_docente(docente):
-    """Obtiene la fecha de la última actividad del docente"""
-    # Buscar la última nota registrada por el docente
-    ultima_nota = db.session.query(Nota).join(Materia).filter(
-        Materia.docente_id == docente.id
-    ).order_by(Nota.fecha.desc()).first()
-    
-    if ultima_nota:
-        return ultima_nota.fecha
-    
-    # Si no hay notas, usar la fecha de registro
-    return docente.fecha_registro
-
-def actualizar_estado_docentes_automatico():
-    """Actualiza automáticamente el estado de los docentes basado en su actividad"""
-    docentes = Docente.query.all()
-    fecha_limite = datetime.utcnow() - timedelta(days=30)
-    
-    for docente in docentes:
-        # Si ya está marcado manualmente como inactivo, no cambiar automáticamente
-        if docente.estado == 'inactivo' and docente.motivo_inactividad and 'manual' in docente.motivo_inactividad.lower():
-            continue
-        
-        # Obtener última actividad
-        ultima_actividad = obtener_ultima_actividad_docente(docente)
-        docente.fecha_ultima_actividad = ultima_actividad
-        
-        # Verificar si está inactivo
-        if ultima_actividad < fecha_limite:
-            if docente.estado != 'inactivo':
-                docente.estado = 'inactivo'
-                docente.motivo_inactividad = 'Sin actividad por más de 30 días (automático)'
-                docente.fecha_cambio_estado = datetime.utcnow()
-        else:
-            if docente.estado == 'inactivo' and 'automático' in (docente.motivo_inactividad or ''):
-                docente.estado = 'activo'
-                docente.motivo_inactividad = None
-                docente.fecha_cambio_estado = datetime.utcnow()
-    
-    db.session.commit()
-
 @app.route('/admin/marcar_docente_inactivo/<int:docente_id>', methods=['POST'])
 def marcar_docente_inactivo(docente_id):
     """Marca un docente como inactivo manualmente"""
@@ -839,9 +841,6 @@ def admin_ver_docentes():
         return redirect(url_for('login'))
     
     try:
-        # Actualizar estados automáticamente antes de mostrar
-        actualizar_estado_docentes_automatico()
-        
         # Obtener todos los docentes
         docentes = Docente.query.order_by(Docente.fecha_registro.desc()).all()
         
@@ -1123,7 +1122,7 @@ def editar_usuario(usuario_id):
             # Solo cambiar contraseña si se proporciona una nueva
             nueva_password = request.form.get('password')
             if nueva_password and nueva_password.strip():
-                usuario.password_hash = generate_password_hash(nueva_password)
+                usuario.password_hash = claves.generar_hash(nueva_password)
             
             # Verificar si el username ya existe en otro usuario
             usuario_existente = Usuario.query.filter(Usuario.username == usuario.username, Usuario.id != usuario_id).first()
@@ -1234,17 +1233,12 @@ def docente_dashboard():
     if not session.get('user_id') or session.get('tipo') != 'docente':
         return redirect(url_for('login'))
     
-    # Verificar estado del docente
-    if not verificar_estado_docente():
-        return redirect(url_for('login'))
-    
-    # Obtener el docente asociado al usuario
-    usuario = Usuario.query.get(session['user_id'])
-    if not usuario or not usuario.docente:
+    # Docente asociado al usuario (cargado por identidad.py)
+    if not g.docente:
         flash('No se encontró información del docente', 'error')
         return redirect(url_for('login'))
     
-    docente_id = usuario.docente.id
+    docente_id = g.docente.id
     materias = Materia.query.filter_by(docente_id=docente_id).all()
     
     # Obtener solo alumnos matriculados en las materias del docente
@@ -1265,17 +1259,12 @@ def agregar_nota():
     if not session.get('user_id') or session.get('tipo') != 'docente':
         return redirect(url_for('login'))
     
-    # Verificar estado del docente
-    if not verificar_estado_docente():
-        return redirect(url_for('login'))
-    
-    # Obtener el docente asociado al usuario
-    usuario = Usuario.query.get(session['user_id'])
-    if not usuario or not usuario.docente:
+    # Docente asociado al usuario (cargado por identidad.py)
+    if not g.docente:
         flash('No se encontró información del docente', 'error')
         return redirect(url_for('login'))
     
-    docente_id = usuario.docente.id
+    docente_id = g.docente.id
     materias = Materia.query.filter_by(docente_id=docente_id).all()
     
     # Obtener solo alumnos matriculados en las materias del docente
@@ -1284,6 +1273,43 @@ def agregar_nota():
         Matricula.estado == 'activa'
     ).distinct().all()
     
+    # Modo grilla: notas de todos los alumnos activos de una materia
+    modo = request.values.get('modo', 'individual')
+    grilla = None
+    if modo == 'grilla':
+        grilla = {
+            'materia_id': request.values.get('materia_id', type=int),
+            'tipo_evaluacion': request.values.get('tipo_evaluacion', ''),
+            'observaciones': request.values.get('observaciones', ''),
+            'alumnos': [],
+            'valores': {},
+            'errores': {}
+        }
+        if grilla['materia_id'] and any(m.id == grilla['materia_id'] for m in materias):
+            grilla['alumnos'] = alumnos_activos_materia(grilla['materia_id'])
+    
+    if request.method == 'POST' and modo == 'grilla':
+        valores = leer_notas_formulario(request.form)
+        try:
+            registradas = registrar_notas_en_lote(
+                docente_id,
+                grilla['materia_id'],
+                grilla['tipo_evaluacion'],
+                valores,
+                observaciones=grilla['observaciones']
+            )
+            flash(f'{registradas} notas registradas exitosamente', 'success')
+            return redirect(url_for('docente_ver_notas_materia', materia_id=grilla['materia_id']))
+        except ErrorLote as e:
+            flash(str(e), 'error')
+            grilla['valores'] = valores
+            grilla['errores'] = e.errores
+        except Exception as e:
+            flash('Error al registrar las notas. Inténtalo de nuevo.', 'error')
+            print(f"Error al registrar notas en lote: {e}")
+            grilla['valores'] = valores
+        return render_template('docente/agregar_nota_moderno.html', materias=materias, alumnos=alumnos_matriculados, modo=modo, grilla=grilla)
+    
     if request.method == 'POST':
         alumno_id = request.form['alumno_id']
         materia_id = request.form['materia_id']
@@ -1319,24 +1345,19 @@ def agregar_nota():
         flash('Nota agregada exitosamente', 'success')
         return redirect(url_for('docente_dashboard'))
     
-    return render_template('docente/agregar_nota_moderno.html', materias=materias, alumnos=alumnos_matriculados)
+    return render_template('docente/agregar_nota_moderno.html', materias=materias, alumnos=alumnos_matriculados, modo=modo, grilla=grilla)
 
 @app.route('/docente/ver_notas')
 def docente_ver_notas():
     if not session.get('user_id') or session.get('tipo') != 'docente':
         return redirect(url_for('login'))
     
-    # Verificar estado del docente
-    if not verificar_estado_docente():
-        return redirect(url_for('login'))
-    
-    # Obtener el docente asociado al usuario
-    usuario = Usuario.query.get(session['user_id'])
-    if not usuario or not usuario.docente:
+    # Docente asociado al usuario (cargado por identidad.py)
+    if not g.docente:
         flash('No se encontró información del docente', 'error')
         return redirect(url_for('login'))
     
-    docente_id = usuario.docente.id
+    docente_id = g.docente.id
     alumno_id = request.args.get('alumno_id')
     
     # Construir la consulta base
@@ -1349,18 +1370,21 @@ def docente_ver_notas():
     # Obtener las notas ordenadas por fecha
     notas = query.order_by(Nota.fecha.desc()).all()
     
-    # Calcular estadísticas
-    total_notas = len(notas)
-    notas_aprobadas = len([nota for nota, alumno, materia in notas if nota.nota >= 13])
-    notas_recuperacion = len([nota for nota, alumno, materia in notas if 10 <= nota.nota < 13])
-    notas_desaprobadas = len([nota for nota, alumno, materia in notas if nota.nota < 10])
-    notas_publicadas = len([nota for nota, alumno, materia in notas if nota.publicada])
-    notas_no_publicadas = total_notas - notas_publicadas
+    # Calcular estadísticas en la base de datos con el mismo alcance que la lista
+    estadisticas = estadisticas_notas(FiltrosNotas(
+        docente_id=docente_id,
+        alumno_id=request.args.get('alumno_id', type=int)
+    ))
     
     # Obtener materias y alumnos para los filtros
     materias = Materia.query.filter_by(docente_id=docente_id).all()
     alumnos = Alumno.query.all()
     
+    # Tipos de evaluación usados por el docente para la publicación masiva
+    tipos_evaluacion = [tipo for (tipo,) in db.session.query(Nota.tipo_evaluacion).join(Materia).filter(
+        Materia.docente_id == docente_id
+    ).distinct().order_by(Nota.tipo_evaluacion)]
+    
     # Obtener información del alumno seleccionado si existe
     alumno_seleccionado = None
     if alumno_id:
@@ -1368,14 +1392,15 @@ def docente_ver_notas():
     
     return render_template('docente/ver_notas_moderno.html', 
                          notas=notas,
-                         total_notas=total_notas,
-                         notas_aprobadas=notas_aprobadas,
-                         notas_recuperacion=notas_recuperacion,
-                         notas_desaprobadas=notas_desaprobadas,
-                         notas_publicadas=notas_publicadas,
-                         notas_no_publicadas=notas_no_publicadas,
+                         total_notas=estadisticas['total_notas'],
+                         notas_aprobadas=estadisticas['notas_aprobadas'],
+                         notas_recuperacion=estadisticas['notas_recuperacion'],
+                         notas_desaprobadas=estadisticas['notas_desaprobadas'],
+                         notas_publicadas=estadisticas['notas_publicadas'],
+                         notas_no_publicadas=estadisticas['notas_no_publicadas'],
                          materias=materias,
                          alumnos=alumnos,
+                         tipos_evaluacion=tipos_evaluacion,
                          alumno_seleccionado=alumno_seleccionado,
                          alumno_id_filtro=alumno_id)
 
@@ -1384,17 +1409,12 @@ def editar_nota(nota_id):
     if not session.get('user_id') or session.get('tipo') != 'docente':
         return redirect(url_for('login'))
     
-    # Verificar estado del docente
-    if not verificar_estado_docente():
-        return redirect(url_for('login'))
-    
-    # Obtener el docente asociado al usuario
-    usuario = Usuario.query.get(session['user_id'])
-    if not usuario or not usuario.docente:
+    # Docente asociado al usuario (cargado por identidad.py)
+    if not g.docente:
         flash('No se encontró información del docente', 'error')
         return redirect(url_for('login'))
     
-    docente_id = usuario.docente.id
+    docente_id = g.docente.id
     
     # Obtener la nota y verificar que pertenece a una materia del docente
     nota = db.session.query(Nota, Materia, Alumno).join(Materia).join(Alumno).filter(Nota.id == nota_id, Materia.docente_id == docente_id).first()
@@ -1434,17 +1454,12 @@ def eliminar_nota(nota_id):
     if not session.get('user_id') or session.get('tipo') != 'docente':
         return redirect(url_for('login'))
     
-    # Verificar estado del docente
-    if not verificar_estado_docente():
-        return redirect(url_for('login'))
-    
-    # Obtener el docente asociado al usuario
-    usuario = Usuario.query.get(session['user_id'])
-    if not usuario or not usuario.docente:
+    # Docente asociado al usuario (cargado por identidad.py)
+    if not g.docente:
         flash('No se encontró información del docente', 'error')
         return redirect(url_for('login'))
     
-    docente_id = usuario.docente.id
+    docente_id = g.docente.id
     
     # Obtener la nota y verificar que pertenece a una materia del docente
     nota = db.session.query(Nota, Materia).join(Materia).filter(Nota.id == nota_id, Materia.docente_id == docente_id).first()
@@ -1472,17 +1487,12 @@ def publicar_nota(nota_id):
     if not session.get('user_id') or session.get('tipo') != 'docente':
         return redirect(url_for('login'))
     
-    # Verificar estado del docente
-    if not verificar_estado_docente():
-        return redirect(url_for('login'))
-    
-    # Obtener el docente asociado al usuario
-    usuario = Usuario.query.get(session['user_id'])
-    if not usuario or not usuario.docente:
+    # Docente asociado al usuario (cargado por identidad.py)
+    if not g.docente:
         flash('No se encontró información del docente', 'error')
         return redirect(url_for('login'))
     
-    docente_id = usuario.docente.id
+    docente_id = g.docente.id
     
     # Obtener la nota y verificar que pertenece a una materia del docente
     nota = db.session.query(Nota, Materia).join(Materia).filter(Nota.id == nota_id, Materia.docente_id == docente_id).first()
@@ -1511,17 +1521,12 @@ def despublicar_nota(nota_id):
     if not session.get('user_id') or session.get('tipo') != 'docente':
         return redirect(url_for('login'))
     
-    # Verificar estado del docente
-    if not verificar_estado_docente():
-        return redirect(url_for('login'))
-    
-    # Obtener el docente asociado al usuario
-    usuario = Usuario.query.get(session['user_id'])
-    if not usuario or not usuario.docente:
+    # Docente asociado al usuario (cargado por identidad.py)
+    if not g.docente:
         flash('No se encontró información del docente', 'error')
         return redirect(url_for('login'))
     
-    docente_id = usuario.docente.id
+    docente_id = g.docente.id
     
     # Obtener la nota y verificar que pertenece a una materia del docente
     nota = db.session.query(Nota, Materia).join(Materia).filter(Nota.id == nota_id, Materia.docente_id == docente_id).first()
@@ -1544,22 +1549,86 @@ def despublicar_nota(nota_id):
     
     return redirect(url_for('docente_ver_notas'))
 
-@app.route('/docente/ver_alumnos')
-def docente_ver_alumnos():
+def _cambiar_publicacion_notas(publicar):
+    """Publicación masiva por materia, tipo de evaluación o lista de notas"""
     if not session.get('user_id') or session.get('tipo') != 'docente':
+        if request.is_json:
+            return jsonify({'error': 'No autorizado'}), 401
         return redirect(url_for('login'))
     
-    # Verificar estado del docente
-    if not verificar_estado_docente():
+    if not g.docente:
+        if request.is_json:
+            return jsonify({'error': 'Docente no encontrado'}), 404
+        flash('No se encontró información del docente', 'error')
         return redirect(url_for('login'))
     
-    # Obtener el docente asociado al usuario
-    usuario = Usuario.query.get(session['user_id'])
-    if not usuario or not usuario.docente:
+    # Criterios desde JSON o desde el formulario de la lista de notas
+    if request.is_json:
+        datos = request.get_json(silent=True) or {}
+        materia_id = datos.get('materia_id')
+        tipo_evaluacion = datos.get('tipo_evaluacion')
+        nota_ids = datos.get('nota_ids') or []
+    else:
+        materia_id = request.form.get('materia_id')
+        tipo_evaluacion = request.form.get('tipo_evaluacion')
+        nota_ids = request.form.getlist('nota_ids')
+    
+    try:
+        materia_id = int(materia_id) if materia_id not in (None, '') else None
+        nota_ids = [int(nota_id) for nota_id in nota_ids]
+    except (TypeError, ValueError):
+        if request.is_json:
+            return jsonify({'error': 'Parámetros inválidos'}), 400
+        flash('Parámetros inválidos', 'error')
+        return redirect(url_for('docente_ver_notas'))
+    
+    try:
+        afectadas = cambiar_publicacion_en_lote(
+            g.docente.id,
+            publicar,
+            materia_id=materia_id,
+            tipo_evaluacion=tipo_evaluacion,
+            nota_ids=nota_ids
+        )
+    except ErrorLote as e:
+        if request.is_json:
+            return jsonify({'error': str(e)}), 400
+        flash(str(e), 'error')
+        return redirect(url_for('docente_ver_notas'))
+    except Exception as e:
+        print(f"Error al cambiar la publicación de notas: {e}")
+        if request.is_json:
+            return jsonify({'error': 'Error interno del servidor'}), 500
+        flash('Error al actualizar las notas. Inténtalo de nuevo.', 'error')
+        return redirect(url_for('docente_ver_notas'))
+    
+    if request.is_json:
+        return jsonify({'success': True, 'publicada': publicar, 'afectadas': afectadas})
+    accion = 'publicadas' if publicar else 'despublicadas'
+    flash(f'{afectadas} notas {accion} exitosamente', 'success')
+    return redirect(url_for('docente_ver_notas'))
+
+@app.route('/docente/publicar_notas', methods=['POST'])
+def publicar_notas():
+    """Publicar de una vez varias notas del docente"""
+    return _cambiar_publicacion_notas(True)
+
+@app.route('/docente/despublicar_notas', methods=['POST'])
+def despublicar_notas():
+    """Despublicar de una vez varias notas del docente"""
+    return _cambiar_publicacion_notas(False)
+
+@app.route('/docente/ver_alumnos')
+def docente_ver_alumnos():
+    if not session.get('user_id') or session.get('tipo') != 'docente':
+        return redirect(url_for('login'))
+    
+    # Docente asociado al usuario (cargado por identidad.py)
+    if not g.docente:
         flash('No se encontró información del docente', 'error')
         return redirect(url_for('login'))
     
-    docente_id = usuario.docente.id
+    docente_id = g.docente.id
     
     # Obtener solo alumnos matriculados en las materias del docente
     alumnos = db.session.query(Alumno).join(Matricula).join(Materia).filter(
@@ -1583,17 +1652,12 @@ def docente_ver_materias():
     if not session.get('user_id') or session.get('tipo') != 'docente':
         return redirect(url_for('login'))
     
-    # Verificar estado del docente
-    if not verificar_estado_docente():
-        return redirect(url_for('login'))
-    
-    # Obtener el docente asociado al usuario
-    usuario = Usuario.query.get(session['user_id'])
-    if not usuario or not usuario.docente:
+    # Docente asociado al usuario (cargado por identidad.py)
+    if not g.docente:
         flash('No se encontró información del docente', 'error')
         return redirect(url_for('login'))
     
-    docente_id = usuario.docente.id
+    docente_id = g.docente.id
     # Obtener todas las materias del docente
     materias = Materia.query.filter_by(docente_id=docente_id).order_by(Materia.id.desc()).all()
     
@@ -1622,17 +1686,12 @@ def docente_ver_notas_materia(materia_id):
     if not session.get('user_id') or session.get('tipo') != 'docente':
         return redirect(url_for('login'))
     
-    # Verificar estado del docente
-    if not verificar_estado_docente():
-        return redirect(url_for('login'))
-    
-    # Obtener el docente asociado al usuario
-    usuario = Usuario.query.get(session['user_id'])
-    if not usuario or not usuario.docente:
+    # Docente asociado al usuario (cargado por identidad.py)
+    if not g.docente:
         flash('No se encontró información del docente', 'error')
         return redirect(url_for('login'))
     
-    docente_id = usuario.docente.id
+    docente_id = g.docente.id
     
     # Verificar que la materia pertenece al docente
     materia = Materia.query.filter_by(id=materia_id, docente_id=docente_id).first()
@@ -1646,11 +1705,6 @@ def docente_ver_notas_materia(materia_id):
     # Crear una lista con información adicional incluyendo el estado
     notas = []
     for nota, alumno in notas_query:
-        # Actualizar notas que no tengan tipo_evaluacion
-        if not nota.tipo_evaluacion or nota.tipo_evaluacion.strip() == '':
-            nota.tipo_evaluacion = 'Parcial'  # Valor por defecto
-            db.session.commit()
-        
         # Calcular el estado de la nota
         if nota.nota >= 13:
             estado = "Aprobado"
@@ -1672,178 +1726,131 @@ def alumno_dashboard():
     if not session.get('user_id') or session.get('tipo') != 'alumno':
         return redirect(url_for('login'))
     
-    usuario_id = session['user_id']
-    
-    # Obtener el alumno asociado al usuario
-    alumno = Alumno.query.filter_by(usuario_id=usuario_id).first()
+    # Alumno asociado al usuario (cargado por identidad.py)
+    alumno = g.alumno
     
     if not alumno:
         flash('No se encontró información del alumno asociada a tu usuario', 'error')
         return redirect(url_for('logout'))
     
-    # Obtener solo las notas publicadas del alumno con información de materia y docente
-    notas_query = db.session.query(Nota, Materia, Docente).join(Materia, Nota.materia_id == Materia.id).join(Docente, Materia.docente_id == Docente.id).filter(Nota.alumno_id == alumno.id, Nota.publicada == True).order_by(Nota.fecha.desc()).all()
-    
-    # Crear una lista con información adicional incluyendo el estado
-    notas = []
-    for nota, materia, docente in notas_query:
-        # Asegurar que tipo_evaluacion no sea None
-        if not nota.tipo_evaluacion or nota.tipo_evaluacion.strip() == '':
-            nota.tipo_evaluacion = 'Parcial'
-            db.session.commit()
-        
-        # Calcular el estado de la nota
-        if nota.nota >= 13:
-            estado = "Aprobado"
-            clase_estado = "badge-success"  # Verde
-        elif nota.nota >= 10:
-            estado = "Recuperación"
-            clase_estado = "badge-warning"  # Amarillo
-        else:
-            estado = "Desaprobado"
-            clase_estado = "badge-danger"   # Rojo
-        
-        notas.append((nota, materia, docente, estado, clase_estado))
-    
-    # Calcular estadísticas
-    total_notas = len(notas)
-    notas_aprobadas = len([n for n in notas if n[3] == "Aprobado"])
-    notas_recuperacion = len([n for n in notas if n[3] == "Recuperación"])
-    notas_desaprobadas = len([n for n in notas if n[3] == "Desaprobado"])
-    
-    # Obtener materias únicas del alumno
-    materias_unicas = set()
-    for nota, materia, docente, estado, clase_estado in notas:
-        materias_unicas.add(materia.id)
-    
-    total_materias = len(materias_unicas)
-    
-    # Calcular promedio general basado en el promedio de cada materia
-    promedios_materias = []
-    materias_aprobadas = 0
-    
-    for materia_id in materias_unicas:
-        notas_materia = [n for n in notas if n[1].id == materia_id]
-        if notas_materia:
-            promedio_materia = sum([n[0].nota for n in notas_materia]) / len(notas_materia)
-            promedios_materias.append(promedio_materia)
-            if promedio_materia >= 13:
-                materias_aprobadas += 1
-    
-    # Calcular promedio general como promedio de los promedios de materias
-    if promedios_materias:
-        promedio_general = sum(promedios_materias) / len(promedios_materias)
-    else:
-        promedio_general = 0
-    
-    # Obtener notas recientes (últimas 5)
-    notas_recientes = notas[:5] if len(notas) > 5 else notas
+    # Notas, estadísticas y promedios desde el boletín en caché
+    boletin_alumno = boletin.obtener_boletin(alumno.id)
     
     return render_template('alumno/dashboard.html', 
                          alumno=alumno, 
-                         notas=notas,
-                         total_notas=total_notas,
-                         notas_aprobadas=notas_aprobadas,
-                         notas_recuperacion=notas_recuperacion,
-                         notas_desaprobadas=notas_desaprobadas,
-                         promedio_general=promedio_general,
-                         total_materias=total_materias,
-                         materias_aprobadas=materias_aprobadas,
-                         notas_recientes=notas_recientes)
+                         total_notas=boletin_alumno.estadisticas['total_notas'],
+                         notas_aprobadas=boletin_alumno.estadisticas['notas_aprobadas'],
+                         notas_recuperacion=boletin_alumno.estadisticas['notas_recuperacion'],
+                         notas_desaprobadas=boletin_alumno.estadisticas['notas_desaprobadas'],
+                         promedio_general=boletin_alumno.resumen['promedio_general'],
+                         total_materias=boletin_alumno.resumen['total_materias'],
+                         materias_aprobadas=boletin_alumno.resumen['materias_aprobadas'],
+                         notas_recientes=boletin_alumno.notas_recientes())
 
 @app.route('/alumno/ver_notas')
 def alumno_ver_notas():
     if not session.get('user_id') or session.get('tipo') != 'alumno':
         return redirect(url_for('login'))
     
-    usuario_id = session['user_id']
-    
-    # Obtener el alumno asociado al usuario
-    alumno = Alumno.query.filter_by(usuario_id=usuario_id).first()
+    # Alumno asociado al usuario (cargado por identidad.py)
+    alumno = g.alumno
     
     if not alumno:
         flash('No se encontró información del alumno asociada a tu usuario', 'error')
         return redirect(url_for('logout'))
     
-    # Obtener solo las notas publicadas del alumno con información de materia y docente
-    notas_query = db.session.query(Nota, Materia, Docente).join(Materia, Nota.materia_id == Materia.id).join(Docente, Materia.docente_id == Docente.id).filter(Nota.alumno_id == alumno.id, Nota.publicada == True).order_by(Nota.fecha.desc()).all()
+    boletin_alumno = boletin.obtener_boletin(alumno.id)
     
-    # Crear una lista con información adicional incluyendo el estado
-    notas = []
-    for nota, materia, docente in notas_query:
-        # Asegurar que tipo_evaluacion no sea None
-        if not nota.tipo_evaluacion or nota.tipo_evaluacion.strip() == '':
-            nota.tipo_evaluacion = 'Parcial'
-            db.session.commit()
-        
-        # Calcular el estado de la nota
-        if nota.nota >= 13:
-            estado = "Aprobado"
-            clase_estado = "badge-success"  # Verde
-        elif nota.nota >= 10:
-            estado = "Recuperación"
-            clase_estado = "badge-warning"  # Amarillo
-        else:
-            estado = "Desaprobado"
-            clase_estado = "badge-danger"   # Rojo
-        
-        notas.append((nota, materia, docente, estado, clase_estado))
+    # Resumen por materia: (materia, promedio, total de notas, docente)
+    resumen_materias = [(m.materia, m.promedio, m.total_notas, m.docente) for m in boletin_alumno.materias]
     
-    # Crear resumen por materia
-    resumen_materias = []
-    materias_unicas = {}
+    return render_template('alumno/ver_notas.html', alumno=alumno, notas=boletin_alumno.notas, resumen_materias=resumen_materias)
+
+@app.route('/api/v1/alumno/notas')
+def api_alumno_notas():
+    """Notas publicadas del alumno en JSON, con ETag.
+
+    Si no cambió ninguna nota desde la versión que tiene el cliente se
+    responde 304 tras una sola consulta, sin armar el boletín. No se envía
+    Last-Modified: la fecha de la última nota retrocede al borrar o
+    despublicar notas y If-Modified-Since daría 304 con datos viejos.
+    """
+    if not session.get('user_id') or session.get('tipo') != 'alumno':
+        return jsonify({'error': 'No autorizado'}), 401
+    
+    # Alumno asociado al usuario (cargado por identidad.py)
+    alumno = g.alumno
+    if not alumno:
+        return jsonify({'error': 'Alumno no encontrado'}), 404
+    
+    version = boletin.version_notas(alumno.id)
+    publicadas, ultimo_cambio = version
+    etag = f"{alumno.id}-{publicadas}-{ultimo_cambio.timestamp() if ultimo_cambio else 0}"
+    
+    respuesta = Response(mimetype='application/json')
+    respuesta.set_etag(etag)
+    respuesta.cache_control.private = True
+    respuesta.cache_control.no_cache = True
+    
+    # Solo If-None-Match decide el 304 (el ETag incluye cuántas notas hay publicadas)
+    if not is_resource_modified(request.environ, etag=etag):
+        respuesta.status_code = 304
+        return respuesta
+    
+    # Con la versión ya leída, la caché solo sirve un boletín de esa misma versión
+    boletin_alumno = boletin.obtener_boletin(alumno.id, version=version)
+    datos = boletin_alumno.como_dict()
+    datos['alumno'] = {
+        'id': alumno.id,
+        'dni': alumno.dni,
+        'nombre': alumno.nombre,
+        'apellido': alumno.apellido,
+        'ciclo': alumno.ciclo
+    }
+    respuesta.set_data(json.dumps(datos, ensure_ascii=False))
     
-    for nota, materia, docente, estado, clase_estado in notas:
-        if materia.id not in materias_unicas:
-            materias_unicas[materia.id] = {
-                'materia': materia,
-                'docente': docente,
-                'notas': [],
-                'total': 0
-            }
-        materias_unicas[materia.id]['notas'].append(nota.nota)
-        materias_unicas[materia.id]['total'] += 1
+    return respuesta
+
+@app.route('/search')
+def buscar():
+    """Alumnos, materias y docentes que coinciden con ?q=, de más a menos relevante.
+
+    Lo usan los buscadores de las listas (static/js/busqueda.js). Parámetros:
+    tipos (separados por comas) y limite. Un docente solo encuentra sus
+    materias y los alumnos matriculados en ellas.
+    """
+    if not session.get('user_id') or session.get('tipo') not in ('admin', 'docente'):
+        return jsonify({'error': 'No autorizado'}), 401
+    
+    docente_id = None
+    if session.get('tipo') == 'docente':
+        if not g.docente:
+            return jsonify({'error': 'Docente no encontrado'}), 404
+        docente_id = g.docente.id
     
-    # Calcular promedios
-    for materia_id, data in materias_unicas.items():
-        promedio = sum(data['notas']) / len(data['notas']) if data['notas'] else 0
-        resumen_materias.append((data['materia'], promedio, data['total'], data['docente']))
+    consulta = request.args.get('q', '').strip()
+    tipos = [tipo for tipo in request.args.get('tipos', ','.join(busqueda.TIPOS)).split(',') if tipo in busqueda.TIPOS]
+    limite = min(max(request.args.get('limite', busqueda.LIMITE, type=int), 1), busqueda.LIMITE_MAXIMO)
     
-    return render_template('alumno/ver_notas.html', alumno=alumno, notas=notas, resumen_materias=resumen_materias)
+    resultados = busqueda.buscar(db.session.connection(), consulta, tipos, limite, docente_id=docente_id)
+    return jsonify({'consulta': consulta, 'resultados': resultados})
 
 @app.route('/alumno/ver_materias')
 def alumno_ver_materias():
     if not session.get('user_id') or session.get('tipo') != 'alumno':
         return redirect(url_for('login'))
     
-    usuario_id = session['user_id']
-    
-    # Obtener el alumno asociado al usuario
-    alumno = Alumno.query.filter_by(usuario_id=usuario_id).first()
+    # Alumno asociado al usuario (cargado por identidad.py)
+    alumno = g.alumno
     
     if not alumno:
         flash('No se encontró información del alumno asociada a tu usuario', 'error')
         return redirect(url_for('logout'))
     
-    # Obtener todas las materias donde el alumno tiene notas publicadas
-    materias_query = db.session.query(Materia, Docente).join(Docente, Materia.docente_id == Docente.id).join(Nota, Nota.materia_id == Materia.id).filter(Nota.alumno_id == alumno.id, Nota.publicada == True).distinct().all()
+    boletin_alumno = boletin.obtener_boletin(alumno.id)
     
-    # Crear una lista con información adicional de notas por materia
-    materias = []
-    for materia, docente in materias_query:
-        # Obtener solo las notas publicadas del alumno en esta materia
-        notas_materia = Nota.query.filter_by(alumno_id=alumno.id, materia_id=materia.id, publicada=True).all()
-        
-        # Calcular estadísticas de la materia
-        total_notas = len(notas_materia)
-        if total_notas > 0:
-            promedio_materia = sum([n.nota for n in notas_materia]) / total_notas
-            ultima_nota = max(notas_materia, key=lambda x: x.fecha)
-        else:
-            promedio_materia = 0
-            ultima_nota = None
-        
-        materias.append((materia, docente, total_notas, promedio_materia, ultima_nota))
+    # Materias con notas publicadas: (materia, docente, total de notas, promedio, última nota)
+    materias = [(m.materia, m.docente, m.total_notas, m.promedio, m.ultima_nota) for m in boletin_alumno.materias]
     
     return render_template('alumno/ver_materias.html', alumno=alumno, materias=materias)
 
@@ -1852,10 +1859,8 @@ def alumno_mi_perfil():
     if not session.get('user_id') or session.get('tipo') != 'alumno':
         return redirect(url_for('login'))
     
-    usuario_id = session['user_id']
-    
-    # Obtener el alumno asociado al usuario
-    alumno = Alumno.query.filter_by(usuario_id=usuario_id).first()
+    # Alumno asociado al usuario (cargado por identidad.py)
+    alumno = g.alumno
     
     if not alumno:
         flash('No se encontró información del alumno asociada a tu usuario', 'error')
@@ -1868,12 +1873,12 @@ def alumno_mi_perfil():
             alumno.telefono = request.form.get('telefono')
             
             # Actualizar información del usuario
-            usuario = Usuario.query.get(usuario_id)
+            usuario = g.usuario
             if usuario:
                 usuario.email = request.form.get('email')
                 nueva_password = request.form.get('password')
                 if nueva_password and nueva_password.strip():
-                    usuario.password_hash = generate_password_hash(nueva_password)
+                    usuario.password_hash = claves.generar_hash(nueva_password)
             
                 db.session.commit()
             flash('Perfil actualizado exitosamente', 'success')
@@ -1890,8 +1895,7 @@ def admin_mi_perfil():
     if not session.get('user_id') or session.get('tipo') != 'admin':
         return redirect(url_for('login'))
     
-    usuario_id = session['user_id']
-    usuario = Usuario.query.get(usuario_id)
+    usuario = g.usuario
     
     if not usuario:
         flash('No se encontró información del usuario', 'error')
@@ -1910,7 +1914,7 @@ def admin_mi_perfil():
                 if nueva_password != confirm_password:
                     flash('Las contraseñas no coinciden', 'error')
                     return redirect(url_for('admin_mi_perfil'))
-                usuario.password_hash = generate_password_hash(nueva_password)
+                usuario.password_hash = claves.generar_hash(nueva_password)
             
             db.session.commit()
             flash('Perfil actualizado exitosamente', 'success')
@@ -1922,25 +1926,18 @@ def admin_mi_perfil():
     
     return render_template('admin/mi_perfil.html', usuario=usuario)
 
-@app.route('/admin/actualizar_tipos_evaluacion')
+@app.route('/admin/actualizar_tipos_evaluacion', methods=['POST'])
 def actualizar_tipos_evaluacion():
-    """Ruta para actualizar todas las notas que no tengan tipo de evaluación"""
+    """Ruta para actualizar todas las notas que no tengan tipo de evaluación.
+
+    La migración 7 ya lo hace una vez; esto sirve para datos cargados después con SQL directo.
+    """
     if not session.get('user_id') or session.get('tipo') != 'admin':
         return redirect(url_for('login'))
     
     try:
-        # Buscar todas las notas que no tengan tipo_evaluacion o esté vacío
-        notas_sin_tipo = Nota.query.filter(
-            (Nota.tipo_evaluacion == None) | 
-            (Nota.tipo_evaluacion == '') | 
-            (Nota.tipo_evaluacion == 'None')
-        ).all()
-        
-        contador = 0
-        for nota in notas_sin_tipo:
-            nota.tipo_evaluacion = 'Parcial'  # Valor por defecto
-            contador += 1
-        
+        # Un solo UPDATE sobre las notas sin tipo_evaluacion, vacío o 'None'
+        contador = migraciones.normalizar_tipos_evaluacion(db.session.connection())
         db.session.commit()
         
         if contador > 0:
@@ -1971,11 +1968,6 @@ def admin_ver_notas_alumno(alumno_id):
         # Crear una lista con información adicional
         notas = []
         for nota in notas_query:
-            # Asegurar que tipo_evaluacion no sea None
-            if not nota.tipo_evaluacion or nota.tipo_evaluacion.strip() == '':
-                nota.tipo_evaluacion = 'Parcial'
-                db.session.commit()
-            
             materia = Materia.query.get(nota.materia_id)
             docente = Usuario.query.get(materia.docente_id) if materia else None
             
@@ -2005,35 +1997,56 @@ def admin_ver_notas_alumno(alumno_id):
 # Rutas de Matrícula
 @app.route('/admin/matriculas')
 def admin_matriculas():
-    """Vista principal de gestión de matrículas"""
+    """Vista principal de gestión de matrículas.
+
+    La página se envía por partes (ver flujos.py): el encabezado y las
+    estadísticas, que salen de la tabla de contadores, llegan antes de
+    consultar las matrículas, y las filas se leen en lotes a medida que se
+    escriben, sin cargarlas todas en memoria.
+    """
     if not session.get('user_id') or session.get('tipo') != 'admin':
         return redirect(url_for('login'))
     
     try:
-        # Obtener todas las matrículas con información relacionada
-        matriculas = db.session.query(Matricula, Alumno, Materia, Docente).join(
+        # Estadísticas desde los contadores, sin recorrer las matrículas
+        conteos = contadores.obtener_contadores()
+        
+        # Matrículas con información relacionada; la consulta se ejecuta
+        # aquí y las filas se leen en lotes al llegar a la tabla
+        matriculas = flujos.filas_por_lotes(db.session.query(Matricula, Alumno, Materia, Docente).join(
             Alumno, Matricula.alumno_id == Alumno.id
         ).join(
             Materia, Matricula.materia_id == Materia.id
         ).join(
             Docente, Materia.docente_id == Docente.id
-        ).order_by(Matricula.fecha_matricula.desc()).all()
-        
-        # Obtener estadísticas
-        total_matriculas = len(matriculas)
-        matriculas_activas = len([m for m, _, _, _ in matriculas if m.estado == 'activa'])
-        matriculas_completadas = len([m for m, _, _, _ in matriculas if m.estado == 'completada'])
-        
-        return render_template('admin/matriculas_moderno.html',
-                             matriculas=matriculas,
-                             total_matriculas=total_matriculas,
-                             matriculas_activas=matriculas_activas,
-                             matriculas_completadas=matriculas_completadas)
-    
+        ).order_by(Matricula.fecha_matricula.desc(), Matricula.id.desc()).statement)
     except Exception as e:
         print(f"Error en admin_matriculas: {e}")
         flash('Error al cargar las matrículas', 'error')
         return redirect(url_for('admin_dashboard'))
+    
+    # Los mensajes se sacan de la sesión antes de enviar el primer byte,
+    # después la cookie de sesión ya no se puede actualizar
+    mensajes = get_flashed_messages(with_categories=True)
+    
+    return Response(flujos.agrupar(stream_template('admin/matriculas_moderno.html',
+                         matriculas=matriculas,
+                         mensajes=mensajes,
+                         total_matriculas=conteos['matriculas'],
+                         matriculas_activas=conteos['matriculas:activa'],
+                         matriculas_completadas=conteos['matriculas:completada'])))
+
+@app.route('/admin/exportar_matriculas')
+def admin_exportar_matriculas():
+    """Exportar en CSV las matrículas, opcionalmente por estado o materia"""
+    if not session.get('user_id') or session.get('tipo') != 'admin':
+        return redirect(url_for('login'))
+    
+    generador = exportaciones.exportar_matriculas(
+        estado=request.args.get('estado') or None,
+        materia_id=request.args.get('materia_id', type=int)
+    )
+    return respuesta_csv(generador, 'matriculas')
 
 @app.route('/admin/matricular_alumno', methods=['GET', 'POST'])
 def admin_matricular_alumno():
@@ -2152,17 +2165,12 @@ def obtener_materias_alumno(alumno_id):
     if not session.get('user_id') or session.get('tipo') != 'docente':
         return jsonify({'error': 'No autorizado'}), 401
     
-    # Verificar estado del docente
-    if not verificar_estado_docente():
-        return jsonify({'error': 'Docente inactivo'}), 401
-    
     try:
-        # Obtener el docente asociado al usuario
-        usuario = Usuario.query.get(session['user_id'])
-        if not usuario or not usuario.docente:
+        # Docente asociado al usuario (cargado por identidad.py)
+        if not g.docente:
             return jsonify({'error': 'Docente no encontrado'}), 404
         
-        docente_id = usuario.docente.id
+        docente_id = g.docente.id
         
         # Obtener las materias del docente en las que está matriculado el alumno
         materias = db.session.query(Materia).join(Matricula).filter(
@@ -2190,28 +2198,66 @@ def obtener_materias_alumno(alumno_id):
         return jsonify({'error': 'Error interno del servidor'}), 500
 
 # Inicializar base de datos y usuario admin
-def init_db():
-    """Inicializar base de datos y crear usuario admin si no existe"""
+# Importar este módulo no toca la base de datos: las tablas y el administrador
+# se crean con `flask init-db` / `flask seed-admin`, con init_db() desde
+# wsgi.py/run.py/dev.py o al ejecutar app.py directamente.
+def crear_tablas():
+    """Crear las tablas que falten y aplicar las migraciones pendientes"""
     with app.app_context():
         db.create_all()
         
-        # Crear usuario administrador por defecto si no existe
-        admin = Usuario.query.filter_by(username='admin').first()
-        if not admin:
-            admin = Usuario(
-                username='admin',
-                email='admin@sistema.com',
-                password_hash=generate_password_hash('admin123'),
-                tipo='admin'
-            )
-            db.session.add(admin)
+        # Los modelos usan columnas y tablas que en una base existente solo
+        # agregan las migraciones (contadores, Nota.fecha_actualizacion, índice
+        # de búsqueda)
+        for m in migraciones.aplicar_migraciones():
+            print(f"✅ Migración {m.version:04d} aplicada: {m.nombre}")
+
+def crear_admin(username='admin', password='admin123'):
+    """Crear el usuario administrador si no existe; devuelve True si lo creó"""
+    with app.app_context():
+        if Usuario.query.filter_by(username=username).first():
+            return False
+        
+        admin = Usuario(
+            username=username,
+            email=f'{username}@sistema.com',
+            password_hash=claves.generar_hash(password),
+            tipo='admin'
+        )
+        db.session.add(admin)
+        try:
             db.session.commit()
-            print("Usuario administrador creado: admin / admin123")
-    
-# Inicializar la base de datos al importar el módulo
-init_db()
+        except IntegrityError:
+            # Otro proceso lo creó al mismo tiempo
+            db.session.rollback()
+            return False
+        print(f"Usuario administrador creado: {username}")
+        return True
+
+def init_db():
+    """Inicializar base de datos y crear usuario admin si no existe"""
+    crear_tablas()
+    crear_admin()
+
+@app.cli.command('init-db')
+def comando_init_db():
+    """Crea las tablas que falten y aplica las migraciones pendientes"""
+    crear_tablas()
+    click.echo('✅ Base de datos inicializada')
+
+@app.cli.command('seed-admin')
+@click.option('--usuario', default='admin', help='Nombre de usuario del administrador')
+@click.option('--password', default='admin123', envvar='ADMIN_PASSWORD', help='Contraseña (o ADMIN_PASSWORD)')
+def comando_seed_admin(usuario, password):
+    """Crea el usuario administrador si no existe"""
+    if crear_admin(usuario, password):
+        click.echo(f'✅ Usuario administrador {usuario} creado')
+    else:
+        click.echo(f'✅ El usuario {usuario} ya existe')
 
 if __name__ == '__main__':
+    init_db()
+    
     # Configuración para desarrollo local
     port = int(os.environ.get('PORT', 5000))
     debug = os.environ.get('FLASK_ENV') == 'development' or os.environ.get('FLASK_DEBUG') == '1'
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Benchmark de las rutas del Sistema de Notas
+
+Recorre todas las rutas GET de la aplicación con el cliente de pruebas de
+Flask, con sesiones de administrador, docente y alumno, y guarda por ruta
+la latencia (p50, p90, p99), la cantidad de sentencias SQL, el pico de
+memoria y los bytes de la respuesta en un JSON para comparar entre versiones:
+
+    python generar_datos.py --db sqlite:////tmp/benchmark.db --alumnos 5000 --notas 200000
+    python benchmark.py --db sqlite:////tmp/benchmark.db --salida antes.json
+    ... cambios ...
+    python benchmark.py --db sqlite:////tmp/benchmark.db --salida despues.json --comparar antes.json
+
+Las peticiones envían `Accept-Encoding: --codificacion` (por defecto
+"br, gzip"); con --codificacion identity se mide sin compresión.
+
+Las rutas POST no se miden porque modifican los datos entre repeticiones.
+Si alguna respuesta medida no es 2xx/3xx, o una ruta con sesión redirige
+al login, el benchmark termina con error sin guardar resultados.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+PREFIJOS_ROL = {'/admin/': 'admin', '/docente/': 'docente', '/alumno/': 'alumno'}
+# Rutas fuera de esos prefijos que requieren sesión
+ROL_POR_ENDPOINT = {'buscar': 'admin', 'api_alumno_notas': 'alumno'}
+ENDPOINTS_EXCLUIDOS = {'static', 'logout'}
+
+
+def parsear_argumentos():
+    parser = argparse.ArgumentParser(description='Mide la latencia, las consultas SQL y la memoria de cada ruta')
+    parser.add_argument('--db', default=os.environ.get('DATABASE_URL', 'sqlite:////tmp/benchmark.db'),
+                        help='URL de la base de datos (por defecto DATABASE_URL o /tmp/benchmark.db)')
+    parser.add_argument('--repeticiones', type=int, default=20, help='Peticiones medidas por ruta')
+    parser.add_argument('--calentamiento', type=int, default=2, help='Peticiones previas sin medir')
+    parser.add_argument('--rutas', default='', help='Medir solo las rutas que contengan este texto')
+    parser.add_argument('--admin', default='admin:admin123', help='usuario:contraseña del administrador')
+    parser.add_argument('--clave', default='clave123', help='Contraseña de los docentes y alumnos generados')
+    parser.add_argument('--codificacion', default='br, gzip', help='Cabecera Accept-Encoding de las peticiones')
+    parser.add_argument('--salida', default='benchmark.json', help='Archivo JSON de resultados')
+    parser.add_argument('--comparar', help='JSON de una ejecución anterior para comparar')
+    return parser.parse_args()
+
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, max(0, round(p / 100 * len(ordenados) + 0.5) - 1))
+    return ordenados[indice]
+
+
+def elegir_datos(db, modelos):
+    """Docente con materias y notas, y alumno con notas publicadas en esas materias"""
+    from sqlalchemy import func
+    Usuario, Docente, Alumno, Materia, Nota = modelos
+
+    materia_id, docente_id = db.session.query(Materia.id, Materia.docente_id).join(
+        Nota, Nota.materia_id == Materia.id
+    ).join(Docente, Docente.id == Materia.docente_id).filter(
+        Docente.usuario_id.isnot(None), Docente.estado == 'activo'
+    ).group_by(Materia.id, Materia.docente_id).order_by(func.count(Nota.id).desc()).first()
+    docente = db.session.get(Docente, docente_id)
+
+    nota = db.session.query(Nota).join(Alumno, Alumno.id == Nota.alumno_id).filter(
+        Nota.materia_id == materia_id, Nota.publicada == True, Alumno.usuario_id.isnot(None)
+    ).first()
+    alumno = db.session.get(Alumno, nota.alumno_id)
+
+    return {
+        'usuarios': {
+            'docente': db.session.get(Usuario, docente.usuario_id).username,
+            'alumno': db.session.get(Usuario, alumno.usuario_id).username,
+        },
+        # Parámetros de consulta por endpoint, para las rutas que sin ellos no hacen nada
+        'consultas': {
+            'buscar': {'q': alumno.apellido},
+        },
+        'parametros': {
+            'alumno_id': alumno.id,
+            'docente_id': docente.id,
+            'materia_id': materia_id,
+            'nota_id': nota.id,
+            'usuario_id': docente.usuario_id,
+        },
+    }
+
+
+def rol_de_ruta(regla):
+    if regla.endpoint in ROL_POR_ENDPOINT:
+        return ROL_POR_ENDPOINT[regla.endpoint]
+    return next((rol for prefijo, rol in PREFIJOS_ROL.items() if regla.rule.startswith(prefijo)), None)
+
+
+def rutas_a_medir(app, parametros, consultas, filtro):
+    rutas = []
+    for regla in sorted(app.url_map.iter_rules(), key=lambda regla: regla.rule):
+        if 'GET' not in regla.methods or regla.endpoint in ENDPOINTS_EXCLUIDOS:
+            continue
+        if filtro and filtro not in regla.rule:
+            continue
+        faltantes = regla.arguments - set(parametros)
+        if faltantes:
+            print(f'⚠️  {regla.rule}: sin valor para {", ".join(sorted(faltantes))}')
+            continue
+        with app.test_request_context():
+            from flask import url_for
+            url = url_for(regla.endpoint, **{nombre: parametros[nombre] for nombre in regla.arguments},
+                          **consultas.get(regla.endpoint, {}))
+        rutas.append((rol_de_ruta(regla), url))
+    return rutas
+
+
+def medir(args):
+    # La URL debe estar definida antes de importar la aplicación
+    os.environ['DATABASE_URL'] = args.db
+    from sqlalchemy import event
+    from app import app
+    from models import db, Usuario, Docente, Alumno, Materia, Nota
+
+    with app.app_context():
+        datos = elegir_datos(db, (Usuario, Docente, Alumno, Materia, Nota))
+        motor = db.engine
+        escala = {modelo.__tablename__: db.session.query(modelo).count() for modelo in (Usuario, Docente, Alumno, Materia, Nota)}
+        db.session.remove()
+
+    consultas = {'total': 0}
+
+    def contar_consulta(*_):
+        consultas['total'] += 1
+
+    event.listen(motor, 'after_cursor_execute', contar_consulta)
+
+    usuario_admin, clave_admin = args.admin.split(':', 1)
+    credenciales = {
+        'admin': (usuario_admin, clave_admin),
+        'docente': (datos['usuarios']['docente'], args.clave),
+        'alumno': (datos['usuarios']['alumno'], args.clave),
+    }
+    clientes = {None: app.test_client()}
+    for rol, (usuario, clave) in credenciales.items():
+        cliente = app.test_client()
+        respuesta = cliente.post('/login', data={'username': usuario, 'password': clave})
+        if respuesta.status_code != 302 or 'login' in (respuesta.location or ''):
+            sys.exit(f'❌ No se pudo iniciar sesión como {rol} ({usuario})')
+        clientes[rol] = cliente
+
+    fallidas = {}
+
+    def pedir(rol, url):
+        respuesta = clientes[rol].get(url, headers={'Accept-Encoding': args.codificacion})
+        tamano = len(respuesta.get_data())  # consumir también las respuestas por flujo
+        respuesta.close()
+        # Un error o una sesión rechazada no mide la ruta: se mediría la página de error
+        if not 200 <= respuesta.status_code < 400 or (rol and 'login' in (respuesta.location or '')):
+            fallidas[url] = f'{respuesta.status_code} {respuesta.location or ""}'.strip()
+        return respuesta.status_code, tamano
+
+    resultados = {}
+    for rol, url in rutas_a_medir(app, datos['parametros'], datos['consultas'], args.rutas):
+        for _ in range(args.calentamiento):
+            pedir(rol, url)
+
+        latencias = []
+        consultas['total'] = 0
+        for _ in range(args.repeticiones):
+            inicio = time.perf_counter()
+            estado, tamano = pedir(rol, url)
+            latencias.append((time.perf_counter() - inicio) * 1000)
+        sentencias = consultas['total'] / args.repeticiones
+
+        tracemalloc.start()
+        pedir(rol, url)
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        resultados[url] = {
+            'rol': rol,
+            'estado': estado,
+            'p50_ms': round(percentil(latencias, 50), 2),
+            'p90_ms': round(percentil(latencias, 90), 2),
+            'p99_ms': round(percentil(latencias, 99), 2),
+            'media_ms': round(sum(latencias) / len(latencias), 2),
+            'consultas': round(sentencias, 1),
+            'memoria_pico_kb': round(pico / 1024, 1),
+            'bytes': tamano,
+        }
+        r = resultados[url]
+        print(f"{url:55} {estado}  p50 {r['p50_ms']:8.2f} ms  p99 {r['p99_ms']:8.2f} ms  "
+              f"{r['consultas']:6} consultas  {r['memoria_pico_kb']:9.1f} KB  {r['bytes']:>9} B")
+
+    if fallidas:
+        for url, estado in fallidas.items():
+            print(f'❌ {url}: {estado}')
+        sys.exit(f'❌ {len(fallidas)} rutas no respondieron 2xx/3xx; no se guardan los resultados')
+
+    return {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'base_datos': motor.dialect.name,
+        'escala': escala,
+        'repeticiones': args.repeticiones,
+        'codificacion': args.codificacion,
+        'rutas': resultados,
+    }
+
+
+def comparar(anterior, actual):
+    print()
+    print(f"{'Ruta':55} {'p50 antes':>10} {'p50 ahora':>10} {'cambio':>8} {'consultas':>16} {'bytes':>21}")
+    for url, ahora in actual['rutas'].items():
+        antes = anterior['rutas'].get(url)
+        if not antes:
+            continue
+        cambio = (ahora['p50_ms'] - antes['p50_ms']) / antes['p50_ms'] * 100 if antes['p50_ms'] else 0
+        print(f"{url:55} {antes['p50_ms']:10.2f} {ahora['p50_ms']:10.2f} {cambio:+7.1f}% "
+              f"{antes['consultas']:>7} -> {ahora['consultas']:<7} "
+              f"{antes.get('bytes', 0):>9} -> {ahora.get('bytes', 0):<9}")
+
+
+def main():
+    args = parsear_argumentos()
+    resultado = medir(args)
+    with open(args.salida, 'w', encoding='utf-8') as archivo:
+        json.dump(resultado, archivo, indent=2, ensure_ascii=False)
+    print(f'✅ Resultados guardados en {args.salida}')
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as archivo:
+            comparar(json.load(archivo), resultado)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Benchmark de SQLite con lectores y escritores concurrentes
+
+Compara la configuración por defecto con el perfil SQLITE_RENDIMIENTO
+(WAL, synchronous=NORMAL, busy_timeout, caché y mmap) usando varios
+procesos, como los workers de gunicorn: los lectores consultan el boletín
+de un alumno al azar y los escritores registran notas y publican las de
+una materia, cada operación en su propia transacción.
+
+    python generar_datos.py --db sqlite:////tmp/benchmark.db --alumnos 5000 --notas 200000
+    python benchmark_sqlite.py --db /tmp/benchmark.db --lectores 8 --escritores 2 --segundos 10
+
+Cada modo trabaja sobre una copia del archivo, porque el modo WAL queda
+guardado en la base de datos.
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+import conexiones
+
+CONFIG_PERFIL = {
+    'SQLITE_RENDIMIENTO': True,
+    'SQLITE_BUSY_TIMEOUT': 5000,
+    'SQLITE_CACHE_MB': 64,
+    'SQLITE_MMAP_MB': 256,
+}
+
+CONSULTA_BOLETIN = text("""
+    SELECT nota.id, nota.nota, nota.tipo_evaluacion, nota.fecha, materia.nombre, docente.apellido
+    FROM nota JOIN materia ON nota.materia_id = materia.id JOIN docente ON materia.docente_id = docente.id
+    WHERE nota.alumno_id = :alumno_id AND nota.publicada = 1
+    ORDER BY nota.fecha DESC
+""")
+INSERTAR_NOTA = text("""
+    INSERT INTO nota (alumno_id, materia_id, nota, tipo_evaluacion, fecha, observaciones, publicada)
+    SELECT alumno_id, materia_id, :nota, 'Parcial', CURRENT_TIMESTAMP, '', 0 FROM matricula WHERE id = :matricula_id
+""")
+PUBLICAR_MATERIA = text("""
+    UPDATE nota SET publicada = 1, fecha_publicacion = CURRENT_TIMESTAMP
+    WHERE materia_id = :materia_id AND publicada = 0
+""")
+
+
+def crear_motor(ruta, perfil):
+    url = f'sqlite:///{ruta}'
+    if not perfil:
+        return create_engine(url)
+    config = dict(CONFIG_PERFIL, SQLALCHEMY_DATABASE_URI=url)
+    motor = create_engine(url, **conexiones.opciones_motor(config))
+    conexiones.aplicar_perfil_sqlite(motor, config)
+    return motor
+
+
+def trabajador(ruta, perfil, tipo, segundos, semilla, cola):
+    motor = crear_motor(ruta, perfil)
+    aleatorio = random.Random(semilla)
+    with motor.connect() as conexion:
+        max_alumno = conexion.execute(text('SELECT max(id) FROM alumno')).scalar()
+        max_materia = conexion.execute(text('SELECT max(id) FROM materia')).scalar()
+        max_matricula = conexion.execute(text('SELECT max(id) FROM matricula')).scalar()
+
+    latencias = []
+    errores = 0
+    fin = time.perf_counter() + segundos
+    while time.perf_counter() < fin:
+        inicio = time.perf_counter()
+        try:
+            if tipo == 'lector':
+                with motor.connect() as conexion:
+                    conexion.execute(CONSULTA_BOLETIN, {'alumno_id': aleatorio.randint(1, max_alumno)}).all()
+            else:
+                with motor.begin() as conexion:
+                    if aleatorio.random() < 0.9:
+                        conexion.execute(INSERTAR_NOTA, {
+                            'nota': aleatorio.randint(0, 20), 'matricula_id': aleatorio.randint(1, max_matricula)
+                        })
+                    else:
+                        conexion.execute(PUBLICAR_MATERIA, {'materia_id': aleatorio.randint(1, max_materia)})
+            latencias.append((time.perf_counter() - inicio) * 1000)
+        except OperationalError:
+            errores += 1
+    motor.dispose()
+    cola.put((tipo, latencias, errores))
+
+
+def percentil(valores, p):
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(p / 100 * len(ordenados)))]
+
+
+def ejecutar_modo(origen, perfil, args):
+    directorio = tempfile.mkdtemp()
+    ruta = os.path.join(directorio, 'benchmark.db')
+    shutil.copy(origen, ruta)
+    if perfil:
+        # Pasar el archivo a WAL antes de arrancar los procesos
+        crear_motor(ruta, True).connect().close()
+
+    cola = multiprocessing.Queue()
+    procesos = [
+        multiprocessing.Process(target=trabajador, args=(ruta, perfil, tipo, args.segundos, i, cola))
+        for i, tipo in enumerate(['lector'] * args.lectores + ['escritor'] * args.escritores)
+    ]
+    for proceso in procesos:
+        proceso.start()
+    resultados = [cola.get() for _ in procesos]
+    for proceso in procesos:
+        proceso.join()
+    shutil.rmtree(directorio)
+
+    resumen = {}
+    for tipo in ('lector', 'escritor'):
+        latencias = [valor for t, lista, _ in resultados if t == tipo for valor in lista]
+        resumen[tipo] = {
+            'operaciones_por_segundo': len(latencias) / args.segundos,
+            'p50_ms': percentil(latencias, 50),
+            'p99_ms': percentil(latencias, 99),
+            'errores': sum(errores for t, _, errores in resultados if t == tipo),
+        }
+    return resumen
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compara SQLite por defecto con el perfil de rendimiento')
+    parser.add_argument('--db', default='/tmp/benchmark.db', help='Archivo SQLite generado con generar_datos.py')
+    parser.add_argument('--lectores', type=int, default=8)
+    parser.add_argument('--escritores', type=int, default=2)
+    parser.add_argument('--segundos', type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'Modo':12} {'Tipo':9} {'ops/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errores':>8}")
+    for nombre, perfil in (('defecto', False), ('rendimiento', True)):
+        for tipo, datos in ejecutar_modo(args.db, perfil, args).items():
+            print(f"{nombre:12} {tipo:9} {datos['operaciones_por_segundo']:9.1f} {datos['p50_ms']:9.2f} "
+                  f"{datos['p99_ms']:9.2f} {datos['errores']:8}")
+
+
+if __name__ == '__main__':
+    main()
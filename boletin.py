@@ -0,0 +1,270 @@
+"""
+Boletín de notas del alumno con caché en memoria
+
+El dashboard, la lista de notas y la vista de materias del alumno
+mostraban lo mismo calculado de cero en cada visita (notas publicadas,
+promedios por materia, estado de aprobación y promedio general), y la
+vista de materias hacía además una consulta por materia. Ahora las tres
+vistas se arman a partir de un Boletin construido con una sola consulta y
+guardado en una caché LRU con vencimiento:
+
+- BOLETIN_CACHE_MAXIMO: cantidad máxima de boletines por proceso
+- BOLETIN_CACHE_TTL: segundos que se conserva un boletín antes de descartarlo
+
+Cada boletín se guarda junto con la versión de las notas del alumno
+(version_notas: cuántas hay publicadas y la última fecha_actualizacion),
+y antes de servirlo se compara con la versión actual, una consulta por
+el índice de alumno_id sin uniones. Así un cambio hecho en otro worker se
+ve en la siguiente visita. Además, el boletín se descarta en cuanto se
+confirma (commit) en este proceso una transacción que toca alguna de sus
+notas, con el ORM o con UPDATE/DELETE masivos.
+"""
+
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from sqlalchemy import case, event, func, inspect, select
+
+from models import db, Docente, Materia, Nota
+
+# Copias inmutables de las filas: se comparten entre peticiones sin sesión
+NotaBoletin = namedtuple('NotaBoletin', 'id nota tipo_evaluacion fecha observaciones')
+MateriaBoletin = namedtuple('MateriaBoletin', 'id nombre codigo')
+DocenteBoletin = namedtuple('DocenteBoletin', 'id nombre apellido email')
+ResumenMateria = namedtuple('ResumenMateria', 'materia docente total_notas promedio ultima_nota')
+
+
+def estado_nota(valor):
+    """Estado y clase CSS de una nota según las bandas de aprobación"""
+    if valor >= 13:
+        return 'Aprobado', 'badge-success'      # Verde
+    if valor >= 10:
+        return 'Recuperación', 'badge-warning'  # Amarillo
+    return 'Desaprobado', 'badge-danger'        # Rojo
+
+
+class Boletin:
+    """Notas publicadas de un alumno y sus resúmenes, calculados una sola vez"""
+
+    def __init__(self, alumno_id, filas):
+        self.alumno_id = alumno_id
+        self.notas = []
+        por_materia = OrderedDict()
+
+        for fila in filas:
+            nota = NotaBoletin(fila.nota_id, fila.nota, fila.tipo_evaluacion or 'Parcial', fila.fecha, fila.observaciones)
+            materia = MateriaBoletin(fila.materia_id, fila.materia_nombre, fila.materia_codigo)
+            docente = DocenteBoletin(fila.docente_id, fila.docente_nombre, fila.docente_apellido, fila.docente_email)
+            self.notas.append((nota, materia, docente) + estado_nota(nota.nota))
+            # Las filas vienen de la más reciente a la más antigua: la primera es la última nota
+            por_materia.setdefault(materia.id, (materia, docente, nota, []))[3].append(nota.nota)
+
+        self.materias = [
+            ResumenMateria(materia, docente, len(valores), sum(valores) / len(valores), ultima)
+            for materia, docente, ultima, valores in por_materia.values()
+        ]
+
+        valores = [nota.nota for nota, *_ in self.notas]
+        self.estadisticas = {
+            'total_notas': len(valores),
+            'notas_aprobadas': len([valor for valor in valores if valor >= 13]),
+            'notas_recuperacion': len([valor for valor in valores if 10 <= valor < 13]),
+            'notas_desaprobadas': len([valor for valor in valores if valor < 10]),
+        }
+        promedios = [materia.promedio for materia in self.materias]
+        self.resumen = {
+            'total_materias': len(promedios),
+            'promedio_general': sum(promedios) / len(promedios) if promedios else 0,
+            'materias_aprobadas': len([promedio for promedio in promedios if promedio >= 13]),
+        }
+
+    def notas_recientes(self, cantidad=5):
+        return self.notas[:cantidad]
+
+    def como_dict(self):
+        """Representación para la API JSON"""
+        def fecha(valor):
+            return valor.isoformat() if valor else None
+
+        return {
+            'notas': [
+                {
+                    'id': nota.id,
+                    'nota': nota.nota,
+                    'tipo_evaluacion': nota.tipo_evaluacion,
+                    'fecha': fecha(nota.fecha),
+                    'observaciones': nota.observaciones,
+                    'estado': estado,
+                    'materia': materia._asdict(),
+                    'docente': {'nombre': docente.nombre, 'apellido': docente.apellido},
+                }
+                for nota, materia, docente, estado, _ in self.notas
+            ],
+            'materias': [
+                {
+                    'materia': resumen.materia._asdict(),
+                    'docente': {'nombre': resumen.docente.nombre, 'apellido': resumen.docente.apellido},
+                    'total_notas': resumen.total_notas,
+                    'promedio': round(resumen.promedio, 2),
+                    'ultima_nota': resumen.ultima_nota.nota,
+                }
+                for resumen in self.materias
+            ],
+            'estadisticas': self.estadisticas,
+            'resumen': dict(self.resumen, promedio_general=round(self.resumen['promedio_general'], 2)),
+        }
+
+
+def construir_boletin(alumno_id):
+    filas = db.session.execute(
+        select(
+            Nota.id.label('nota_id'), Nota.nota, Nota.tipo_evaluacion, Nota.fecha, Nota.observaciones,
+            Materia.id.label('materia_id'), Materia.nombre.label('materia_nombre'), Materia.codigo.label('materia_codigo'),
+            Docente.id.label('docente_id'), Docente.nombre.label('docente_nombre'),
+            Docente.apellido.label('docente_apellido'), Docente.email.label('docente_email')
+        ).join(Materia, Nota.materia_id == Materia.id).join(
+            Docente, Materia.docente_id == Docente.id
+        ).where(
+            Nota.alumno_id == alumno_id, Nota.publicada == True
+        ).order_by(Nota.fecha.desc(), Nota.id.desc())
+    ).all()
+    return Boletin(alumno_id, filas)
+
+
+class CacheLRU:
+    """Diccionario acotado en tamaño y en antigüedad, seguro entre hilos"""
+
+    def __init__(self, maximo=2000, ttl=300):
+        self.maximo = maximo
+        self.ttl = ttl
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obtener(self, clave):
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None:
+                return None
+            guardado, valor = entrada
+            if time.monotonic() - guardado > self.ttl:
+                del self._datos[clave]
+                return None
+            self._datos.move_to_end(clave)
+            return valor
+
+    def guardar(self, clave, valor):
+        if self.maximo <= 0:
+            return
+        with self._lock:
+            self._datos[clave] = (time.monotonic(), valor)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.maximo:
+                self._datos.popitem(last=False)
+
+    def invalidar(self, claves):
+        with self._lock:
+            for clave in claves:
+                self._datos.pop(clave, None)
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+
+    def __len__(self):
+        return len(self._datos)
+
+
+cache = CacheLRU()
+
+
+def version_notas(alumno_id):
+    """(notas publicadas, último cambio en alguna nota) del alumno: una consulta
+    por el índice de alumno_id, sin uniones; sirve también de ETag de la API"""
+    publicadas, ultimo_cambio = db.session.execute(
+        select(
+            func.count(case((Nota.publicada == True, 1))),
+            func.max(Nota.fecha_actualizacion)
+        ).where(Nota.alumno_id == alumno_id)
+    ).one()
+    return publicadas, ultimo_cambio
+
+
+def obtener_boletin(alumno_id, version=None):
+    """Boletín del alumno desde la caché si sigue en la versión actual, o recién calculado"""
+    if version is None:
+        version = version_notas(alumno_id)
+    entrada = cache.obtener(alumno_id)
+    if entrada is not None and entrada[0] == version:
+        return entrada[1]
+    # La versión se lee antes de armar el boletín: si cambia en medio, la próxima visita lo rearma
+    boletin = construir_boletin(alumno_id)
+    cache.guardar(alumno_id, (version, boletin))
+    return boletin
+
+
+# Invalidación: se anotan los alumnos afectados y se borran al confirmar
+def _pendientes(session):
+    return session.info.setdefault('boletines_invalidar', set())
+
+
+def _despues_de_flush(session, contexto_flush):
+    alumnos = set()
+    for obj in session.new:
+        if isinstance(obj, Nota) and obj.publicada:
+            alumnos.add(obj.alumno_id)
+    for obj in session.deleted:
+        if isinstance(obj, Nota):
+            alumnos.add(obj.alumno_id)
+    for obj in session.dirty:
+        if isinstance(obj, Nota) and session.is_modified(obj):
+            alumnos.add(obj.alumno_id)
+            # Si la nota cambió de alumno, también el anterior
+            anterior = inspect(obj).attrs.alumno_id.history.deleted
+            alumnos.update(anterior)
+    _pendientes(session).update(alumnos)
+
+
+def _al_ejecutar_orm(estado_orm):
+    if not (estado_orm.is_update or estado_orm.is_delete or estado_orm.is_insert):
+        return None
+    mapper = estado_orm.bind_mapper
+    if mapper is None or mapper.class_ is not Nota:
+        return None
+
+    session = estado_orm.session
+    parametros = estado_orm.parameters
+    if estado_orm.is_insert:
+        filas = parametros if isinstance(parametros, (list, tuple)) else [parametros or {}]
+        alumnos = {fila.get('alumno_id') for fila in filas if fila.get('publicada')}
+    elif isinstance(parametros, (list, tuple)):
+        # UPDATE por clave primaria con una lista de diccionarios
+        ids = [fila['id'] for fila in parametros if 'id' in fila]
+        alumnos = set(session.execute(select(Nota.alumno_id).where(Nota.id.in_(ids))).scalars())
+    else:
+        # Alumnos de las filas que el UPDATE/DELETE va a modificar
+        query = select(Nota.alumno_id).distinct()
+        if estado_orm.statement.whereclause is not None:
+            query = query.where(estado_orm.statement.whereclause)
+        alumnos = set(session.execute(query).scalars())
+    _pendientes(session).update(alumnos)
+    return None
+
+
+def _despues_de_commit(session):
+    alumnos = session.info.pop('boletines_invalidar', None)
+    if alumnos:
+        cache.invalidar(alumnos)
+
+
+def _despues_de_rollback(session):
+    session.info.pop('boletines_invalidar', None)
+
+
+def init_app(app):
+    cache.maximo = app.config.get('BOLETIN_CACHE_MAXIMO', cache.maximo)
+    cache.ttl = app.config.get('BOLETIN_CACHE_TTL', cache.ttl)
+    event.listen(db.session, 'after_flush', _despues_de_flush)
+    event.listen(db.session, 'do_orm_execute', _al_ejecutar_orm)
+    event.listen(db.session, 'after_commit', _despues_de_commit)
+    event.listen(db.session, 'after_rollback', _despues_de_rollback)
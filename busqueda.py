@@ -0,0 +1,393 @@
+"""
+Búsqueda de texto completo de alumnos, materias y docentes
+
+Los buscadores de las listas filtraban las filas ya dibujadas en la página,
+lo que obligaba a enviar la tabla completa y no encontraba nada fuera de la
+página actual. Ahora hay un índice de búsqueda en la base de datos:
+
+- SQLite: tabla virtual FTS5 `busqueda` (sin FTS5, una tabla normal con LIKE)
+- PostgreSQL: tabla `busqueda` con una columna tsvector (índice GIN) y un
+  índice de trigramas (pg_trgm) que tolera errores de tipeo y prefijos de DNI
+
+Cada documento es un alumno (nombre, apellido, DNI), una materia (nombre,
+código y nombre del docente) o un docente (nombre, apellido, DNI). El texto
+se guarda sin tildes y en minúsculas. El índice se mantiene al día con los
+eventos de la sesión de SQLAlchemy (after_flush y do_orm_execute, como los
+contadores); las escrituras con SQL directo no se registran:
+
+    flask busqueda reconstruir     # vuelve a llenar el índice
+    flask busqueda buscar garcia   # prueba una búsqueda
+
+GET /search?q=...&tipos=alumno,materia&limite=10 devuelve los resultados
+ordenados por relevancia (ver buscar()).
+"""
+
+import re
+import unicodedata
+
+import click
+from sqlalchemy import (
+    and_, column, delete, event, func, insert, inspect, literal, literal_column, or_, select, table, text
+)
+from sqlalchemy.exc import OperationalError
+
+from models import db, Alumno, Docente, Materia, Matricula
+
+TABLA = 'busqueda'
+TIPOS = ('alumno', 'materia', 'docente')
+LIMITE = 10
+LIMITE_MAXIMO = 50
+MAXIMO_TERMINOS = 8
+
+# Cada documento tiene una clave entera única: id del objeto * 4 + código del tipo
+_CODIGOS = {'alumno': 1, 'materia': 2, 'docente': 3}
+
+# Columnas que, si cambian, obligan a reindexar el objeto
+COLUMNAS_INDEXADAS = {
+    Alumno: ('nombre', 'apellido', 'dni', 'ciclo'),
+    Materia: ('nombre', 'codigo', 'docente_id'),
+    Docente: ('nombre', 'apellido', 'dni', 'especialidad'),
+}
+_TIPO_MODELO = {Alumno: 'alumno', Materia: 'materia', Docente: 'docente'}
+_COLUMNA_UNICA = {Alumno: 'dni', Materia: 'codigo', Docente: 'dni'}
+
+# Modo del índice por motor: 'fts5', 'postgresql' o 'like'
+_modos = {}
+
+
+def normalizar(texto):
+    """Minúsculas y sin tildes: 'Martínez' -> 'martinez'"""
+    descompuesto = unicodedata.normalize('NFKD', texto or '')
+    return ''.join(c for c in descompuesto if not unicodedata.combining(c)).lower()
+
+
+def terminos(consulta):
+    return re.findall(r'\w+', normalizar(consulta))[:MAXIMO_TERMINOS]
+
+
+def clave_documento(tipo, objeto_id):
+    return objeto_id * 4 + _CODIGOS[tipo]
+
+
+# Estructura del índice
+def _modo(conexion):
+    """Modo del índice de esta base de datos, o None si todavía no existe"""
+    modo = _modos.get(conexion.engine)
+    if modo:
+        return modo
+    if conexion.dialect.name == 'sqlite':
+        sql = conexion.execute(
+            text('SELECT sql FROM sqlite_master WHERE name = :nombre'), {'nombre': TABLA}
+        ).scalar()
+        modo = None if sql is None else ('fts5' if 'fts5' in sql.lower() else 'like')
+    elif inspect(conexion).has_table(TABLA):
+        modo = 'postgresql' if conexion.dialect.name == 'postgresql' else 'like'
+    # Solo se recuerda cuando existe: así se detecta sin reiniciar cuando una migración lo crea
+    if modo:
+        _modos[conexion.engine] = modo
+    return modo
+
+
+def _tabla(conexion):
+    clave = 'rowid' if _modo(conexion) == 'fts5' else 'id'
+    columnas = ('tipo', 'objeto_id', 'titulo', 'detalle', 'texto', 'vector')
+    return table(TABLA, column(clave), *(column(nombre) for nombre in columnas)), clave
+
+
+def crear_indice_busqueda(conexion):
+    """Crea la tabla del índice si no existe (con FTS5 en SQLite, tsvector y trigramas en PostgreSQL)"""
+    _modos.pop(conexion.engine, None)
+    if conexion.dialect.name == 'sqlite':
+        try:
+            conexion.execute(text(
+                f'CREATE VIRTUAL TABLE IF NOT EXISTS {TABLA} USING fts5('
+                'tipo UNINDEXED, objeto_id UNINDEXED, titulo UNINDEXED, detalle UNINDEXED, texto, '
+                "tokenize = 'unicode61 remove_diacritics 2')"
+            ))
+            return
+        except OperationalError as e:
+            # SQLite compilado sin FTS5: se busca con LIKE
+            print(f"⚠️  FTS5 no disponible ({e}); la búsqueda usará LIKE")
+
+    if conexion.dialect.name == 'postgresql':
+        conexion.execute(text('CREATE EXTENSION IF NOT EXISTS pg_trgm'))
+        conexion.execute(text(
+            f'CREATE TABLE IF NOT EXISTS {TABLA} ('
+            'id BIGINT PRIMARY KEY, tipo VARCHAR(20) NOT NULL, objeto_id INTEGER NOT NULL, '
+            'titulo VARCHAR(250) NOT NULL, detalle VARCHAR(250), texto TEXT NOT NULL, '
+            "vector TSVECTOR GENERATED ALWAYS AS (to_tsvector('simple', texto)) STORED)"
+        ))
+        conexion.execute(text(f'CREATE INDEX IF NOT EXISTS ix_busqueda_vector ON {TABLA} USING GIN (vector)'))
+        conexion.execute(text(
+            f'CREATE INDEX IF NOT EXISTS ix_busqueda_texto_trgm ON {TABLA} USING GIN (texto gin_trgm_ops)'
+        ))
+        return
+
+    conexion.execute(text(
+        f'CREATE TABLE IF NOT EXISTS {TABLA} ('
+        'id BIGINT PRIMARY KEY, tipo VARCHAR(20) NOT NULL, objeto_id INTEGER NOT NULL, '
+        'titulo VARCHAR(250) NOT NULL, detalle VARCHAR(250), texto TEXT NOT NULL)'
+    ))
+
+
+# Documentos
+def _consulta_documentos(tipo, ids=None):
+    """SELECT de las filas con las que se arman los documentos de un tipo"""
+    if tipo == 'alumno':
+        query = select(Alumno.id, Alumno.nombre, Alumno.apellido, Alumno.dni, Alumno.ciclo)
+        columna_id = Alumno.id
+    elif tipo == 'docente':
+        query = select(Docente.id, Docente.nombre, Docente.apellido, Docente.dni, Docente.especialidad)
+        columna_id = Docente.id
+    else:
+        query = select(
+            Materia.id, Materia.nombre, Materia.codigo, Docente.nombre.label('docente_nombre'),
+            Docente.apellido.label('docente_apellido')
+        ).outerjoin(Docente, Docente.id == Materia.docente_id)
+        columna_id = Materia.id
+    if ids is not None:
+        query = query.where(columna_id.in_(ids))
+    return query
+
+
+def _documento(tipo, fila):
+    if tipo == 'materia':
+        docente = ' '.join(filter(None, (fila.docente_nombre, fila.docente_apellido)))
+        titulo, detalle = fila.nombre, ' · '.join(filter(None, (fila.codigo, docente)))
+        texto = ' '.join(filter(None, (fila.nombre, fila.codigo, docente)))
+    else:
+        titulo = f'{fila.nombre} {fila.apellido}'
+        extra = fila.ciclo if tipo == 'alumno' else fila.especialidad
+        detalle = ' · '.join(filter(None, (f'DNI {fila.dni}', extra)))
+        texto = ' '.join(filter(None, (fila.nombre, fila.apellido, fila.dni)))
+    return {
+        'clave': clave_documento(tipo, fila.id),
+        'tipo': tipo,
+        'objeto_id': fila.id,
+        'titulo': titulo[:250],
+        'detalle': detalle[:250],
+        'texto': normalizar(texto),
+    }
+
+
+def _insertar_documentos(conexion, documentos):
+    if not documentos:
+        return
+    tabla, clave = _tabla(conexion)
+    conexion.execute(insert(tabla), [
+        {clave: documento['clave'], **{k: v for k, v in documento.items() if k != 'clave'}}
+        for documento in documentos
+    ])
+
+
+def sincronizar(conexion, ids, materias_de_docentes=()):
+    """Vuelve a indexar los objetos indicados ({tipo: ids}); los que ya no
+    existen quedan fuera del índice. materias_de_docentes agrega las materias
+    de esos docentes (su texto incluye el nombre del docente)."""
+    if not _modo(conexion):
+        return
+    ids = {tipo: set(valores) for tipo, valores in ids.items() if valores}
+    if materias_de_docentes:
+        ids.setdefault('materia', set()).update(
+            conexion.execute(select(Materia.id).where(Materia.docente_id.in_(materias_de_docentes))).scalars()
+        )
+    if not ids:
+        return
+
+    tabla, clave = _tabla(conexion)
+    claves = [clave_documento(tipo, objeto_id) for tipo, valores in ids.items() for objeto_id in valores]
+    conexion.execute(delete(tabla).where(tabla.c[clave].in_(claves)))
+    documentos = []
+    for tipo, valores in ids.items():
+        for fila in conexion.execute(_consulta_documentos(tipo, ids=valores)):
+            documentos.append(_documento(tipo, fila))
+    _insertar_documentos(conexion, documentos)
+
+
+def reconstruir_indice(conexion, lote=5000):
+    """Vacía el índice y lo llena con todos los alumnos, materias y docentes"""
+    tabla, _ = _tabla(conexion)
+    conexion.execute(delete(tabla))
+    total = 0
+    for tipo in TIPOS:
+        documentos = []
+        for fila in conexion.execute(_consulta_documentos(tipo)):
+            documentos.append(_documento(tipo, fila))
+            if len(documentos) >= lote:
+                _insertar_documentos(conexion, documentos)
+                total += len(documentos)
+                documentos = []
+        _insertar_documentos(conexion, documentos)
+        total += len(documentos)
+    return total
+
+
+# Búsqueda
+def buscar(conexion, consulta, tipos=TIPOS, limite=LIMITE, docente_id=None):
+    """Documentos que contienen todos los términos de la consulta (cada uno
+    como prefijo), de más a menos relevante. Con docente_id solo se incluyen
+    sus materias, los alumnos matriculados en ellas y el propio docente."""
+    palabras = terminos(consulta)
+    modo = _modo(conexion)
+    if not palabras or not tipos or not modo:
+        return []
+
+    tabla, _ = _tabla(conexion)
+    columnas = [tabla.c.tipo, tabla.c.objeto_id, tabla.c.titulo, tabla.c.detalle]
+    condiciones = [tabla.c.tipo.in_(tipos)]
+
+    if modo == 'fts5':
+        # rank es la columna oculta de FTS5 con el puntaje bm25 (más negativo = más relevante)
+        orden = literal_column('rank')
+        puntaje = -orden
+        condiciones.append(tabla.c.texto.match(' '.join(f'"{palabra}"*' for palabra in palabras)))
+    elif modo == 'postgresql':
+        consulta_ts = func.to_tsquery('simple', ' & '.join(f'{palabra}:*' for palabra in palabras))
+        texto = ' '.join(palabras)
+        puntaje = func.ts_rank(tabla.c.vector, consulta_ts) + func.similarity(tabla.c.texto, texto)
+        condiciones.append(or_(tabla.c.vector.op('@@')(consulta_ts), tabla.c.texto.op('%')(texto)))
+        orden = puntaje.desc()
+    else:
+        puntaje = literal(0.0)
+        condiciones.extend(tabla.c.texto.like(f'%{palabra}%') for palabra in palabras)
+        orden = tabla.c.titulo
+
+    if docente_id is not None:
+        alumnos_del_docente = select(Matricula.alumno_id).join(Materia, Materia.id == Matricula.materia_id).where(
+            Materia.docente_id == docente_id
+        )
+        condiciones.append(or_(
+            and_(tabla.c.tipo == 'alumno', tabla.c.objeto_id.in_(alumnos_del_docente)),
+            and_(tabla.c.tipo == 'materia', tabla.c.objeto_id.in_(select(Materia.id).where(Materia.docente_id == docente_id))),
+            and_(tabla.c.tipo == 'docente', tabla.c.objeto_id == docente_id),
+        ))
+
+    query = select(*columnas, puntaje.label('puntaje')).where(*condiciones).order_by(orden).limit(limite)
+    return [
+        {
+            'tipo': fila.tipo,
+            'id': int(fila.objeto_id),
+            'titulo': fila.titulo,
+            'detalle': fila.detalle,
+            'puntaje': round(float(fila.puntaje or 0), 4),
+        }
+        for fila in conexion.execute(query)
+    ]
+
+
+# Sincronización con los eventos de la sesión
+def _columnas_modificadas(obj, columnas):
+    estado = inspect(obj)
+    return any(estado.attrs[columna].history.has_changes() for columna in columnas)
+
+
+def _despues_de_flush(session, contexto_flush):
+    ids = {tipo: set() for tipo in TIPOS}
+    docentes_renombrados = set()
+
+    for obj in list(session.new) + list(session.deleted):
+        modelo = type(obj)
+        if modelo in COLUMNAS_INDEXADAS:
+            ids[_TIPO_MODELO[modelo]].add(obj.id)
+
+    for obj in session.dirty:
+        modelo = type(obj)
+        if modelo not in COLUMNAS_INDEXADAS or obj in session.deleted:
+            continue
+        if _columnas_modificadas(obj, COLUMNAS_INDEXADAS[modelo]):
+            ids[_TIPO_MODELO[modelo]].add(obj.id)
+            if modelo is Docente and _columnas_modificadas(obj, ('nombre', 'apellido')):
+                docentes_renombrados.add(obj.id)
+
+    if any(ids.values()):
+        sincronizar(session.connection(), ids, docentes_renombrados)
+
+
+def _columnas_actualizadas(estado_orm):
+    parametros = estado_orm.parameters
+    if isinstance(parametros, (list, tuple)):
+        nombres = set()
+        for fila in parametros:
+            nombres.update(fila)
+        return nombres
+    nombres = set(estado_orm.statement.compile().params)
+    if parametros:
+        nombres.update(parametros)
+    return nombres
+
+
+def _al_ejecutar_orm(estado_orm):
+    if not (estado_orm.is_delete or estado_orm.is_update or estado_orm.is_insert):
+        return None
+    mapper = estado_orm.bind_mapper
+    modelo = mapper.class_ if mapper is not None else None
+    if modelo not in COLUMNAS_INDEXADAS:
+        return None
+
+    session = estado_orm.session
+    tipo = _TIPO_MODELO[modelo]
+
+    if estado_orm.is_insert:
+        # INSERT masivo (importaciones): los ids se buscan por la columna única
+        filas = estado_orm.parameters
+        if not isinstance(filas, (list, tuple)):
+            filas = [filas] if filas else []
+        resultado = estado_orm.invoke_statement()
+        columna = _COLUMNA_UNICA[modelo]
+        valores = [fila[columna] for fila in filas if fila.get(columna) is not None]
+        if valores:
+            nuevos = session.execute(select(modelo.id).where(getattr(modelo, columna).in_(valores))).scalars()
+            sincronizar(session.connection(), {tipo: nuevos})
+        return resultado
+
+    # UPDATE masivo: solo importa si cambia alguna columna indexada
+    if estado_orm.is_update and not set(COLUMNAS_INDEXADAS[modelo]) & _columnas_actualizadas(estado_orm):
+        return None
+
+    afectados = select(modelo.id)
+    if estado_orm.statement.whereclause is not None:
+        afectados = afectados.where(estado_orm.statement.whereclause)
+    afectados = list(session.execute(afectados).scalars())
+    resultado = estado_orm.invoke_statement()
+    sincronizar(session.connection(), {tipo: afectados}, afectados if modelo is Docente else ())
+    return resultado
+
+
+# Comandos de línea
+@click.group('busqueda')
+def cli():
+    """Índice de búsqueda de alumnos, materias y docentes"""
+
+
+@cli.command('reconstruir')
+def comando_reconstruir():
+    """Crea el índice si falta y lo vuelve a llenar"""
+    with db.engine.begin() as conexion:
+        crear_indice_busqueda(conexion)
+        total = reconstruir_indice(conexion)
+    click.echo(f'✅ {total} documentos indexados ({_modo_actual()})')
+
+
+@cli.command('buscar')
+@click.argument('consulta')
+@click.option('--limite', type=int, default=LIMITE)
+def comando_buscar(consulta, limite):
+    """Muestra los resultados de una búsqueda"""
+    with db.engine.connect() as conexion:
+        resultados = buscar(conexion, consulta, limite=limite)
+    for resultado in resultados:
+        click.echo(f"{resultado['puntaje']:8.3f}  {resultado['tipo']:8} {resultado['id']:>6}  "
+                   f"{resultado['titulo']} ({resultado['detalle']})")
+    if not resultados:
+        click.echo('Sin resultados')
+
+
+def _modo_actual():
+    with db.engine.connect() as conexion:
+        return _modo(conexion)
+
+
+def init_app(app):
+    app.cli.add_command(cli)
+    event.listen(db.session, 'after_flush', _despues_de_flush)
+    event.listen(db.session, 'do_orm_execute', _al_ejecutar_orm)
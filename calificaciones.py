@@ -0,0 +1,154 @@
+"""
+Operaciones masivas sobre notas
+
+- Registrar las notas de toda una materia de una vez: la validación se hace
+  con una sola consulta sobre las matrículas y la escritura con un único
+  INSERT de varias filas dentro de una transacción.
+- Publicar o despublicar muchas notas con un único UPDATE restringido a
+  las materias del docente.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import insert, or_, select, update
+
+from models import db, Alumno, Materia, Matricula, Nota
+
+NOTA_MINIMA = 0
+NOTA_MAXIMA = 20
+
+
+class ErrorLote(Exception):
+    """El lote no se puede registrar; `errores` indica el problema por alumno"""
+
+    def __init__(self, mensaje, errores=None):
+        super().__init__(mensaje)
+        self.errores = errores or {}
+
+
+def alumnos_activos_materia(materia_id):
+    """Alumnos con matrícula activa en la materia, ordenados para la grilla"""
+    return db.session.query(
+        Alumno.id, Alumno.dni, Alumno.nombre, Alumno.apellido
+    ).join(Matricula, Matricula.alumno_id == Alumno.id).filter(
+        Matricula.materia_id == materia_id,
+        Matricula.estado == 'activa'
+    ).order_by(Alumno.apellido, Alumno.nombre).all()
+
+
+def leer_notas_formulario(form, prefijo='nota_'):
+    """Extrae {alumno_id: texto} de los campos nota_<alumno_id> no vacíos"""
+    valores = {}
+    for campo, valor in form.items():
+        if not campo.startswith(prefijo) or not valor.strip():
+            continue
+        try:
+            valores[int(campo[len(prefijo):])] = valor.strip()
+        except ValueError:
+            continue
+    return valores
+
+
+def registrar_notas_en_lote(docente_id, materia_id, tipo_evaluacion, valores, observaciones=None):
+    """Valida y registra en una sola transacción las notas {alumno_id: valor}.
+
+    Lanza ErrorLote sin escribir nada si algún valor es inválido, si la
+    materia no pertenece al docente o si algún alumno no tiene matrícula
+    activa en ella. Devuelve la cantidad de notas registradas.
+    """
+    if not tipo_evaluacion or not tipo_evaluacion.strip():
+        raise ErrorLote('Selecciona el tipo de evaluación')
+    if not valores:
+        raise ErrorLote('Ingresa al menos una nota')
+
+    errores = {}
+    notas = {}
+    for alumno_id, valor in valores.items():
+        try:
+            nota = float(valor)
+        except (TypeError, ValueError):
+            errores[alumno_id] = 'Valor no numérico'
+            continue
+        if nota < NOTA_MINIMA or nota > NOTA_MAXIMA:
+            errores[alumno_id] = f'La nota debe estar entre {NOTA_MINIMA} y {NOTA_MAXIMA}'
+            continue
+        notas[alumno_id] = nota
+
+    # Una sola consulta verifica que la materia sea del docente y que cada alumno esté matriculado
+    matriculados = {
+        alumno_id for (alumno_id,) in db.session.query(Matricula.alumno_id).join(
+            Materia, Matricula.materia_id == Materia.id
+        ).filter(
+            Matricula.materia_id == materia_id,
+            Materia.docente_id == docente_id,
+            Matricula.estado == 'activa',
+            Matricula.alumno_id.in_(list(valores))
+        )
+    }
+    for alumno_id in valores:
+        if alumno_id not in matriculados and alumno_id not in errores:
+            errores[alumno_id] = 'El alumno no está matriculado en esta materia'
+
+    if errores:
+        raise ErrorLote('Corrige las notas marcadas antes de guardar', errores)
+
+    ahora = datetime.utcnow()
+    filas = [{
+        'alumno_id': alumno_id,
+        'materia_id': materia_id,
+        'nota': nota,
+        'tipo_evaluacion': tipo_evaluacion.strip(),
+        'observaciones': observaciones or None,
+        'fecha': ahora,
+        'publicada': False,
+    } for alumno_id, nota in notas.items()]
+
+    try:
+        db.session.execute(insert(Nota), filas)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return len(filas)
+
+
+def cambiar_publicacion_en_lote(docente_id, publicar, materia_id=None, tipo_evaluacion=None, nota_ids=None):
+    """Publica (o despublica) con un solo UPDATE las notas del docente que cumplan
+    los criterios: materia, tipo de evaluación y/o lista explícita de ids.
+
+    Solo se modifican las notas cuyo estado cambia, así la fecha de publicación
+    de las ya publicadas se conserva. Devuelve la cantidad de notas afectadas.
+    """
+    if materia_id is None and not tipo_evaluacion and not nota_ids:
+        raise ErrorLote('Indica la materia, el tipo de evaluación o las notas a modificar')
+
+    if materia_id is not None:
+        materia = db.session.query(Materia.id).filter_by(id=materia_id, docente_id=docente_id).first()
+        if not materia:
+            raise ErrorLote('No tienes permisos sobre esta materia')
+
+    materias_docente = select(Materia.id).where(Materia.docente_id == docente_id).scalar_subquery()
+    if publicar:
+        pendientes = or_(Nota.publicada == False, Nota.publicada.is_(None))
+    else:
+        pendientes = Nota.publicada == True
+    condiciones = [Nota.materia_id.in_(materias_docente), pendientes]
+    if materia_id is not None:
+        condiciones.append(Nota.materia_id == materia_id)
+    if tipo_evaluacion:
+        condiciones.append(Nota.tipo_evaluacion == tipo_evaluacion)
+    if nota_ids:
+        condiciones.append(Nota.id.in_(list(nota_ids)))
+
+    try:
+        resultado = db.session.execute(
+            update(Nota).where(*condiciones).values(
+                publicada=publicar,
+                fecha_publicacion=datetime.utcnow() if publicar else None
+            ).execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return resultado.rowcount
@@ -0,0 +1,53 @@
+"""
+Hash de contraseñas con método configurable
+
+Verificar la contraseña es casi todo el costo del login: con el PBKDF2 por
+defecto de Werkzeug (600000 iteraciones) cada intento ocupa la CPU un
+cuarto de segundo, y cuando todo el colegio entra a la vez los workers se
+saturan. El método y su costo se eligen con PASSWORD_HASH_METODO, en el
+formato de Werkzeug:
+
+    pbkdf2:sha256:600000     (por defecto)
+    pbkdf2:sha256:260000
+    scrypt:32768:8:1
+
+Las contraseñas nuevas usan el método configurado y las existentes se
+actualizan solas la próxima vez que el usuario inicia sesión con éxito.
+"""
+
+from flask import current_app
+from werkzeug.security import check_password_hash, generate_password_hash
+
+METODO_POR_DEFECTO = 'pbkdf2:sha256:600000'
+
+# Método configurado -> prefijo con el que Werkzeug guarda sus hashes
+_prefijos = {}
+
+
+def metodo_configurado():
+    return current_app.config.get('PASSWORD_HASH_METODO') or METODO_POR_DEFECTO
+
+
+def generar_hash(password):
+    return generate_password_hash(password, method=metodo_configurado())
+
+
+def _prefijo(metodo):
+    # 'pbkdf2' se guarda como 'pbkdf2:sha256:600000': se calcula una vez por proceso
+    if metodo not in _prefijos:
+        _prefijos[metodo] = generate_password_hash('', method=metodo).split('$', 1)[0]
+    return _prefijos[metodo]
+
+
+def necesita_rehash(password_hash):
+    return password_hash.split('$', 1)[0] != _prefijo(metodo_configurado())
+
+
+def verificar_password(usuario, password):
+    """Comprueba la contraseña y, si es correcta y su hash usa otro método,
+    lo reemplaza en usuario.password_hash (el llamador confirma el cambio)"""
+    if not check_password_hash(usuario.password_hash, password):
+        return False
+    if necesita_rehash(usuario.password_hash):
+        usuario.password_hash = generar_hash(password)
+    return True
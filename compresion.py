@@ -0,0 +1,241 @@
+"""
+Compresión gzip/Brotli de las respuestas HTML y JSON
+
+Las tablas de matrículas y notas pesan varios MB de HTML sin comprimir y en
+conexiones móviles la descarga se come casi todo el tiempo de respuesta. Este
+middleware WSGI envuelve app.wsgi_app y comprime la respuesta en la
+codificación que acepte el cliente (Brotli si está instalado, si no gzip):
+
+    COMPRESION=1                 activada (por defecto)
+    COMPRESION_MINIMO=1024       bytes por debajo de los cuales no se comprime
+    COMPRESION_NIVEL=6           nivel de gzip (1-9)
+    COMPRESION_NIVEL_BROTLI=4    calidad de Brotli (0-11)
+
+No se tocan las respuestas que ya traen Content-Encoding (los archivos de
+/assets/ van precomprimidos), las que no son texto, las parciales ni las de
+HEAD. Las que se envían por flujo (sin Content-Length, como las exportaciones
+CSV o la página de matrículas) no se acumulan: cada bloque se comprime y se
+envía en cuanto llega (sync flush), así el navegador puede ir mostrándolo.
+
+Cada respuesta comprimida entera lleva en Server-Timing el tamaño antes y después y
+el tiempo de compresión:
+
+    Server-Timing: comp;dur=3.1;desc="br 2480113 -> 96114 B"
+
+y los totales se muestran en /admin/rendimiento.
+"""
+
+import gzip
+import threading
+import time
+import zlib
+
+from werkzeug.datastructures import Headers
+from werkzeug.wsgi import ClosingIterator
+from werkzeug.http import parse_accept_header
+
+try:
+    import brotli
+except ImportError:  # opcional: sin Brotli se comprime solo con gzip
+    brotli = None
+
+MINIMO = 1024
+NIVEL_GZIP = 6
+NIVEL_BROTLI = 4
+TIPOS_COMPRIMIBLES = (
+    'text/html', 'text/css', 'text/plain', 'text/csv', 'text/javascript',
+    'application/json', 'application/javascript', 'image/svg+xml',
+)
+ESTADOS_SIN_CUERPO = (204, 206, 304)
+
+
+class Estadisticas:
+    """Totales de las respuestas comprimidas desde que arrancó el proceso"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.limpiar()
+
+    def registrar(self, codificacion, original, comprimido, duracion_ms):
+        with self._lock:
+            totales = self._por_codificacion.setdefault(
+                codificacion, {'respuestas': 0, 'bytes_originales': 0, 'bytes_comprimidos': 0, 'tiempo_ms': 0.0}
+            )
+            totales['respuestas'] += 1
+            totales['bytes_originales'] += original
+            totales['bytes_comprimidos'] += comprimido
+            totales['tiempo_ms'] += duracion_ms
+
+    def resumen(self):
+        with self._lock:
+            return {codificacion: dict(totales) for codificacion, totales in self._por_codificacion.items()}
+
+    def limpiar(self):
+        with self._lock:
+            self._por_codificacion = {}
+
+
+estadisticas = Estadisticas()
+
+
+def elegir_codificacion(aceptadas):
+    """'br', 'gzip' o None según la cabecera Accept-Encoding"""
+    if not aceptadas:
+        return None
+    aceptadas = parse_accept_header(aceptadas)
+    if brotli is not None and aceptadas['br']:
+        return 'br'
+    if aceptadas['gzip']:
+        return 'gzip'
+    return None
+
+
+def comprimir(datos, codificacion, nivel_gzip=NIVEL_GZIP, nivel_brotli=NIVEL_BROTLI):
+    if codificacion == 'br':
+        return brotli.compress(datos, quality=nivel_brotli)
+    return gzip.compress(datos, compresslevel=nivel_gzip, mtime=0)
+
+
+class CompresorFlujo:
+    """Compresión incremental: cada bloque sale comprimido y completo para el cliente"""
+
+    def __init__(self, codificacion, nivel_gzip=NIVEL_GZIP, nivel_brotli=NIVEL_BROTLI):
+        if codificacion == 'br':
+            self._brotli = brotli.Compressor(quality=nivel_brotli)
+        else:
+            self._brotli = None
+            self._zlib = zlib.compressobj(nivel_gzip, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # formato gzip
+
+    def comprimir(self, datos):
+        if self._brotli is not None:
+            return self._brotli.process(datos) + self._brotli.flush()
+        return self._zlib.compress(datos) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def terminar(self):
+        if self._brotli is not None:
+            return self._brotli.finish()
+        return self._zlib.flush()
+
+
+def modo_compresion(estado, cabeceras, minimo):
+    """'completa' si la respuesta es texto sin codificar de tamaño conocido y
+    suficiente, 'flujo' si es texto que se envía por partes, None si no se comprime"""
+    if estado < 200 or estado in ESTADOS_SIN_CUERPO:
+        return None
+    if 'Content-Encoding' in cabeceras or 'no-transform' in cabeceras.get('Cache-Control', ''):
+        return None
+    tipo = cabeceras.get('Content-Type', '').split(';', 1)[0].strip().lower()
+    if tipo not in TIPOS_COMPRIMIBLES:
+        return None
+    largo = cabeceras.get('Content-Length', type=int)
+    if largo is None:
+        return 'flujo'
+    return 'completa' if largo >= minimo else None
+
+
+def _marcar_comprimida(cabeceras, codificacion):
+    cabeceras['Content-Encoding'] = codificacion
+    # Los bytes cambian: el ETag fuerte pasa a débil (las comparaciones de If-None-Match son débiles)
+    etag = cabeceras.get('ETag')
+    if etag and not etag.startswith('W/'):
+        cabeceras['ETag'] = f'W/{etag}'
+
+
+def _agregar_vary(cabeceras):
+    vary = [valor.strip() for valor in cabeceras.get('Vary', '').split(',') if valor.strip()]
+    if 'accept-encoding' not in (valor.lower() for valor in vary):
+        vary.append('Accept-Encoding')
+    cabeceras['Vary'] = ', '.join(vary)
+
+
+class MiddlewareCompresion:
+    """Comprime las respuestas de la aplicación WSGI envuelta"""
+
+    def __init__(self, aplicacion, minimo=MINIMO, nivel_gzip=NIVEL_GZIP, nivel_brotli=NIVEL_BROTLI):
+        self.aplicacion = aplicacion
+        self.minimo = minimo
+        self.nivel_gzip = nivel_gzip
+        self.nivel_brotli = nivel_brotli
+
+    def __call__(self, environ, start_response):
+        if environ.get('REQUEST_METHOD') == 'HEAD':
+            return self.aplicacion(environ, start_response)
+
+        codificacion = elegir_codificacion(environ.get('HTTP_ACCEPT_ENCODING'))
+        pendiente = {}
+
+        def iniciar(estado, lista_cabeceras, exc_info=None):
+            cabeceras = Headers(lista_cabeceras)
+            modo = modo_compresion(int(estado.split(' ', 1)[0]), cabeceras, self.minimo)
+            if modo is None:
+                return start_response(estado, lista_cabeceras, exc_info)
+            # La respuesta depende de Accept-Encoding aunque esta vez no se comprima
+            _agregar_vary(cabeceras)
+            if codificacion is None:
+                return start_response(estado, cabeceras.to_wsgi_list(), exc_info)
+            if modo == 'flujo':
+                _marcar_comprimida(cabeceras, codificacion)
+                pendiente['flujo'] = True
+                return start_response(estado, cabeceras.to_wsgi_list(), exc_info)
+            # Se retiene start_response hasta tener el cuerpo comprimido
+            pendiente.update(estado=estado, cabeceras=cabeceras, exc_info=exc_info, cuerpo=[])
+            return pendiente['cuerpo'].append
+
+        iterable = self.aplicacion(environ, iniciar)
+        if not pendiente:
+            return iterable
+        if pendiente.get('flujo'):
+            # close() llega al iterable original aunque no se haya pedido ningún bloque
+            # (el finally de un generador que no empezó no se ejecuta)
+            return ClosingIterator(self._comprimir_flujo(iterable, codificacion), getattr(iterable, 'close', None))
+
+        try:
+            for fragmento in iterable:
+                pendiente['cuerpo'].append(fragmento)
+        finally:
+            if hasattr(iterable, 'close'):
+                iterable.close()
+
+        datos = b''.join(pendiente['cuerpo'])
+        inicio = time.perf_counter()
+        comprimido = comprimir(datos, codificacion, self.nivel_gzip, self.nivel_brotli)
+        duracion_ms = (time.perf_counter() - inicio) * 1000
+        estadisticas.registrar(codificacion, len(datos), len(comprimido), duracion_ms)
+
+        cabeceras = pendiente['cabeceras']
+        _marcar_comprimida(cabeceras, codificacion)
+        cabeceras['Content-Length'] = str(len(comprimido))
+        cabeceras.add(
+            'Server-Timing', f'comp;dur={duracion_ms:.1f};desc="{codificacion} {len(datos)} -> {len(comprimido)} B"'
+        )
+        start_response(pendiente['estado'], cabeceras.to_wsgi_list(), pendiente['exc_info'])
+        return [comprimido]
+
+    def _comprimir_flujo(self, iterable, codificacion):
+        compresor = CompresorFlujo(codificacion, self.nivel_gzip, self.nivel_brotli)
+        original = comprimido = 0
+        duracion = 0.0
+        for fragmento in iterable:
+            if not fragmento:
+                continue
+            inicio = time.perf_counter()
+            salida = compresor.comprimir(fragmento)
+            duracion += time.perf_counter() - inicio
+            original += len(fragmento)
+            comprimido += len(salida)
+            yield salida
+        salida = compresor.terminar()
+        comprimido += len(salida)
+        yield salida
+        estadisticas.registrar(codificacion, original, comprimido, duracion * 1000)
+
+
+def init_app(app):
+    if not app.config.get('COMPRESION', True):
+        return
+    app.wsgi_app = MiddlewareCompresion(
+        app.wsgi_app,
+        minimo=app.config.get('COMPRESION_MINIMO', MINIMO),
+        nivel_gzip=app.config.get('COMPRESION_NIVEL', NIVEL_GZIP),
+        nivel_brotli=app.config.get('COMPRESION_NIVEL_BROTLI', NIVEL_BROTLI),
+    )
@@ -0,0 +1,117 @@
+"""
+Pool de conexiones a la base de datos
+
+Con PostgreSQL cada worker de gunicorn mantiene un pool de conexiones.
+Por defecto SQLAlchemy no comprueba las conexiones antes de usarlas ni las
+renueva, así que cuando el Postgres administrado cierra las inactivas las
+primeras peticiones fallan o se quedan esperando. El pool se configura con
+variables de entorno (ver app.py):
+
+- DB_POOL_SIZE, DB_MAX_OVERFLOW: conexiones fijas y adicionales por worker
+- DB_POOL_TIMEOUT: segundos de espera por una conexión libre antes de fallar
+- DB_POOL_RECYCLE: segundos tras los que una conexión se reemplaza
+- DB_POOL_PRE_PING: comprobar la conexión antes de entregarla (1/0)
+- DB_STATEMENT_TIMEOUT: milisegundos máximos por sentencia (0 = sin límite);
+  las migraciones lo desactivan en su conexión (ver migraciones.py)
+- DB_POOL_AVISO_ESPERA: milisegundos de espera por una conexión a partir de
+  los cuales se registra un aviso
+
+También se avisa cuando el pool se satura (todas las conexiones, incluidas
+las adicionales, en uso).
+
+Con SQLite, SQLITE_RENDIMIENTO=1 activa un perfil para varios workers: cada
+conexión nueva pasa a modo WAL (los lectores no se bloquean mientras otro
+proceso escribe) con synchronous=NORMAL, espera hasta SQLITE_BUSY_TIMEOUT
+milisegundos en lugar de fallar con "database is locked", y usa más caché
+(SQLITE_CACHE_MB), memoria mapeada (SQLITE_MMAP_MB) y tablas temporales en
+memoria. benchmark_sqlite.py compara ambos modos con lectores y escritores
+concurrentes.
+"""
+
+import logging
+import time
+
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+
+from models import db
+
+logger = logging.getLogger('conexiones')
+
+
+class PoolMedido(QueuePool):
+    """QueuePool que registra las esperas largas por una conexión y la saturación"""
+
+    aviso_espera_ms = 100
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        conexion = super()._do_get()
+        espera_ms = (time.perf_counter() - inicio) * 1000
+
+        if espera_ms >= self.aviso_espera_ms:
+            logger.warning(f'Espera de {espera_ms:.0f} ms por una conexión del pool ({self.status()})')
+        if self._max_overflow >= 0 and self.checkedout() >= self.size() + self._max_overflow:
+            logger.warning(f'Pool de conexiones saturado ({self.status()})')
+        return conexion
+
+
+def es_postgresql_url(url):
+    return url.startswith('postgresql')
+
+
+def es_sqlite_url(url):
+    return url.startswith('sqlite')
+
+
+def opciones_motor(config):
+    """SQLALCHEMY_ENGINE_OPTIONS según la base de datos y la configuración del pool"""
+    url = config['SQLALCHEMY_DATABASE_URI']
+    if es_sqlite_url(url) and config.get('SQLITE_RENDIMIENTO'):
+        # Espera del propio driver al abrir la transacción de escritura
+        return {'connect_args': {'timeout': config['SQLITE_BUSY_TIMEOUT'] / 1000}}
+    if not es_postgresql_url(url):
+        return {}
+
+    PoolMedido.aviso_espera_ms = config['DB_POOL_AVISO_ESPERA']
+    opciones = {
+        'poolclass': PoolMedido,
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+        'pool_pre_ping': config['DB_POOL_PRE_PING'],
+    }
+    if config['DB_STATEMENT_TIMEOUT'] > 0:
+        # Se envía al abrir cada conexión, sin una consulta adicional por petición
+        opciones['connect_args'] = {'options': f"-c statement_timeout={config['DB_STATEMENT_TIMEOUT']}"}
+    return opciones
+
+
+def pragmas_sqlite(config):
+    """PRAGMA que se ejecutan en cada conexión nueva con el perfil de rendimiento"""
+    return [
+        'PRAGMA journal_mode=WAL',
+        'PRAGMA synchronous=NORMAL',
+        f"PRAGMA busy_timeout={config['SQLITE_BUSY_TIMEOUT']}",
+        f"PRAGMA cache_size=-{config['SQLITE_CACHE_MB'] * 1024}",
+        f"PRAGMA mmap_size={config['SQLITE_MMAP_MB'] * 1024 * 1024}",
+        'PRAGMA temp_store=MEMORY',
+    ]
+
+
+def aplicar_perfil_sqlite(engine, config):
+    pragmas = pragmas_sqlite(config)
+
+    @event.listens_for(engine, 'connect')
+    def _configurar_conexion(conexion_dbapi, registro):
+        cursor = conexion_dbapi.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+
+def init_app(app):
+    if es_sqlite_url(app.config['SQLALCHEMY_DATABASE_URI']) and app.config.get('SQLITE_RENDIMIENTO'):
+        with app.app_context():
+            aplicar_perfil_sqlite(db.engine, app.config)
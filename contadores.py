@@ -0,0 +1,324 @@
+"""
+Contadores agregados mantenidos de forma incremental
+
+El dashboard del administrador necesitaba cargar todos los usuarios,
+alumnos, docentes y materias y contar las notas de cada materia. Ahora
+lee unas pocas filas de la tabla `contador`, que se mantiene al día con
+eventos de la sesión de SQLAlchemy:
+
+- after_flush: altas, bajas y cambios de columnas relevantes hechos con el ORM
+- do_orm_execute: DELETE/UPDATE/INSERT masivos (Query.delete(), update(), insert())
+
+Las escrituras con SQL directo no se registran; para corregir cualquier
+diferencia:
+
+    flask contadores verificar
+    flask contadores reconstruir
+"""
+
+from collections import Counter
+
+import click
+from sqlalchemy import delete, event, func, insert, inspect, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from models import db, Usuario, Alumno, Docente, Materia, Matricula, Nota, Contador
+
+# Por cada modelo: columnas que determinan sus claves y función que arma las claves
+CONTADORES = {
+    Usuario: (('tipo',), lambda v: ['usuarios', f"usuarios:{v['tipo']}"]),
+    Alumno: ((), lambda v: ['alumnos']),
+    Docente: (('estado',), lambda v: ['docentes', f"docentes:{v['estado'] or 'activo'}"]),
+    Materia: ((), lambda v: ['materias']),
+    Matricula: (('materia_id', 'estado'), lambda v: [
+        'matriculas',
+        f"matriculas:{v['estado'] or 'activa'}",
+        f"matriculas:materia:{v['materia_id']}",
+    ]),
+    Nota: (('materia_id',), lambda v: ['notas', f"notas:materia:{v['materia_id']}"]),
+}
+
+# Claves primarias por consulta al contar las filas de un UPDATE masivo
+IDS_POR_CONSULTA = 500
+
+
+def _claves(modelo, valores):
+    return CONTADORES[modelo][1](valores)
+
+
+def _valores_actuales(obj, columnas):
+    return {columna: getattr(obj, columna) for columna in columnas}
+
+
+def _valores_anteriores(obj, columnas):
+    estado = inspect(obj)
+    valores = {}
+    for columna in columnas:
+        historial = estado.attrs[columna].history
+        if historial.deleted:
+            valores[columna] = historial.deleted[0]
+        elif historial.unchanged:
+            valores[columna] = historial.unchanged[0]
+        else:
+            valores[columna] = getattr(obj, columna)
+    return valores
+
+
+def _columnas_modificadas(obj, columnas):
+    estado = inspect(obj)
+    return any(estado.attrs[columna].history.has_changes() for columna in columnas)
+
+
+# Aplicación de los cambios
+def aplicar_deltas(conexion, deltas):
+    """Suma los deltas a los contadores (creando las claves que falten)"""
+    deltas = sorted((clave, delta) for clave, delta in deltas.items() if delta)
+    if not deltas:
+        return
+    tabla = Contador.__table__
+
+    if conexion.dialect.name in ('sqlite', 'postgresql'):
+        insertar = sqlite_insert if conexion.dialect.name == 'sqlite' else pg_insert
+        stmt = insertar(tabla)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[tabla.c.clave],
+            set_={'valor': tabla.c.valor + stmt.excluded.valor}
+        )
+        conexion.execute(stmt, [{'clave': clave, 'valor': delta} for clave, delta in deltas])
+        return
+
+    for clave, delta in deltas:
+        resultado = conexion.execute(
+            update(tabla).where(tabla.c.clave == clave).values(valor=tabla.c.valor + delta)
+        )
+        if resultado.rowcount == 0:
+            conexion.execute(insert(tabla).values(clave=clave, valor=delta))
+
+
+def _despues_de_flush(session, contexto_flush):
+    deltas = Counter()
+
+    for obj in session.new:
+        modelo = type(obj)
+        if modelo in CONTADORES:
+            columnas = CONTADORES[modelo][0]
+            for clave in _claves(modelo, _valores_actuales(obj, columnas)):
+                deltas[clave] += 1
+
+    for obj in session.deleted:
+        modelo = type(obj)
+        if modelo in CONTADORES:
+            columnas = CONTADORES[modelo][0]
+            for clave in _claves(modelo, _valores_anteriores(obj, columnas)):
+                deltas[clave] -= 1
+
+    for obj in session.dirty:
+        modelo = type(obj)
+        if modelo not in CONTADORES or obj in session.deleted:
+            continue
+        columnas = CONTADORES[modelo][0]
+        if columnas and _columnas_modificadas(obj, columnas):
+            for clave in _claves(modelo, _valores_anteriores(obj, columnas)):
+                deltas[clave] -= 1
+            for clave in _claves(modelo, _valores_actuales(obj, columnas)):
+                deltas[clave] += 1
+
+    aplicar_deltas(session.connection(), deltas)
+
+
+def _conteo_agrupado(session, modelo, condicion):
+    """Cuenta las filas que cumplen la condición agrupadas por las columnas del contador"""
+    columnas = [getattr(modelo, nombre) for nombre in CONTADORES[modelo][0]]
+    query = select(*columnas, func.count()).select_from(modelo)
+    if condicion is not None:
+        query = query.where(condicion)
+    if columnas:
+        query = query.group_by(*columnas)
+    deltas = Counter()
+    for fila in session.execute(query):
+        valores = dict(zip(CONTADORES[modelo][0], fila[:-1]))
+        for clave in _claves(modelo, valores):
+            deltas[clave] += fila[-1]
+    return deltas
+
+
+def _columnas_actualizadas(estado_orm):
+    parametros = estado_orm.parameters
+    if isinstance(parametros, (list, tuple)):
+        # UPDATE por clave primaria con una lista de diccionarios
+        nombres = set()
+        for fila in parametros:
+            nombres.update(fila)
+        return nombres
+    nombres = set(estado_orm.statement.compile().params)
+    if parametros:
+        nombres.update(parametros)
+    return nombres
+
+
+def _ids_afectados(session, mapper, estado_orm):
+    """Claves primarias de las filas que el UPDATE va a modificar; None si son todas.
+
+    Se buscan antes de ejecutarlo: el WHERE puede usar las mismas columnas que
+    cambia y después ya no encontraría esas filas.
+    """
+    columna_id = mapper.primary_key[0]
+    parametros = estado_orm.parameters
+    if isinstance(parametros, (list, tuple)):
+        # UPDATE por clave primaria con una lista de diccionarios
+        return [fila[columna_id.key] for fila in parametros if columna_id.key in fila]
+    condicion = estado_orm.statement.whereclause
+    if condicion is None:
+        return None
+    return list(session.execute(select(columna_id).where(condicion)).scalars())
+
+
+def _conteo_por_ids(session, modelo, mapper, ids):
+    """Como _conteo_agrupado, limitado a las filas con esas claves primarias"""
+    if ids is None:
+        return _conteo_agrupado(session, modelo, None)
+    columna_id = mapper.primary_key[0]
+    deltas = Counter()
+    for inicio in range(0, len(ids), IDS_POR_CONSULTA):
+        lote = ids[inicio:inicio + IDS_POR_CONSULTA]
+        deltas.update(_conteo_agrupado(session, modelo, columna_id.in_(lote)))
+    return deltas
+
+
+def _al_ejecutar_orm(estado_orm):
+    if not (estado_orm.is_delete or estado_orm.is_update or estado_orm.is_insert):
+        return None
+    mapper = estado_orm.bind_mapper
+    modelo = mapper.class_ if mapper is not None else None
+    if modelo not in CONTADORES:
+        return None
+
+    session = estado_orm.session
+    columnas = CONTADORES[modelo][0]
+
+    if estado_orm.is_delete:
+        # Contar antes de borrar lo que el DELETE va a eliminar
+        deltas = _conteo_agrupado(session, modelo, estado_orm.statement.whereclause)
+        resultado = estado_orm.invoke_statement()
+        aplicar_deltas(session.connection(), {clave: -valor for clave, valor in deltas.items()})
+        return resultado
+
+    if estado_orm.is_insert:
+        filas = estado_orm.parameters
+        if not isinstance(filas, (list, tuple)):
+            filas = [filas] if filas else []
+        resultado = estado_orm.invoke_statement()
+        deltas = Counter()
+        for fila in filas:
+            for clave in _claves(modelo, {columna: fila.get(columna) for columna in columnas}):
+                deltas[clave] += 1
+        aplicar_deltas(session.connection(), deltas)
+        return resultado
+
+    # UPDATE masivo: solo importa si cambia alguna columna de los contadores
+    if not columnas or not set(columnas) & _columnas_actualizadas(estado_orm):
+        return None
+    ids = _ids_afectados(session, mapper, estado_orm)
+    if ids is not None and not ids:
+        return None
+    antes = _conteo_por_ids(session, modelo, mapper, ids)
+    resultado = estado_orm.invoke_statement()
+    despues = _conteo_por_ids(session, modelo, mapper, ids)
+    despues.subtract(antes)
+    aplicar_deltas(session.connection(), despues)
+    return resultado
+
+
+# Lectura y reconstrucción
+def calcular_contadores(conexion):
+    """Calcula todos los contadores desde cero con consultas agrupadas"""
+    valores = Counter()
+    for modelo, (columnas, _) in CONTADORES.items():
+        columnas_sql = [getattr(modelo, nombre) for nombre in columnas]
+        query = select(*columnas_sql, func.count()).select_from(modelo)
+        if columnas_sql:
+            query = query.group_by(*columnas_sql)
+        for fila in conexion.execute(query):
+            for clave in _claves(modelo, dict(zip(columnas, fila[:-1]))):
+                valores[clave] += fila[-1]
+    return valores
+
+
+def reconstruir_contadores(conexion):
+    """Reemplaza el contenido de la tabla de contadores por valores recalculados"""
+    valores = calcular_contadores(conexion)
+    tabla = Contador.__table__
+    conexion.execute(delete(tabla))
+    if valores:
+        conexion.execute(insert(tabla), [
+            {'clave': clave, 'valor': valor} for clave, valor in sorted(valores.items())
+        ])
+    return valores
+
+
+def diferencias_contadores(conexion):
+    """Claves cuyo valor almacenado no coincide con el recalculado: {clave: (guardado, real)}"""
+    reales = calcular_contadores(conexion)
+    tabla = Contador.__table__
+    guardados = {clave: valor for clave, valor in conexion.execute(select(tabla.c.clave, tabla.c.valor))}
+    diferencias = {}
+    for clave in set(reales) | set(guardados):
+        if reales.get(clave, 0) != guardados.get(clave, 0):
+            diferencias[clave] = (guardados.get(clave, 0), reales.get(clave, 0))
+    return diferencias
+
+
+def obtener_contadores():
+    """Contadores globales (sin los de cada materia) como diccionario"""
+    tabla = Contador.__table__
+    filas = db.session.execute(
+        select(tabla.c.clave, tabla.c.valor).where(~tabla.c.clave.contains(':materia:'))
+    ).all()
+    if not filas:
+        # Tabla todavía no construida: calcular sin guardar
+        valores = calcular_contadores(db.session.connection())
+        return Counter({clave: valor for clave, valor in valores.items() if ':materia:' not in clave})
+    return Counter(dict(filas))
+
+
+def notas_por_materia(materia_ids=None):
+    """Cantidad de notas de cada materia: {materia_id: total}"""
+    tabla = Contador.__table__
+    query = select(tabla.c.clave, tabla.c.valor).where(tabla.c.clave.startswith('notas:materia:'))
+    if materia_ids is not None:
+        query = query.where(tabla.c.clave.in_([f'notas:materia:{materia_id}' for materia_id in materia_ids]))
+    return {int(clave.rsplit(':', 1)[1]): valor for clave, valor in db.session.execute(query)}
+
+
+# Comandos de línea
+@click.group('contadores')
+def cli():
+    """Contadores agregados del dashboard"""
+
+
+@cli.command('reconstruir')
+def comando_reconstruir():
+    """Recalcula todos los contadores desde las tablas"""
+    with db.engine.begin() as conexion:
+        valores = reconstruir_contadores(conexion)
+    click.echo(f'✅ {len(valores)} contadores reconstruidos')
+
+
+@cli.command('verificar')
+def comando_verificar():
+    """Compara los contadores guardados con los valores reales"""
+    with db.engine.connect() as conexion:
+        diferencias = diferencias_contadores(conexion)
+    if not diferencias:
+        click.echo('✅ Los contadores están al día')
+        return
+    for clave, (guardado, real) in sorted(diferencias.items()):
+        click.echo(f'❌ {clave}: guardado {guardado}, real {real}')
+    raise SystemExit(1)
+
+
+def init_app(app):
+    app.cli.add_command(cli)
+    event.listen(db.session, 'after_flush', _despues_de_flush)
+    event.listen(db.session, 'do_orm_execute', _al_ejecutar_orm)
@@ -6,7 +6,7 @@ Inicia la aplicación con auto-reload habilitado
 
 import os
 import sys
-from app import app, db
+from app import app, db, init_db
 
 def main():
     """Función principal para desarrollo"""
@@ -19,6 +19,9 @@ def main():
     os.environ['FLASK_ENV'] = 'development'
     os.environ['FLASK_DEBUG'] = '1'
     
+    # Crear las tablas, aplicar las migraciones y crear el administrador si faltan
+    init_db()
+    
     print("🌐 Servidor iniciado en:")
     print("   Local: http://localhost:5000")
     print("   Red: http://0.0.0.0:5000")
@@ -0,0 +1,79 @@
+"""
+Estadísticas de notas calculadas en la base de datos
+
+Los contadores de las vistas (total, aprobadas, en recuperación,
+desaprobadas, promedio, materias y alumnos distintos) se obtienen con una
+sola consulta agregada en lugar de cargar todas las filas en memoria.
+El alcance se indica con FiltrosNotas: global, por docente, por alumno o
+por materia.
+"""
+
+from sqlalchemy import case, distinct, func
+
+from filtros import FiltrosNotas, condicion_rango
+from models import db, Materia, Nota
+
+
+def _contar_si(condicion):
+    return func.sum(case((condicion, 1), else_=0))
+
+
+def _query_base(filtros, *columnas):
+    query = db.session.query(*columnas).select_from(Nota).join(Materia, Nota.materia_id == Materia.id)
+    return (filtros or FiltrosNotas()).aplicar(query)
+
+
+def estadisticas_notas(filtros=None):
+    """Contadores de las notas que cumplen los filtros.
+
+    Las claves coinciden con las variables que usan las plantillas.
+    """
+    fila = _query_base(
+        filtros,
+        func.count(Nota.id),
+        _contar_si(condicion_rango('aprobado')),
+        _contar_si(condicion_rango('recuperacion')),
+        _contar_si(condicion_rango('desaprobado')),
+        _contar_si(Nota.publicada == True),
+        func.avg(Nota.nota),
+        func.count(distinct(Nota.materia_id)),
+        func.count(distinct(Nota.alumno_id))
+    ).one()
+
+    total, aprobadas, recuperacion, desaprobadas, publicadas, promedio, materias, alumnos = fila
+    return {
+        'total_notas': total or 0,
+        'notas_aprobadas': aprobadas or 0,
+        'notas_recuperacion': recuperacion or 0,
+        'notas_desaprobadas': desaprobadas or 0,
+        'notas_publicadas': publicadas or 0,
+        'notas_no_publicadas': (total or 0) - (publicadas or 0),
+        'promedio_general': round(promedio, 2) if promedio is not None else 0,
+        'materias_con_notas': materias or 0,
+        'alumnos_con_notas': alumnos or 0,
+    }
+
+
+def resumen_por_materia(filtros=None):
+    """Promedios agrupados por materia.
+
+    Devuelve el total de materias, el promedio de los promedios por materia
+    y cuántas materias tienen promedio aprobatorio (>= 13).
+    """
+    promedios = _query_base(
+        filtros,
+        Nota.materia_id.label('materia_id'),
+        func.avg(Nota.nota).label('promedio')
+    ).group_by(Nota.materia_id).subquery()
+
+    total, promedio, aprobadas = db.session.query(
+        func.count(promedios.c.materia_id),
+        func.avg(promedios.c.promedio),
+        _contar_si(promedios.c.promedio >= 13)
+    ).one()
+
+    return {
+        'total_materias': total or 0,
+        'promedio_general': promedio or 0,
+        'materias_aprobadas': aprobadas or 0,
+    }
@@ -0,0 +1,225 @@
+"""
+Actualización automática del estado de los docentes
+
+Un docente sin notas registradas en los últimos 30 días pasa a inactivo
+y vuelve a activo cuando registra actividad (salvo que un administrador
+lo haya marcado como inactivo manualmente).
+
+La última actividad de todos los docentes se obtiene con una sola
+consulta agrupada y los cambios se aplican con UPDATE masivos. El proceso
+se ejecuta fuera de las peticiones:
+
+    flask docentes actualizar-estado                 # una vez (cron)
+    flask docentes actualizar-estado --intervalo 15  # cada 15 minutos
+
+o dentro de la aplicación si ESTADO_DOCENTES_INTERVALO (minutos) es mayor
+que 0. En ese caso cada worker tiene un hilo que despierta en cada
+intervalo, pero solo uno ejecuta la actualización: antes de hacerlo toma
+el turno en la tabla tarea_programada con un UPDATE condicional, que solo
+un proceso logra por intervalo, incluso con varios servidores.
+
+El inicio de sesión de un docente guarda su última actividad en el mismo
+commit del login (un UPDATE), salvo que ya se haya guardado en los últimos
+ACTIVIDAD_DOCENTES_INTERVALO segundos. La actualización automática toma
+la más reciente entre esa fecha y la de la última nota.
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+
+import click
+from sqlalchemy import func, or_, update
+from sqlalchemy.exc import IntegrityError
+
+from models import db, Docente, Materia, Nota, TareaProgramada
+
+DIAS_INACTIVIDAD = 30
+MOTIVO_AUTOMATICO = f'Sin actividad por más de {DIAS_INACTIVIDAD} días (automático)'
+
+
+def ultima_actividad_por_docente():
+    """Fecha de la última nota registrada por cada docente: {docente_id: fecha}"""
+    filas = db.session.query(
+        Materia.docente_id, func.max(Nota.fecha)
+    ).join(Nota, Nota.materia_id == Materia.id).group_by(Materia.docente_id).all()
+    return {docente_id: fecha for docente_id, fecha in filas}
+
+
+def _es_inactivo_manual(estado, motivo):
+    return estado == 'inactivo' and motivo and 'manual' in motivo.lower()
+
+
+def actualizar_estado_docentes_automatico(ahora=None):
+    """Actualiza la última actividad y el estado de todos los docentes.
+
+    Devuelve cuántos docentes se marcaron como inactivos y cuántos se reactivaron.
+    """
+    ahora = ahora or datetime.utcnow()
+    fecha_limite = ahora - timedelta(days=DIAS_INACTIVIDAD)
+    ultimas_notas = ultima_actividad_por_docente()
+
+    actividad = []
+    por_inactivar = []
+    por_reactivar = []
+    docentes = db.session.query(
+        Docente.id, Docente.estado, Docente.motivo_inactividad, Docente.fecha_registro,
+        Docente.fecha_ultima_actividad
+    ).all()
+
+    for docente_id, estado, motivo, fecha_registro, actividad_guardada in docentes:
+        # Si ya está marcado manualmente como inactivo, no cambiar automáticamente
+        if _es_inactivo_manual(estado, motivo):
+            continue
+
+        # La más reciente entre la última nota y la actividad ya guardada
+        # (inicio de sesión); si no hay ninguna, la fecha de registro
+        fechas = [fecha for fecha in (ultimas_notas.get(docente_id), actividad_guardada) if fecha]
+        ultima_actividad = max(fechas) if fechas else fecha_registro or ahora
+        if ultima_actividad != actividad_guardada:
+            actividad.append({'id': docente_id, 'fecha_ultima_actividad': ultima_actividad})
+
+        if ultima_actividad < fecha_limite:
+            if estado != 'inactivo':
+                por_inactivar.append(docente_id)
+        elif estado == 'inactivo' and 'automático' in (motivo or ''):
+            por_reactivar.append(docente_id)
+
+    try:
+        if actividad:
+            db.session.execute(update(Docente), actividad)
+        if por_inactivar:
+            db.session.execute(
+                update(Docente).where(Docente.id.in_(por_inactivar)).values(
+                    estado='inactivo',
+                    motivo_inactividad=MOTIVO_AUTOMATICO,
+                    fecha_cambio_estado=ahora
+                ).execution_options(synchronize_session=False)
+            )
+        if por_reactivar:
+            db.session.execute(
+                update(Docente).where(Docente.id.in_(por_reactivar)).values(
+                    estado='activo',
+                    motivo_inactividad=None,
+                    fecha_cambio_estado=ahora
+                ).execution_options(synchronize_session=False)
+            )
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    return {'inactivados': len(por_inactivar), 'reactivados': len(por_reactivar)}
+
+
+def registrar_actividad(docente, intervalo_segundos, ahora=None):
+    """Anota el inicio de sesión en la última actividad del docente (cargado
+    en la sesión); se guarda con el commit del login. Devuelve True si la
+    cambió, False si ya estaba registrada hace menos de intervalo_segundos"""
+    ahora = ahora or datetime.utcnow()
+    ultima = docente.fecha_ultima_actividad
+    if ultima is not None and ahora - ultima < timedelta(seconds=intervalo_segundos):
+        return False
+    docente.fecha_ultima_actividad = ahora
+    return True
+
+
+# Ejecución periódica dentro del proceso
+TAREA = 'estado_docentes'
+_programador = {'hilo': None, 'detener': threading.Event()}
+_programador_lock = threading.Lock()
+
+
+def tomar_turno(nombre, intervalo, ahora=None):
+    """Marca la ejecución de la tarea si la anterior fue hace al menos
+    `intervalo` (timedelta); devuelve True solo al proceso que lo logra"""
+    ahora = ahora or datetime.utcnow()
+    tabla = TareaProgramada.__table__
+    try:
+        resultado = db.session.execute(
+            update(tabla).where(
+                tabla.c.nombre == nombre,
+                or_(tabla.c.ultima_ejecucion.is_(None), tabla.c.ultima_ejecucion <= ahora - intervalo)
+            ).values(ultima_ejecucion=ahora)
+        )
+        if resultado.rowcount == 0:
+            if db.session.get(TareaProgramada, nombre) is not None:
+                db.session.rollback()
+                return False
+            # Primera ejecución: si otro proceso inserta la fila a la vez, falla la clave primaria
+            db.session.add(TareaProgramada(nombre=nombre, ultima_ejecucion=ahora))
+        db.session.commit()
+        return True
+    except IntegrityError:
+        db.session.rollback()
+        return False
+
+
+def _ciclo(app, intervalo_minutos, detener):
+    while not detener.wait(intervalo_minutos * 60):
+        with app.app_context():
+            try:
+                if not tomar_turno(TAREA, timedelta(minutes=intervalo_minutos)):
+                    continue
+                resultado = actualizar_estado_docentes_automatico()
+                app.logger.info(f"Estado de docentes actualizado: {resultado}")
+            except Exception as e:
+                app.logger.error(f"Error al actualizar estado de docentes: {e}")
+            finally:
+                db.session.remove()
+
+
+def iniciar_programador(app, intervalo_minutos):
+    """Inicia (una vez por proceso) el hilo que actualiza los estados
+    periódicamente; entre todos los procesos se ejecuta una vez por intervalo"""
+    with _programador_lock:
+        hilo = _programador['hilo']
+        if hilo is not None and hilo.is_alive():
+            return hilo
+        _programador['detener'] = threading.Event()
+        hilo = threading.Thread(
+            target=_ciclo,
+            args=(app, intervalo_minutos, _programador['detener']),
+            name='estado-docentes',
+            daemon=True
+        )
+        hilo.start()
+        _programador['hilo'] = hilo
+        return hilo
+
+
+def detener_programador():
+    _programador['detener'].set()
+
+
+# Comandos de línea
+@click.group('docentes')
+def cli():
+    """Tareas de mantenimiento de docentes"""
+
+
+@cli.command('actualizar-estado')
+@click.option('--intervalo', type=int, default=0, help='Repetir cada N minutos (0 = una sola vez)')
+def comando_actualizar_estado(intervalo):
+    """Actualiza la última actividad y el estado de los docentes"""
+    while True:
+        resultado = actualizar_estado_docentes_automatico()
+        click.echo(f"✅ {resultado['inactivados']} docentes inactivados, {resultado['reactivados']} reactivados")
+        if not intervalo:
+            break
+        db.session.remove()
+        time.sleep(intervalo * 60)
+
+
+def init_app(app):
+    app.cli.add_command(cli)
+
+    intervalo = app.config.get('ESTADO_DOCENTES_INTERVALO', 0)
+    if intervalo > 0:
+        # El hilo se inicia con la primera petición de cada proceso para que
+        # sobreviva al fork de los workers de gunicorn
+        @app.before_request
+        def _iniciar_programador_estado_docentes():
+            hilo = _programador['hilo']
+            if hilo is None or not hilo.is_alive():
+                iniciar_programador(app, intervalo)
@@ -0,0 +1,219 @@
+"""
+Archivos estáticos con huella, precomprimidos y caché de larga duración
+
+Las plantillas llevaban todo su CSS y JS en bloques <style>/<script> que el
+navegador volvía a descargar en cada página. Ahora viven en static/css y
+static/js y un paso de construcción genera copias con el hash del contenido
+en el nombre, junto con sus variantes .gz y .br:
+
+    flask estaticos extraer     # mueve los bloques en línea de las plantillas a static/
+    flask estaticos construir   # static/dist/<archivo>.<hash>.<ext> + .gz/.br + manifest.json
+
+Las plantillas enlazan los archivos con url_estatico('css/...'), que usa el
+nombre con hash si existe el manifiesto y el archivo original si no. Los
+archivos con hash se sirven desde /assets/ con Cache-Control immutable (su
+contenido no cambia nunca: un cambio genera otro nombre) y en la variante
+comprimida que acepte el navegador.
+
+Los bloques <script> con sintaxis de Jinja se quedan en la plantilla. Las
+variantes .br requieren el paquete Brotli; sin él solo se generan las .gz.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+
+import click
+from flask import current_app, request, send_from_directory, url_for
+
+try:
+    import brotli
+except ImportError:  # opcional: sin Brotli se sirven las variantes gzip
+    brotli = None
+
+CARPETA_DIST = 'dist'
+MANIFIESTO = 'manifest.json'
+EXTENSIONES = ('.css', '.js')
+UN_ANIO = 365 * 24 * 3600
+VARIANTES = (('br', '.br'), ('gzip', '.gz'))
+
+_BLOQUE = re.compile(r'^([ \t]*)<(style|script)>\n?(.*?)\n?[ \t]*</\2>[ \t]*$', re.S | re.M)
+
+_manifiesto = {'datos': None}
+
+
+# Extracción de los bloques en línea
+def _carpeta_estaticos():
+    return current_app.static_folder
+
+
+def extraer_bloques(ruta_plantilla, nombre_plantilla, carpeta_estaticos, ya_extraidos):
+    """Reemplaza los <style>/<script> sin Jinja de una plantilla por enlaces a
+    archivos en static/; devuelve la lista de archivos referenciados"""
+    with open(ruta_plantilla, encoding='utf-8') as archivo:
+        contenido = archivo.read()
+
+    base = os.path.splitext(nombre_plantilla)[0]
+    contadores = {'style': 0, 'script': 0}
+    referenciados = []
+
+    def reemplazar(coincidencia):
+        sangria, etiqueta, cuerpo = coincidencia.groups()
+        if '{{' in cuerpo or '{%' in cuerpo or not cuerpo.strip():
+            return coincidencia.group(0)
+
+        contadores[etiqueta] += 1
+        sufijo = '' if contadores[etiqueta] == 1 else f'-{contadores[etiqueta]}'
+        tipo, extension = ('css', 'css') if etiqueta == 'style' else ('js', 'js')
+        texto = cuerpo.strip('\n') + '\n'
+
+        # Bloques idénticos en varias plantillas comparten un archivo
+        nombre = ya_extraidos.get(texto) or f'{tipo}/paginas/{base}{sufijo}.{extension}'
+        if texto not in ya_extraidos:
+            ruta = os.path.join(carpeta_estaticos, nombre)
+            os.makedirs(os.path.dirname(ruta), exist_ok=True)
+            with open(ruta, 'w', encoding='utf-8') as archivo:
+                archivo.write(texto)
+            ya_extraidos[texto] = nombre
+        referenciados.append(nombre)
+
+        if etiqueta == 'style':
+            return f'{sangria}<link href="{{{{ url_estatico(\'{nombre}\') }}}}" rel="stylesheet">'
+        return f'{sangria}<script src="{{{{ url_estatico(\'{nombre}\') }}}}"></script>'
+
+    nuevo = _BLOQUE.sub(reemplazar, contenido)
+    if nuevo != contenido:
+        with open(ruta_plantilla, 'w', encoding='utf-8') as archivo:
+            archivo.write(nuevo)
+    return referenciados
+
+
+def extraer(app):
+    """Extrae los bloques en línea de todas las plantillas"""
+    carpeta_plantillas = os.path.join(app.root_path, app.template_folder)
+    ya_extraidos = {}
+    resultado = {}
+    for raiz, _, archivos in os.walk(carpeta_plantillas):
+        for nombre_archivo in sorted(archivos):
+            if not nombre_archivo.endswith('.html'):
+                continue
+            ruta = os.path.join(raiz, nombre_archivo)
+            nombre = os.path.relpath(ruta, carpeta_plantillas).replace(os.sep, '/')
+            referenciados = extraer_bloques(ruta, nombre, app.static_folder, ya_extraidos)
+            if referenciados:
+                resultado[nombre] = referenciados
+    return resultado
+
+
+# Construcción de los archivos con huella
+def construir(app):
+    """Genera static/dist con los archivos CSS/JS renombrados por hash, sus
+    variantes comprimidas y el manifiesto {original: con_hash}"""
+    origen = app.static_folder
+    destino = os.path.join(origen, CARPETA_DIST)
+    if os.path.isdir(destino):
+        shutil.rmtree(destino)
+    os.makedirs(destino)
+
+    manifiesto = {}
+    for raiz, carpetas, archivos in os.walk(origen):
+        carpetas[:] = [carpeta for carpeta in carpetas if os.path.join(raiz, carpeta) != destino]
+        for nombre_archivo in sorted(archivos):
+            if not nombre_archivo.endswith(EXTENSIONES):
+                continue
+            ruta = os.path.join(raiz, nombre_archivo)
+            nombre = os.path.relpath(ruta, origen).replace(os.sep, '/')
+            with open(ruta, 'rb') as archivo:
+                datos = archivo.read()
+
+            raiz_nombre, extension = os.path.splitext(nombre)
+            con_hash = f'{raiz_nombre}.{hashlib.sha256(datos).hexdigest()[:12]}{extension}'
+            ruta_destino = os.path.join(destino, con_hash)
+            os.makedirs(os.path.dirname(ruta_destino), exist_ok=True)
+            with open(ruta_destino, 'wb') as archivo:
+                archivo.write(datos)
+            with open(ruta_destino + '.gz', 'wb') as archivo:
+                archivo.write(gzip.compress(datos, compresslevel=9, mtime=0))
+            if brotli is not None:
+                with open(ruta_destino + '.br', 'wb') as archivo:
+                    archivo.write(brotli.compress(datos, quality=11))
+            manifiesto[nombre] = con_hash
+
+    with open(os.path.join(destino, MANIFIESTO), 'w', encoding='utf-8') as archivo:
+        json.dump(manifiesto, archivo, indent=2, sort_keys=True)
+    _manifiesto['datos'] = None
+    return manifiesto
+
+
+# Resolución y entrega
+def cargar_manifiesto():
+    # Se lee en la primera petición: con preload_app el maestro puede construir antes del fork
+    if _manifiesto['datos'] is None:
+        ruta = os.path.join(_carpeta_estaticos(), CARPETA_DIST, MANIFIESTO)
+        try:
+            with open(ruta, encoding='utf-8') as archivo:
+                _manifiesto['datos'] = json.load(archivo)
+        except FileNotFoundError:
+            _manifiesto['datos'] = {}
+    return _manifiesto['datos']
+
+
+def url_estatico(nombre):
+    """URL del archivo estático: la versión con hash si está construida"""
+    con_hash = cargar_manifiesto().get(nombre)
+    if con_hash is None:
+        return url_for('static', filename=nombre)
+    return url_for('estatico_versionado', nombre=con_hash)
+
+
+def servir_estatico_versionado(nombre):
+    carpeta = os.path.join(_carpeta_estaticos(), CARPETA_DIST)
+    aceptadas = request.accept_encodings
+    for codificacion, extension in VARIANTES:
+        if aceptadas[codificacion] and os.path.isfile(os.path.join(carpeta, nombre + extension)):
+            respuesta = send_from_directory(carpeta, nombre + extension, mimetype=_tipo_mime(nombre), max_age=UN_ANIO)
+            respuesta.headers['Content-Encoding'] = codificacion
+            break
+    else:
+        respuesta = send_from_directory(carpeta, nombre, max_age=UN_ANIO)
+    respuesta.vary.add('Accept-Encoding')
+    respuesta.cache_control.public = True
+    respuesta.cache_control.immutable = True
+    return respuesta
+
+
+def _tipo_mime(nombre):
+    return 'text/css' if nombre.endswith('.css') else 'text/javascript'
+
+
+# Comandos de línea
+@click.group('estaticos')
+def cli():
+    """Archivos estáticos con huella y precomprimidos"""
+
+
+@cli.command('extraer')
+def comando_extraer():
+    """Mueve los <style>/<script> en línea de las plantillas a static/"""
+    resultado = extraer(current_app)
+    for plantilla, archivos in resultado.items():
+        click.echo(f"✅ {plantilla}: {', '.join(archivos)}")
+    click.echo(f'✅ {len(resultado)} plantillas actualizadas')
+
+
+@cli.command('construir')
+def comando_construir():
+    """Genera static/dist con los archivos renombrados por hash y comprimidos"""
+    manifiesto = construir(current_app)
+    if brotli is None:
+        click.echo('⚠️  Brotli no está instalado: solo se generan variantes .gz')
+    click.echo(f'✅ {len(manifiesto)} archivos en static/{CARPETA_DIST}')
+
+
+def init_app(app):
+    app.cli.add_command(cli)
+    app.add_url_rule('/assets/<path:nombre>', 'estatico_versionado', servir_estatico_versionado)
+    app.jinja_env.globals['url_estatico'] = url_estatico
@@ -0,0 +1,130 @@
+"""
+Exportación de notas y matrículas en CSV
+
+Las filas se leen con `yield_per` (cursor del lado del servidor en
+PostgreSQL) y se envían al cliente a medida que se generan, de modo que
+exportar un millón de notas usa memoria constante en el worker y la
+descarga empieza de inmediato. Se usan las mismas uniones que las vistas
+admin_ver_notas y admin_matriculas.
+
+El archivo lleva BOM UTF-8 para que Excel lo abra con los acentos correctos.
+Los textos que empiezan con =, +, -, @, tabulación o retorno de carro se
+escriben precedidos de ' para que la hoja de cálculo no los ejecute como
+fórmulas (nombres y observaciones los escribe cualquier usuario).
+"""
+
+import csv
+import io
+from datetime import datetime
+
+from sqlalchemy import select
+
+from filtros import FiltrosNotas
+from models import db, Alumno, Docente, Materia, Matricula, Nota
+
+FILAS_POR_LOTE = 1000
+INICIOS_FORMULA = ('=', '+', '-', '@', '\t', '\r')
+
+COLUMNAS_NOTAS = [
+    ('ID', Nota.id),
+    ('Fecha', Nota.fecha),
+    ('DNI alumno', Alumno.dni),
+    ('Alumno', Alumno.apellido),
+    ('Nombre alumno', Alumno.nombre),
+    ('Código materia', Materia.codigo),
+    ('Materia', Materia.nombre),
+    ('Docente', Docente.apellido),
+    ('Nombre docente', Docente.nombre),
+    ('Tipo de evaluación', Nota.tipo_evaluacion),
+    ('Nota', Nota.nota),
+    ('Publicada', Nota.publicada),
+    ('Fecha de publicación', Nota.fecha_publicacion),
+    ('Observaciones', Nota.observaciones),
+]
+
+COLUMNAS_MATRICULAS = [
+    ('ID', Matricula.id),
+    ('Fecha de matrícula', Matricula.fecha_matricula),
+    ('Estado', Matricula.estado),
+    ('DNI alumno', Alumno.dni),
+    ('Alumno', Alumno.apellido),
+    ('Nombre alumno', Alumno.nombre),
+    ('Ciclo', Alumno.ciclo),
+    ('Código materia', Materia.codigo),
+    ('Materia', Materia.nombre),
+    ('Docente', Docente.apellido),
+    ('Nombre docente', Docente.nombre),
+    ('Observaciones', Matricula.observaciones),
+]
+
+
+def consulta_notas(filtros=None):
+    """Notas con alumno, materia y docente, de la más reciente a la más antigua"""
+    query = select(*[columna for _, columna in COLUMNAS_NOTAS]).select_from(Nota).join(
+        Alumno, Nota.alumno_id == Alumno.id
+    ).join(
+        Materia, Nota.materia_id == Materia.id
+    ).join(
+        Docente, Materia.docente_id == Docente.id
+    ).order_by(Nota.fecha.desc(), Nota.id.desc())
+    return (filtros or FiltrosNotas()).aplicar(query)
+
+
+def consulta_matriculas(estado=None, materia_id=None):
+    """Matrículas con alumno, materia y docente, de la más reciente a la más antigua"""
+    query = select(*[columna for _, columna in COLUMNAS_MATRICULAS]).select_from(Matricula).join(
+        Alumno, Matricula.alumno_id == Alumno.id
+    ).join(
+        Materia, Matricula.materia_id == Materia.id
+    ).join(
+        Docente, Materia.docente_id == Docente.id
+    ).order_by(Matricula.fecha_matricula.desc(), Matricula.id.desc())
+    if estado:
+        query = query.where(Matricula.estado == estado)
+    if materia_id is not None:
+        query = query.where(Matricula.materia_id == materia_id)
+    return query
+
+
+def _valor_csv(valor):
+    if valor is None:
+        return ''
+    if isinstance(valor, bool):
+        return 'Sí' if valor else 'No'
+    if isinstance(valor, datetime):
+        return valor.strftime('%Y-%m-%d %H:%M')
+    if isinstance(valor, str) and valor.startswith(INICIOS_FORMULA):
+        return "'" + valor
+    return valor
+
+
+def generar_csv(encabezados, query, filas_por_lote=FILAS_POR_LOTE):
+    """Genera el CSV por bloques leyendo la consulta en lotes de filas_por_lote"""
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+
+    buffer.write('\ufeff')
+    escritor.writerow(encabezados)
+    yield buffer.getvalue()
+
+    resultado = db.session.execute(query.execution_options(yield_per=filas_por_lote))
+    try:
+        for lote in resultado.partitions():
+            buffer.seek(0)
+            buffer.truncate()
+            escritor.writerows([_valor_csv(valor) for valor in fila] for fila in lote)
+            yield buffer.getvalue()
+    finally:
+        resultado.close()
+
+
+def exportar_notas(filtros=None):
+    return generar_csv([nombre for nombre, _ in COLUMNAS_NOTAS], consulta_notas(filtros))
+
+
+def exportar_matriculas(estado=None, materia_id=None):
+    return generar_csv([nombre for nombre, _ in COLUMNAS_MATRICULAS], consulta_matriculas(estado, materia_id))
+
+
+def nombre_archivo(prefijo):
+    return f"{prefijo}_{datetime.now().strftime('%Y%m%d_%H%M')}.csv"
@@ -0,0 +1,104 @@
+"""
+Filtros de notas traducidos a condiciones SQL
+
+Las vistas de notas filtraban en el navegador recorriendo toda la tabla;
+aquí los mismos filtros se convierten en predicados del query para que
+la base de datos solo devuelva las filas pedidas.
+"""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_
+
+from models import Materia, Nota
+
+# Bandas de aprobación usadas en todo el sistema
+RANGOS_NOTA = {
+    'aprobado': (13, None),       # nota >= 13
+    'recuperacion': (10, 13),     # 10 <= nota < 13
+    'desaprobado': (None, 10),    # nota < 10
+}
+
+
+def condicion_rango(rango):
+    """Condición SQL sobre Nota.nota para una banda de RANGOS_NOTA"""
+    minimo, maximo = RANGOS_NOTA[rango]
+    condiciones = []
+    if minimo is not None:
+        condiciones.append(Nota.nota >= minimo)
+    if maximo is not None:
+        condiciones.append(Nota.nota < maximo)
+    return and_(*condiciones)
+
+
+def _entero(valor):
+    try:
+        return int(valor) if valor not in (None, '') else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _fecha(valor):
+    try:
+        return datetime.strptime(valor, '%Y-%m-%d') if valor else None
+    except ValueError:
+        return None
+
+
+class FiltrosNotas:
+    """Criterios para acotar un query de notas.
+
+    El query debe incluir Nota y, si se filtra por docente, estar unido a Materia.
+    """
+
+    def __init__(self, materia_id=None, alumno_id=None, docente_id=None,
+                 fecha_desde=None, fecha_hasta=None, rango=None, publicada=None):
+        self.materia_id = materia_id
+        self.alumno_id = alumno_id
+        self.docente_id = docente_id
+        self.fecha_desde = fecha_desde
+        self.fecha_hasta = fecha_hasta
+        self.rango = rango if rango in RANGOS_NOTA else None
+        self.publicada = publicada
+
+    @classmethod
+    def desde_request(cls, args):
+        """Construye los filtros a partir de request.args ignorando valores inválidos"""
+        return cls(
+            materia_id=_entero(args.get('materia_id')),
+            alumno_id=_entero(args.get('alumno_id')),
+            docente_id=_entero(args.get('docente_id')),
+            fecha_desde=_fecha(args.get('fecha_desde')),
+            fecha_hasta=_fecha(args.get('fecha_hasta')),
+            rango=args.get('rango') or None,
+        )
+
+    def aplicar(self, query):
+        if self.materia_id is not None:
+            query = query.filter(Nota.materia_id == self.materia_id)
+        if self.alumno_id is not None:
+            query = query.filter(Nota.alumno_id == self.alumno_id)
+        if self.docente_id is not None:
+            query = query.filter(Materia.docente_id == self.docente_id)
+        if self.fecha_desde is not None:
+            query = query.filter(Nota.fecha >= self.fecha_desde)
+        if self.fecha_hasta is not None:
+            # La fecha final es inclusiva: se toma todo ese día
+            query = query.filter(Nota.fecha < self.fecha_hasta + timedelta(days=1))
+        if self.rango:
+            query = query.filter(condicion_rango(self.rango))
+        if self.publicada is not None:
+            query = query.filter(Nota.publicada == self.publicada)
+        return query
+
+    def como_args(self):
+        """Parámetros de URL para conservar los filtros al cambiar de página"""
+        args = {
+            'materia_id': self.materia_id,
+            'alumno_id': self.alumno_id,
+            'docente_id': self.docente_id,
+            'fecha_desde': self.fecha_desde.strftime('%Y-%m-%d') if self.fecha_desde else None,
+            'fecha_hasta': self.fecha_hasta.strftime('%Y-%m-%d') if self.fecha_hasta else None,
+            'rango': self.rango,
+        }
+        return {clave: valor for clave, valor in args.items() if valor is not None}
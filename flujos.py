@@ -0,0 +1,88 @@
+"""
+Páginas HTML enviadas por partes
+
+Con render_template el cliente no recibe nada hasta que toda la página está
+armada, y el worker tiene en memoria todas las filas y todo el HTML a la vez.
+Las páginas de tablas grandes se envían con stream_template: la plantilla se
+va escribiendo mientras las filas se leen de la base de datos en lotes
+(yield_per, cursor del lado del servidor en PostgreSQL).
+
+Jinja entrega el HTML en fragmentos de pocos bytes; agrupar() los junta en
+bloques de BLOQUE_BYTES antes de enviarlos, salvo en los puntos marcados con
+{{ enviar_ahora() }} en la plantilla, donde se envía lo acumulado sin
+esperar. Así el encabezado y las estadísticas llegan al navegador antes de
+leer las filas:
+
+    mensajes = get_flashed_messages(with_categories=True)
+    filas = flujos.filas_por_lotes(query)
+    return Response(flujos.agrupar(stream_template(
+        'admin/matriculas_moderno.html', matriculas=filas, mensajes=mensajes,
+    )))
+
+Una vez enviado el primer byte ya no se pueden cambiar las cabeceras ni la
+cookie de sesión, y un error ya no puede convertirse en una redirección:
+queda en el log del servidor y la página llega cortada. Por eso la vista
+hace antes todo lo que puede fallar o tocar la sesión: las consultas de
+estadísticas, la ejecución de la consulta de filas y get_flashed_messages()
+(si lo llamara la plantilla, los mensajes no se borrarían de la sesión y
+volverían a mostrarse en la página siguiente).
+"""
+
+from markupsafe import Markup
+from werkzeug.wsgi import ClosingIterator
+
+from models import db
+
+BLOQUE_BYTES = 16 * 1024
+FILAS_POR_LOTE = 500
+MARCA_ENVIO = '<!-- enviar -->'
+
+
+def filas_por_lotes(query, filas_por_lote=FILAS_POR_LOTE):
+    """Ejecuta la consulta en el momento, para que un error ocurra antes de
+    empezar a enviar, y devuelve sus filas leídas en lotes a medida que la
+    plantilla las pide"""
+    resultado = db.session.execute(query.execution_options(yield_per=filas_por_lote))
+    return _leer_filas(resultado)
+
+
+def _leer_filas(resultado):
+    try:
+        yield from resultado
+    finally:
+        resultado.close()
+
+
+def agrupar(fragmentos, bloque=BLOQUE_BYTES):
+    """Junta los fragmentos de la plantilla en bloques de al menos `bloque`
+    caracteres y envía lo acumulado en cada MARCA_ENVIO. close() cierra
+    siempre la plantilla, aunque no se haya pedido ningún bloque"""
+    return ClosingIterator(_agrupar(fragmentos, bloque), getattr(fragmentos, 'close', None))
+
+
+def _agrupar(fragmentos, bloque):
+    pendientes = []
+    tamano = 0
+    for fragmento in fragmentos:
+        if MARCA_ENVIO in fragmento:
+            # str(): los métodos de Markup escaparían la marca
+            antes, _, despues = str(fragmento).rpartition(MARCA_ENVIO)
+            pendientes.append(antes + MARCA_ENVIO)
+            yield ''.join(pendientes)
+            pendientes, tamano = [despues], len(despues)
+            continue
+        pendientes.append(fragmento)
+        tamano += len(fragmento)
+        if tamano >= bloque:
+            yield ''.join(pendientes)
+            pendientes, tamano = [], 0
+    if pendientes:
+        yield ''.join(pendientes)
+
+
+def enviar_ahora():
+    return Markup(MARCA_ENVIO)
+
+
+def init_app(app):
+    app.jinja_env.globals['enviar_ahora'] = enviar_ahora
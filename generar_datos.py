@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Generador de datos sintéticos para pruebas de rendimiento
+
+Llena usuarios, docentes, alumnos, materias, matrículas y notas a la
+escala indicada, con inserciones masivas por lotes, en SQLite o en un
+PostgreSQL local:
+
+    python generar_datos.py --db sqlite:////tmp/benchmark.db --alumnos 50000 --materias 2000 --notas 2000000
+    python generar_datos.py --db postgresql://localhost/notas_bench --alumnos 5000
+
+Todos los usuarios generados tienen la contraseña CLAVE_GENERADOS (el
+administrador sigue siendo admin / admin123). Los datos se agregan a los
+existentes; usa una base de datos aparte, nunca la de producción.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+CLAVE_GENERADOS = 'clave123'
+TIPOS_EVALUACION = ['Parcial', 'Final', 'Trabajo Práctico', 'Examen', 'Tarea', 'Proyecto']
+NOMBRES = ['Ana', 'Luis', 'María', 'José', 'Carmen', 'Jorge', 'Lucía', 'Carlos', 'Rosa', 'Pedro',
+           'Elena', 'Miguel', 'Sofía', 'Diego', 'Valeria', 'Andrés', 'Paula', 'Fernando', 'Julia', 'Raúl']
+APELLIDOS = ['García', 'Rodríguez', 'López', 'Martínez', 'Sánchez', 'Pérez', 'Gómez', 'Díaz', 'Torres', 'Ramírez',
+             'Flores', 'Vargas', 'Castro', 'Rojas', 'Mendoza', 'Quispe', 'Huamán', 'Chávez', 'Ríos', 'Salazar']
+ESPECIALIDADES = ['Matemática', 'Comunicación', 'Ciencias', 'Historia', 'Inglés', 'Computación', 'Arte', 'Física']
+
+
+def parsear_argumentos():
+    parser = argparse.ArgumentParser(description='Genera datos sintéticos para el Sistema de Notas')
+    parser.add_argument('--db', default=os.environ.get('DATABASE_URL', 'sqlite:////tmp/benchmark.db'),
+                        help='URL de la base de datos (por defecto DATABASE_URL o /tmp/benchmark.db)')
+    parser.add_argument('--alumnos', type=int, default=2000)
+    parser.add_argument('--docentes', type=int, default=100)
+    parser.add_argument('--materias', type=int, default=200)
+    parser.add_argument('--materias-por-alumno', type=int, default=6, help='Matrículas de cada alumno')
+    parser.add_argument('--notas', type=int, default=50000, help='Total de notas a generar')
+    parser.add_argument('--publicadas', type=float, default=0.7, help='Proporción de notas publicadas')
+    parser.add_argument('--lote', type=int, default=10000, help='Filas por INSERT')
+    parser.add_argument('--semilla', type=int, default=42)
+    return parser.parse_args()
+
+
+def insertar(conexion, tabla, filas, lote):
+    """Inserta las filas (iterable de diccionarios) en INSERT de `lote` filas"""
+    pendientes = []
+    total = 0
+    for fila in filas:
+        pendientes.append(fila)
+        if len(pendientes) >= lote:
+            conexion.execute(tabla.insert(), pendientes)
+            total += len(pendientes)
+            pendientes = []
+    if pendientes:
+        conexion.execute(tabla.insert(), pendientes)
+        total += len(pendientes)
+    return total
+
+
+def siguiente_id(conexion, tabla):
+    from sqlalchemy import func, select
+    return (conexion.execute(select(func.max(tabla.c.id))).scalar() or 0) + 1
+
+
+def generar(args):
+    # La URL debe estar definida antes de importar la aplicación
+    os.environ['DATABASE_URL'] = args.db
+    from werkzeug.security import generate_password_hash
+    from app import app, init_db
+    from models import db, Usuario, Alumno, Docente, Materia, Matricula, Nota, CICLOS
+    import busqueda
+    import contadores
+    import migraciones
+
+    aleatorio = random.Random(args.semilla)
+    ahora = datetime.utcnow()
+    # Un solo hash para todos: calcular miles de hashes tardaría más que el resto
+    clave = generate_password_hash(CLAVE_GENERADOS)
+
+    def persona():
+        return aleatorio.choice(NOMBRES), f'{aleatorio.choice(APELLIDOS)} {aleatorio.choice(APELLIDOS)}'
+
+    def fecha_pasada(dias):
+        return ahora - timedelta(days=aleatorio.randint(0, dias), seconds=aleatorio.randint(0, 86399))
+
+    init_db()
+    with app.app_context():
+        migraciones.aplicar_migraciones()
+
+        with db.engine.begin() as conexion:
+            usuarios, docentes, alumnos, materias, matriculas, notas = (
+                modelo.__table__ for modelo in (Usuario, Docente, Alumno, Materia, Matricula, Nota)
+            )
+            inicio = time.perf_counter()
+
+            # Docentes con su usuario
+            id_usuario = siguiente_id(conexion, usuarios)
+            id_docente = siguiente_id(conexion, docentes)
+            filas_usuarios = []
+            filas_docentes = []
+            for i in range(args.docentes):
+                nombre, apellido = persona()
+                usuario_id, docente_id = id_usuario + i, id_docente + i
+                filas_usuarios.append({
+                    'id': usuario_id, 'username': f'docente{docente_id}', 'email': f'docente{docente_id}@bench.local',
+                    'password_hash': clave, 'tipo': 'docente', 'fecha_creacion': ahora,
+                })
+                filas_docentes.append({
+                    'id': docente_id, 'dni': f'D{docente_id:08d}', 'nombre': nombre, 'apellido': apellido,
+                    'email': f'docente{docente_id}@bench.local', 'especialidad': aleatorio.choice(ESPECIALIDADES),
+                    'usuario_id': usuario_id, 'estado': 'activo', 'fecha_registro': fecha_pasada(365),
+                    'fecha_ultima_actividad': ahora, 'fecha_cambio_estado': ahora,
+                })
+            insertar(conexion, usuarios, filas_usuarios, args.lote)
+            insertar(conexion, docentes, filas_docentes, args.lote)
+            ids_docentes = [fila['id'] for fila in filas_docentes]
+            print(f'✅ {args.docentes} docentes')
+
+            # Alumnos con su usuario
+            id_usuario = siguiente_id(conexion, usuarios)
+            id_alumno = siguiente_id(conexion, alumnos)
+
+            def filas_usuarios_alumnos():
+                for i in range(args.alumnos):
+                    alumno_id = id_alumno + i
+                    yield {
+                        'id': id_usuario + i, 'username': f'alumno{alumno_id}', 'email': f'alumno{alumno_id}@bench.local',
+                        'password_hash': clave, 'tipo': 'alumno', 'fecha_creacion': ahora,
+                    }
+
+            def filas_alumnos():
+                for i in range(args.alumnos):
+                    nombre, apellido = persona()
+                    alumno_id = id_alumno + i
+                    yield {
+                        'id': alumno_id, 'dni': f'A{alumno_id:08d}', 'nombre': nombre, 'apellido': apellido,
+                        'email': f'alumno{alumno_id}@bench.local', 'ciclo': aleatorio.choice(CICLOS),
+                        'usuario_id': id_usuario + i, 'fecha_registro': fecha_pasada(365),
+                    }
+
+            insertar(conexion, usuarios, filas_usuarios_alumnos(), args.lote)
+            insertar(conexion, alumnos, filas_alumnos(), args.lote)
+            ids_alumnos = range(id_alumno, id_alumno + args.alumnos)
+            print(f'✅ {args.alumnos} alumnos')
+
+            # Materias repartidas entre los docentes
+            id_materia = siguiente_id(conexion, materias)
+            insertar(conexion, materias, (
+                {
+                    'id': id_materia + i, 'nombre': f'{aleatorio.choice(ESPECIALIDADES)} {i + 1}',
+                    'codigo': f'M{id_materia + i:06d}', 'docente_id': ids_docentes[i % len(ids_docentes)],
+                    'fecha_creacion': fecha_pasada(365),
+                }
+                for i in range(args.materias)
+            ), args.lote)
+            ids_materias = list(range(id_materia, id_materia + args.materias))
+            print(f'✅ {args.materias} materias')
+
+            # Matrículas: cada alumno en materias_por_alumno materias distintas
+            por_alumno = min(args.materias_por_alumno, len(ids_materias))
+            pares = [
+                (alumno_id, materia_id)
+                for alumno_id in ids_alumnos
+                for materia_id in aleatorio.sample(ids_materias, por_alumno)
+            ]
+            insertar(conexion, matriculas, (
+                {
+                    'alumno_id': alumno_id, 'materia_id': materia_id, 'fecha_matricula': fecha_pasada(180),
+                    'estado': 'activa' if aleatorio.random() < 0.9 else aleatorio.choice(['completada', 'cancelada']),
+                    'observaciones': '',
+                }
+                for alumno_id, materia_id in pares
+            ), args.lote)
+            print(f'✅ {len(pares)} matrículas')
+
+            # Notas sobre matrículas al azar
+            def filas_notas():
+                for _ in range(args.notas):
+                    alumno_id, materia_id = aleatorio.choice(pares)
+                    publicada = aleatorio.random() < args.publicadas
+                    fecha = fecha_pasada(180)
+                    yield {
+                        'alumno_id': alumno_id, 'materia_id': materia_id, 'nota': float(aleatorio.randint(0, 20)),
+                        'tipo_evaluacion': aleatorio.choice(TIPOS_EVALUACION), 'fecha': fecha, 'observaciones': '',
+                        'publicada': publicada, 'fecha_publicacion': fecha if publicada else None,
+                    }
+
+            total_notas = insertar(conexion, notas, filas_notas(), args.lote) if pares else 0
+            print(f'✅ {total_notas} notas')
+
+            # Las inserciones directas no pasan por los eventos que mantienen los contadores y el índice
+            contadores.reconstruir_contadores(conexion)
+            busqueda.reconstruir_indice(conexion)
+            print(f'⏱️  {time.perf_counter() - inicio:.1f} s')
+
+    print(f'👤 Usuarios generados: docente<N> / alumno<N> con contraseña {CLAVE_GENERADOS}')
+
+
+if __name__ == '__main__':
+    try:
+        generar(parsear_argumentos())
+    except KeyboardInterrupt:
+        sys.exit(1)
@@ -0,0 +1,53 @@
+"""
+Configuración de gunicorn para producción
+
+    gunicorn -c gunicorn.conf.py wsgi:application
+
+La aplicación se carga una sola vez en el proceso maestro (preload_app) y
+los workers se crean con fork a partir de ella, así que la inicialización
+corre una vez por despliegue y no una vez por worker. Cada worker atiende
+varias peticiones a la vez con hilos (gthread); con PostgreSQL conviene que
+DB_POOL_SIZE sea al menos GUNICORN_THREADS.
+
+Todos los valores se pueden cambiar con variables de entorno:
+
+- GUNICORN_WORKERS: procesos (por defecto 2 x núcleos + 1)
+- GUNICORN_THREADS: hilos por proceso (por defecto 4)
+- GUNICORN_PRELOAD: 0 para cargar la aplicación en cada worker
+- GUNICORN_MAX_REQUESTS / GUNICORN_MAX_REQUESTS_JITTER: reiniciar cada worker
+  tras ese número de peticiones (más un valor al azar) para liberar memoria
+- GUNICORN_TIMEOUT, GUNICORN_GRACEFUL_TIMEOUT, GUNICORN_KEEPALIVE: segundos
+"""
+
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 8000)}"
+
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') == '1'
+
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+accesslog = os.environ.get('GUNICORN_ACCESSLOG', '-')
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOGLEVEL', 'info')
+
+
+def post_fork(server, worker):
+    """Descartar las conexiones abiertas por el maestro: no se pueden compartir entre procesos"""
+    if not preload_app:
+        return
+    from wsgi import application
+    from models import db
+
+    with application.app_context():
+        db.engine.dispose(close=False)
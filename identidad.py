@@ -0,0 +1,83 @@
+"""
+Identidad del usuario de cada petición
+
+Las rutas del docente consultaban el Usuario y su Docente en
+verificar_estado_docente() y otra vez para obtener el docente_id; las del
+alumno buscaban su Alumno por usuario_id en cada página. Ahora un
+before_request carga con una sola consulta el usuario y su docente o
+alumno y los deja en flask.g:
+
+    g.usuario, g.docente, g.alumno   (None si no corresponde)
+
+Además aplica las comprobaciones comunes antes de llegar a la ruta:
+
+- si el usuario ya no existe se cierra la sesión
+- el tipo guardado en la sesión se corrige con el de la base de datos
+- un docente inactivo o suspendido pierde la sesión con el mensaje habitual
+
+Las guardas de cada ruta (session['tipo']) se encargan luego de
+redirigir al login o de responder 401 según corresponda.
+"""
+
+from flask import flash, g, request, session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from models import db, Usuario, Docente, Alumno
+
+MENSAJES_ESTADO_DOCENTE = {
+    'inactivo': 'Tu cuenta de docente está inactiva. Contacta al administrador para reactivarla.',
+    'suspendido': 'Tu cuenta de docente está suspendida. Contacta al administrador para más información.',
+}
+
+
+def _cargar(condicion):
+    fila = db.session.query(Usuario, Docente, Alumno).outerjoin(
+        Docente, Docente.usuario_id == Usuario.id
+    ).outerjoin(
+        Alumno, Alumno.usuario_id == Usuario.id
+    ).filter(condicion).first()
+    if fila is None:
+        return None, None, None
+
+    usuario, docente, alumno = fila
+    # Dejar cargadas las relaciones para que usuario.docente y usuario.alumno no consulten de nuevo
+    set_committed_value(usuario, 'docente', docente)
+    set_committed_value(usuario, 'alumno', alumno)
+    return usuario, docente, alumno
+
+
+def cargar_identidad(usuario_id):
+    """Usuario, docente y alumno asociados en una sola consulta"""
+    return _cargar(Usuario.id == usuario_id)
+
+
+def buscar_por_username(username):
+    """Como cargar_identidad, a partir del nombre de usuario (login)"""
+    return _cargar(Usuario.username == username)
+
+
+def resolver_identidad():
+    g.usuario = g.docente = g.alumno = None
+    if request.endpoint in ('static', 'estatico_versionado') or not session.get('user_id'):
+        return
+
+    usuario, docente, alumno = cargar_identidad(session['user_id'])
+    if usuario is None:
+        session.clear()
+        return
+
+    if session.get('tipo') != usuario.tipo:
+        session['tipo'] = usuario.tipo
+
+    if usuario.tipo == 'docente' and docente is not None and docente.estado in MENSAJES_ESTADO_DOCENTE:
+        session.clear()
+        flash(MENSAJES_ESTADO_DOCENTE[docente.estado], 'error')
+        return
+
+    g.usuario = usuario
+    g.docente = docente if usuario.tipo == 'docente' else None
+    g.alumno = alumno if usuario.tipo == 'alumno' else None
+
+
+def init_app(app):
+    app.before_request(resolver_identidad)
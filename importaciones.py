@@ -0,0 +1,281 @@
+"""
+Importación masiva de alumnos, docentes y matrículas desde CSV
+
+El archivo se lee como flujo, fila por fila, y se procesa en lotes de
+TAMANO_LOTE filas. Por cada lote:
+
+- se validan los campos y se normaliza el ciclo con convertir_ciclo_a_texto
+- los DNI, emails, alumnos y materias se comprueban con una consulta por
+  lote (IN ...) en lugar de una consulta por fila
+- las filas válidas se insertan con un único INSERT de varias filas
+
+Las filas con errores se informan con su número de línea y no impiden
+que se guarden las demás.
+
+    flask importar alumnos alumnos.csv
+"""
+
+import csv
+import io
+from datetime import datetime
+
+import click
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+
+from models import db, Alumno, Docente, Materia, Matricula, CICLOS, convertir_ciclo_a_texto
+
+TAMANO_LOTE = 500
+ESTADOS_MATRICULA = ('activa', 'completada', 'cancelada')
+
+# Columnas reconocidas por tipo de importación (las marcadas con * son obligatorias)
+COLUMNAS = {
+    'alumnos': ['dni*', 'nombre*', 'apellido*', 'ciclo*', 'email', 'telefono', 'fecha_nacimiento'],
+    'docentes': ['dni*', 'nombre*', 'apellido*', 'email*', 'telefono', 'direccion', 'especialidad', 'fecha_nacimiento'],
+    'matriculas': ['dni*', 'codigo_materia*', 'estado', 'observaciones'],
+}
+
+
+def columnas_obligatorias(tipo):
+    return [columna.rstrip('*') for columna in COLUMNAS[tipo] if columna.endswith('*')]
+
+
+def leer_csv(archivo):
+    """Recorre un CSV (binario o de texto) como diccionarios sin cargarlo entero.
+
+    Acepta coma o punto y coma como separador y encabezados en cualquier
+    combinación de mayúsculas.
+    """
+    if isinstance(archivo, io.TextIOBase):
+        texto = archivo
+    else:
+        texto = io.TextIOWrapper(archivo, encoding='utf-8-sig', newline='')
+    encabezado = texto.readline()
+    separador = ';' if encabezado.count(';') > encabezado.count(',') else ','
+    columnas = [columna.strip().lower() for columna in next(csv.reader([encabezado], delimiter=separador), [])]
+    for fila in csv.DictReader(texto, fieldnames=columnas, delimiter=separador):
+        yield {clave: (valor or '').strip() for clave, valor in fila.items() if clave}
+
+
+def _fecha(valor):
+    if not valor:
+        return None
+    for formato in ('%Y-%m-%d', '%d/%m/%Y'):
+        try:
+            return datetime.strptime(valor, formato).date()
+        except ValueError:
+            continue
+    raise ValueError(f'Fecha inválida: {valor}')
+
+
+# Validación de cada tipo: recibe el lote [(linea, fila)] y los valores ya
+# vistos en lotes anteriores; devuelve (filas_a_insertar, errores)
+def _validar_alumnos(lote, vistos):
+    errores = []
+    candidatas = []
+    for linea, fila in lote:
+        try:
+            ciclo = convertir_ciclo_a_texto(fila['ciclo'])
+            if ciclo not in CICLOS:
+                raise ValueError(f"Ciclo inválido: {fila['ciclo']}")
+            candidatas.append((linea, {
+                'dni': fila['dni'],
+                'nombre': fila['nombre'],
+                'apellido': fila['apellido'],
+                'ciclo': ciclo,
+                'email': fila.get('email') or None,
+                'telefono': fila.get('telefono') or None,
+                'fecha_nacimiento': _fecha(fila.get('fecha_nacimiento')),
+                'fecha_registro': datetime.utcnow(),
+            }))
+        except ValueError as e:
+            errores.append((linea, fila.get('dni'), str(e)))
+
+    existentes = {dni for (dni,) in db.session.query(Alumno.dni).filter(
+        Alumno.dni.in_([datos['dni'] for _, datos in candidatas])
+    )}
+    validas = []
+    for linea, datos in candidatas:
+        if datos['dni'] in existentes:
+            errores.append((linea, datos['dni'], 'Ya existe un alumno con ese DNI'))
+        elif datos['dni'] in vistos:
+            errores.append((linea, datos['dni'], 'DNI repetido en el archivo'))
+        else:
+            vistos.add(datos['dni'])
+            validas.append((linea, datos))
+    return validas, errores
+
+
+def _validar_docentes(lote, vistos):
+    errores = []
+    candidatas = []
+    for linea, fila in lote:
+        try:
+            candidatas.append((linea, {
+                'dni': fila['dni'],
+                'nombre': fila['nombre'],
+                'apellido': fila['apellido'],
+                'email': fila['email'],
+                'telefono': fila.get('telefono') or '',
+                'direccion': fila.get('direccion') or '',
+                'especialidad': fila.get('especialidad') or '',
+                'fecha_nacimiento': _fecha(fila.get('fecha_nacimiento')),
+                'estado': 'activo',
+                'fecha_registro': datetime.utcnow(),
+                'fecha_ultima_actividad': datetime.utcnow(),
+                'fecha_cambio_estado': datetime.utcnow(),
+            }))
+        except ValueError as e:
+            errores.append((linea, fila.get('dni'), str(e)))
+
+    dnis = [datos['dni'] for _, datos in candidatas]
+    emails = [datos['email'] for _, datos in candidatas]
+    dnis_existentes = {dni for (dni,) in db.session.query(Docente.dni).filter(Docente.dni.in_(dnis))}
+    emails_existentes = {email for (email,) in db.session.query(Docente.email).filter(Docente.email.in_(emails))}
+    validas = []
+    for linea, datos in candidatas:
+        if datos['dni'] in dnis_existentes:
+            errores.append((linea, datos['dni'], 'Ya existe un docente con ese DNI'))
+        elif datos['email'] in emails_existentes:
+            errores.append((linea, datos['dni'], 'Ya existe un docente con ese email'))
+        elif ('dni', datos['dni']) in vistos or ('email', datos['email']) in vistos:
+            errores.append((linea, datos['dni'], 'DNI o email repetido en el archivo'))
+        else:
+            vistos.update({('dni', datos['dni']), ('email', datos['email'])})
+            validas.append((linea, datos))
+    return validas, errores
+
+
+def _validar_matriculas(lote, vistos):
+    errores = []
+    alumnos = {dni: alumno_id for alumno_id, dni in db.session.query(Alumno.id, Alumno.dni).filter(
+        Alumno.dni.in_({fila['dni'] for _, fila in lote})
+    )}
+    materias = {codigo: materia_id for materia_id, codigo in db.session.query(Materia.id, Materia.codigo).filter(
+        Materia.codigo.in_({fila['codigo_materia'] for _, fila in lote})
+    )}
+
+    candidatas = []
+    for linea, fila in lote:
+        estado = (fila.get('estado') or 'activa').lower()
+        if fila['dni'] not in alumnos:
+            errores.append((linea, fila['dni'], 'No existe un alumno con ese DNI'))
+        elif fila['codigo_materia'] not in materias:
+            errores.append((linea, fila['dni'], f"No existe la materia {fila['codigo_materia']}"))
+        elif estado not in ESTADOS_MATRICULA:
+            errores.append((linea, fila['dni'], f"Estado inválido: {fila['estado']}"))
+        else:
+            candidatas.append((linea, fila['dni'], {
+                'alumno_id': alumnos[fila['dni']],
+                'materia_id': materias[fila['codigo_materia']],
+                'estado': estado,
+                'observaciones': fila.get('observaciones') or '',
+                'fecha_matricula': datetime.utcnow(),
+            }))
+
+    existentes = {(alumno_id, materia_id) for alumno_id, materia_id in db.session.query(
+        Matricula.alumno_id, Matricula.materia_id
+    ).filter(
+        Matricula.alumno_id.in_({datos['alumno_id'] for _, _, datos in candidatas}),
+        Matricula.materia_id.in_({datos['materia_id'] for _, _, datos in candidatas})
+    )}
+    validas = []
+    for linea, dni, datos in candidatas:
+        par = (datos['alumno_id'], datos['materia_id'])
+        if par in existentes:
+            errores.append((linea, dni, 'El alumno ya está matriculado en esta materia'))
+        elif par in vistos:
+            errores.append((linea, dni, 'Matrícula repetida en el archivo'))
+        else:
+            vistos.add(par)
+            validas.append((linea, datos))
+    return validas, errores
+
+
+TIPOS = {
+    'alumnos': (Alumno, _validar_alumnos),
+    'docentes': (Docente, _validar_docentes),
+    'matriculas': (Matricula, _validar_matriculas),
+}
+
+
+def _insertar_lote(modelo, validas):
+    """Inserta el lote con un solo INSERT; si choca con una restricción
+    (p. ej. una alta concurrente) reintenta fila por fila para salvar las demás"""
+    try:
+        db.session.execute(insert(modelo), [datos for _, datos in validas])
+        db.session.commit()
+        return len(validas), []
+    except IntegrityError:
+        db.session.rollback()
+
+    insertadas = 0
+    errores = []
+    for linea, datos in validas:
+        try:
+            db.session.execute(insert(modelo), [datos])
+            db.session.commit()
+            insertadas += 1
+        except IntegrityError:
+            db.session.rollback()
+            errores.append((linea, datos.get('dni'), 'El registro ya existe'))
+    return insertadas, errores
+
+
+def importar_csv(tipo, archivo, tamano_lote=TAMANO_LOTE):
+    """Importa un CSV de alumnos, docentes o matrículas.
+
+    Devuelve un diccionario con las filas procesadas, las insertadas y la
+    lista de errores [{'linea', 'dni', 'error'}] ordenada por línea.
+    """
+    modelo, validar = TIPOS[tipo]
+    obligatorias = columnas_obligatorias(tipo)
+    resultado = {'procesadas': 0, 'insertadas': 0, 'errores': []}
+    vistos = set()
+    lote = []
+
+    def procesar(lote):
+        validas, errores = validar(lote, vistos)
+        if validas:
+            insertadas, errores_insercion = _insertar_lote(modelo, validas)
+            resultado['insertadas'] += insertadas
+            errores += errores_insercion
+        resultado['errores'].extend({'linea': linea, 'dni': dni, 'error': error} for linea, dni, error in errores)
+
+    # La línea 1 es el encabezado
+    for linea, fila in enumerate(leer_csv(archivo), start=2):
+        if not any(fila.values()):
+            continue
+        resultado['procesadas'] += 1
+        faltantes = [columna for columna in obligatorias if not fila.get(columna)]
+        if faltantes:
+            resultado['errores'].append({
+                'linea': linea, 'dni': fila.get('dni'), 'error': f"Faltan campos: {', '.join(faltantes)}"
+            })
+            continue
+        lote.append((linea, fila))
+        if len(lote) >= tamano_lote:
+            procesar(lote)
+            lote = []
+    if lote:
+        procesar(lote)
+
+    resultado['errores'].sort(key=lambda error: error['linea'])
+    return resultado
+
+
+# Comandos de línea
+@click.command('importar')
+@click.argument('tipo', type=click.Choice(list(TIPOS)))
+@click.argument('archivo', type=click.File('rb'))
+@click.option('--lote', default=TAMANO_LOTE, help='Filas por lote')
+def cli(tipo, archivo, lote):
+    """Importa alumnos, docentes o matrículas desde un CSV"""
+    resultado = importar_csv(tipo, archivo, tamano_lote=lote)
+    for error in resultado['errores']:
+        click.echo(f"❌ Línea {error['linea']}: {error['error']}")
+    click.echo(f"✅ {resultado['insertadas']} de {resultado['procesadas']} filas importadas")
+
+
+def init_app(app):
+    app.cli.add_command(cli)
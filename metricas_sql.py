@@ -0,0 +1,151 @@
+"""
+Consultas SQL y tiempo de base de datos por petición
+
+Cada sentencia que pasa por el motor se cuenta y se cronometra con los
+eventos before/after_cursor_execute. Al terminar la petición:
+
+- se añade la cabecera Server-Timing (visible en las herramientas de
+  desarrollo del navegador):
+
+      Server-Timing: db;dur=12.4;desc="18 consultas", app;dur=35.0
+
+- si una misma sentencia (mismo SQL con distintos parámetros) se repite
+  METRICAS_SQL_REPETICIONES veces o más, se marca como probable N+1 y se
+  registra un aviso en el log
+- la petición queda en el historial de las últimas METRICAS_SQL_HISTORIAL,
+  que el administrador ve en /admin/rendimiento
+
+Está activado solo en desarrollo (FLASK_ENV=development o FLASK_DEBUG=1) o
+con METRICAS_SQL=1: la cabecera Server-Timing llega a cualquier visitante,
+incluso sin sesión, y muestra detalles internos. En las respuestas por
+flujo (exportaciones CSV) solo se cuentan las consultas hechas antes de
+empezar a enviar.
+"""
+
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+
+from flask import g, has_app_context, request
+from sqlalchemy import event
+
+from models import db
+
+REPETICIONES_N1 = 5
+TAMANO_HISTORIAL = 200
+LARGO_SQL = 300
+
+
+class Historial:
+    """Últimas peticiones medidas, de la más reciente a la más antigua"""
+
+    def __init__(self, maximo=TAMANO_HISTORIAL):
+        self._peticiones = deque(maxlen=maximo)
+        self._lock = threading.Lock()
+
+    def registrar(self, peticion):
+        with self._lock:
+            self._peticiones.appendleft(peticion)
+
+    def recientes(self):
+        with self._lock:
+            return list(self._peticiones)
+
+    def limpiar(self):
+        with self._lock:
+            self._peticiones.clear()
+
+    def redimensionar(self, maximo):
+        with self._lock:
+            self._peticiones = deque(self._peticiones, maxlen=maximo)
+
+
+historial = Historial()
+
+
+def _medicion_actual():
+    if not has_app_context():
+        return None
+    return g.get('metricas_sql')
+
+
+# Eventos del motor
+def _antes_de_ejecutar(conexion, cursor, sentencia, parametros, contexto, executemany):
+    conexion.info['metricas_inicio'] = time.perf_counter()
+
+
+def _despues_de_ejecutar(conexion, cursor, sentencia, parametros, contexto, executemany):
+    medicion = _medicion_actual()
+    if medicion is None:
+        return
+    medicion['consultas'] += 1
+    medicion['tiempo_db'] += time.perf_counter() - conexion.info.pop('metricas_inicio', time.perf_counter())
+    medicion['sentencias'][sentencia] += 1
+
+
+# Eventos de la aplicación
+def _iniciar_medicion():
+    g.metricas_sql = {
+        'inicio': time.perf_counter(),
+        'consultas': 0,
+        'tiempo_db': 0.0,
+        'sentencias': Counter(),
+    }
+
+
+def _terminar_medicion(app, respuesta):
+    medicion = g.pop('metricas_sql', None)
+    if medicion is None:
+        return respuesta
+
+    total_ms = (time.perf_counter() - medicion['inicio']) * 1000
+    db_ms = medicion['tiempo_db'] * 1000
+    umbral = app.config.get('METRICAS_SQL_REPETICIONES', REPETICIONES_N1)
+    repetidas = [
+        (sentencia[:LARGO_SQL], veces)
+        for sentencia, veces in medicion['sentencias'].most_common()
+        if veces >= umbral
+    ]
+
+    respuesta.headers.add(
+        'Server-Timing',
+        f'db;dur={db_ms:.1f};desc="{medicion["consultas"]} consultas", app;dur={total_ms:.1f}'
+    )
+    if repetidas:
+        respuesta.headers.add('Server-Timing', f'n1;desc="{len(repetidas)} sentencias repetidas"')
+        app.logger.warning(
+            f"Posible N+1 en {request.method} {request.path}: "
+            + '; '.join(f'{veces}x {sentencia[:80]}' for sentencia, veces in repetidas)
+        )
+
+    if request.endpoint not in ('static', 'estatico_versionado'):
+        historial.registrar({
+            'fecha': datetime.now(),
+            'metodo': request.method,
+            'ruta': request.full_path.rstrip('?'),
+            'endpoint': request.endpoint,
+            'estado': respuesta.status_code,
+            'duracion_ms': total_ms,
+            'consultas': medicion['consultas'],
+            'tiempo_db_ms': db_ms,
+            'repetidas': repetidas,
+        })
+    return respuesta
+
+
+def init_app(app):
+    if not app.config.get('METRICAS_SQL', False):
+        return
+    historial.redimensionar(app.config.get('METRICAS_SQL_HISTORIAL', TAMANO_HISTORIAL))
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', _antes_de_ejecutar)
+        event.listen(db.engine, 'after_cursor_execute', _despues_de_ejecutar)
+
+    # Se registra antes que los demás before_request para medir también sus consultas
+    app.before_request(_iniciar_medicion)
+
+    @app.after_request
+    def _agregar_server_timing(respuesta):
+        return _terminar_medicion(app, respuesta)
@@ -0,0 +1,363 @@
+"""
+Migraciones versionadas del esquema
+
+db.create_all() solo crea las tablas que faltan: nunca agrega índices ni
+columnas a una base de datos que ya existe. Este módulo registra cambios
+de esquema numerados, guarda en la tabla schema_version cuáles ya se
+aplicaron y expone los comandos:
+
+    flask migraciones estado      # versiones aplicadas y pendientes
+    flask migraciones aplicar     # aplica las migraciones pendientes
+    flask migraciones verificar   # comprueba que existan los índices de los modelos
+"""
+
+from contextlib import contextmanager
+from datetime import datetime
+
+import click
+from sqlalchemy import (
+    Column, DateTime, Integer, MetaData, String, Table, column, func, inspect, or_, select, table, text, update
+)
+
+from models import db, Nota, TIPO_EVALUACION_POR_DEFECTO
+
+TABLA_VERSIONES = 'schema_version'
+
+_metadata_versiones = MetaData()
+schema_version = Table(
+    TABLA_VERSIONES, _metadata_versiones,
+    Column('version', Integer, primary_key=True),
+    Column('nombre', String(200), nullable=False),
+    Column('fecha_aplicacion', DateTime, nullable=False),
+)
+
+
+class Migracion:
+    """Un cambio de esquema numerado.
+
+    Las migraciones no transaccionales se ejecutan en modo AUTOCOMMIT; es
+    obligatorio para CREATE INDEX CONCURRENTLY en PostgreSQL.
+    """
+
+    def __init__(self, version, nombre, funcion, transaccional=True):
+        self.version = version
+        self.nombre = nombre
+        self.funcion = funcion
+        self.transaccional = transaccional
+
+
+MIGRACIONES = []
+
+
+def migracion(version, nombre, transaccional=True):
+    """Decorador que registra una función como migración"""
+    def registrar(funcion):
+        if any(m.version == version for m in MIGRACIONES):
+            raise ValueError(f'La migración {version} ya está registrada')
+        MIGRACIONES.append(Migracion(version, nombre, funcion, transaccional))
+        MIGRACIONES.sort(key=lambda m: m.version)
+        return funcion
+    return registrar
+
+
+# Utilidades para índices
+def es_postgresql(engine):
+    return engine.dialect.name == 'postgresql'
+
+
+def obtener_indice(nombre):
+    """Busca en los modelos la definición de un índice por su nombre"""
+    for tabla in db.metadata.sorted_tables:
+        for indice in tabla.indexes:
+            if indice.name == nombre:
+                return indice
+    raise KeyError(f'No existe un índice llamado {nombre} en los modelos')
+
+
+def indices_invalidos(conexion):
+    """Índices que quedaron marcados como inválidos (solo PostgreSQL).
+
+    Ocurre cuando un CREATE INDEX CONCURRENTLY se interrumpe: el índice
+    existe pero el planificador no lo usa.
+    """
+    if not es_postgresql(conexion.engine):
+        return set()
+    filas = conexion.execute(text(
+        'SELECT c.relname FROM pg_index i '
+        'JOIN pg_class c ON c.oid = i.indexrelid '
+        'WHERE NOT i.indisvalid'
+    ))
+    return {fila[0] for fila in filas}
+
+
+def crear_indice(conexion, indice):
+    """Crea un índice de los modelos si no existe.
+
+    En PostgreSQL se construye con CONCURRENTLY para no bloquear las
+    escrituras; la conexión debe estar en modo AUTOCOMMIT.
+    """
+    preparer = conexion.dialect.identifier_preparer
+    nombre = preparer.quote(indice.name)
+    tabla = preparer.format_table(indice.table)
+    columnas = ', '.join(preparer.quote(columna.name) for columna in indice.columns)
+    unico = 'UNIQUE ' if indice.unique else ''
+
+    if es_postgresql(conexion.engine):
+        # Un índice inválido de un intento anterior bloquearía el IF NOT EXISTS
+        if indice.name in indices_invalidos(conexion):
+            conexion.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS {nombre}'))
+        conexion.execute(text(
+            f'CREATE {unico}INDEX CONCURRENTLY IF NOT EXISTS {nombre} ON {tabla} ({columnas})'
+        ))
+    else:
+        conexion.execute(text(
+            f'CREATE {unico}INDEX IF NOT EXISTS {nombre} ON {tabla} ({columnas})'
+        ))
+
+
+@contextmanager
+def sin_limite_de_tiempo(conexion):
+    """Quita DB_STATEMENT_TIMEOUT (ver conexiones.py) mientras dura el bloque.
+
+    Un CREATE INDEX CONCURRENTLY cancelado por el límite deja el índice
+    inválido; en una tabla grande tarda más que cualquier consulta de una
+    petición. La conexión vuelve al pool con su límite original.
+    """
+    if not es_postgresql(conexion.engine):
+        yield conexion
+        return
+    conexion.execute(text('SET statement_timeout = 0'))
+    try:
+        yield conexion
+    finally:
+        conexion.execute(text('RESET statement_timeout'))
+
+
+def crear_indices(conexion, nombres):
+    for nombre in nombres:
+        crear_indice(conexion, obtener_indice(nombre))
+
+
+def verificar_indices(engine=None):
+    """Compara los índices declarados en los modelos con los de la base de datos.
+
+    Devuelve una lista de (tabla, índice, problema) vacía si todo está en orden.
+    """
+    engine = engine or db.engine
+    inspector = inspect(engine)
+    problemas = []
+
+    with engine.connect() as conexion:
+        invalidos = indices_invalidos(conexion)
+
+    for tabla in db.metadata.sorted_tables:
+        if not inspector.has_table(tabla.name):
+            problemas.append((tabla.name, None, 'tabla inexistente'))
+            continue
+        existentes = {indice['name'] for indice in inspector.get_indexes(tabla.name)}
+        for indice in sorted(tabla.indexes, key=lambda i: i.name):
+            if indice.name not in existentes:
+                problemas.append((tabla.name, indice.name, 'falta'))
+            elif indice.name in invalidos:
+                problemas.append((tabla.name, indice.name, 'inválido'))
+    return problemas
+
+
+# Registro de versiones
+def asegurar_tabla_versiones(engine=None):
+    schema_version.create(engine or db.engine, checkfirst=True)
+
+
+def versiones_aplicadas(engine=None):
+    engine = engine or db.engine
+    asegurar_tabla_versiones(engine)
+    with engine.connect() as conexion:
+        return {fila[0] for fila in conexion.execute(select(schema_version.c.version))}
+
+
+def migraciones_pendientes(engine=None):
+    aplicadas = versiones_aplicadas(engine)
+    return [m for m in MIGRACIONES if m.version not in aplicadas]
+
+
+def aplicar_migraciones(hasta=None, engine=None):
+    """Aplica en orden las migraciones pendientes y devuelve las aplicadas"""
+    engine = engine or db.engine
+    aplicadas = []
+
+    for m in migraciones_pendientes(engine):
+        if hasta is not None and m.version > hasta:
+            break
+
+        if m.transaccional:
+            with engine.begin() as conexion:
+                if es_postgresql(engine):
+                    # SET LOCAL: vuelve al valor de la conexión al terminar la transacción
+                    conexion.execute(text('SET LOCAL statement_timeout = 0'))
+                m.funcion(conexion)
+                _registrar_version(conexion, m)
+        else:
+            with engine.connect() as conexion:
+                conexion = conexion.execution_options(isolation_level='AUTOCOMMIT')
+                with sin_limite_de_tiempo(conexion):
+                    m.funcion(conexion)
+            with engine.begin() as conexion:
+                _registrar_version(conexion, m)
+
+        aplicadas.append(m)
+    return aplicadas
+
+
+def _registrar_version(conexion, m):
+    conexion.execute(schema_version.insert().values(
+        version=m.version,
+        nombre=m.nombre,
+        fecha_aplicacion=datetime.utcnow()
+    ))
+
+
+# Migraciones
+@migracion(1, 'Índices compuestos para Nota, Matricula y Materia', transaccional=False)
+def _indices_rutas_frecuentes(conexion):
+    crear_indices(conexion, [
+        'ix_nota_materia_fecha',
+        'ix_nota_alumno_publicada_fecha',
+        'ix_matricula_materia_estado',
+        'ix_materia_docente_id',
+        'ix_alumno_usuario_id',
+        'ix_docente_usuario_id',
+    ])
+
+
+@migracion(2, 'Índice (fecha, id) para la paginación por cursor de notas', transaccional=False)
+def _indice_paginacion_notas(conexion):
+    crear_indices(conexion, ['ix_nota_fecha_id'])
+
+
+@migracion(3, 'Fecha obligatoria en Nota')
+def _fecha_nota_obligatoria(conexion):
+    # La paginación por cursor compara (fecha, id): una nota sin fecha no tiene
+    # posición y el cursor que la apunta no se puede decodificar
+    tabla = table('nota', column('fecha'), column('fecha_publicacion'))
+    conexion.execute(
+        update(tabla).where(tabla.c.fecha.is_(None)).values(
+            fecha=func.coalesce(tabla.c.fecha_publicacion, func.current_timestamp())
+        )
+    )
+    if es_postgresql(conexion):
+        conexion.execute(text('ALTER TABLE nota ALTER COLUMN fecha SET NOT NULL'))
+    # En SQLite cambiar a NOT NULL exige reconstruir la tabla; el modelo ya no
+    # permite guardar notas sin fecha
+
+
+@migracion(4, 'Tabla de tareas programadas')
+def _tabla_tareas_programadas(conexion):
+    from models import TareaProgramada
+
+    TareaProgramada.__table__.create(conexion, checkfirst=True)
+
+
+@migracion(5, 'Tabla de contadores del dashboard')
+def _tabla_contadores(conexion):
+    from contadores import reconstruir_contadores
+    from models import Contador
+
+    Contador.__table__.create(conexion, checkfirst=True)
+    reconstruir_contadores(conexion)
+
+
+@migracion(6, 'Fecha de última modificación en Nota')
+def _fecha_actualizacion_nota(conexion):
+    # Versión de las notas de cada alumno: la caché de boletines la compara antes de servir
+    columnas = {columna['name'] for columna in inspect(conexion).get_columns('nota')}
+    if 'fecha_actualizacion' not in columnas:
+        conexion.execute(text('ALTER TABLE nota ADD COLUMN fecha_actualizacion TIMESTAMP'))
+    tabla = table('nota', column('fecha_actualizacion'), column('fecha_publicacion'), column('fecha'))
+    conexion.execute(
+        update(tabla).where(tabla.c.fecha_actualizacion.is_(None)).values(
+            fecha_actualizacion=func.coalesce(tabla.c.fecha_publicacion, tabla.c.fecha)
+        )
+    )
+
+
+def normalizar_tipos_evaluacion(conexion):
+    """Asigna el tipo por defecto a las notas sin tipo de evaluación; devuelve cuántas cambió"""
+    tabla = Nota.__table__
+    resultado = conexion.execute(
+        update(tabla).where(or_(
+            tabla.c.tipo_evaluacion.is_(None),
+            func.trim(tabla.c.tipo_evaluacion) == '',
+            tabla.c.tipo_evaluacion == 'None'
+        )).values(tipo_evaluacion=TIPO_EVALUACION_POR_DEFECTO)
+    )
+    return resultado.rowcount
+
+
+@migracion(7, 'Tipo de evaluación obligatorio y con valor por defecto en Nota')
+def _tipo_evaluacion_obligatorio(conexion):
+    # Las vistas de notas corregían los tipos vacíos con un commit por fila al mostrarlas
+    normalizar_tipos_evaluacion(conexion)
+    if es_postgresql(conexion):
+        conexion.execute(text(
+            f"ALTER TABLE nota ALTER COLUMN tipo_evaluacion SET DEFAULT '{TIPO_EVALUACION_POR_DEFECTO}', "
+            "ALTER COLUMN tipo_evaluacion SET NOT NULL"
+        ))
+    # En SQLite la tabla ya se crea con NOT NULL y cambiar el DEFAULT exige
+    # reconstruirla; el valor por defecto lo asigna el modelo
+
+
+@migracion(8, 'Índice de búsqueda de alumnos, materias y docentes')
+def _indice_busqueda(conexion):
+    from busqueda import crear_indice_busqueda, reconstruir_indice
+
+    crear_indice_busqueda(conexion)
+    reconstruir_indice(conexion)
+
+
+@migracion(9, 'Índice (fecha_matricula, id) para la lista de matrículas', transaccional=False)
+def _indice_lista_matriculas(conexion):
+    # La lista se envía por partes: sin el índice la consulta ordena todas las
+    # matrículas antes de devolver la primera fila
+    crear_indices(conexion, ['ix_matricula_fecha_id'])
+
+
+# Comandos de línea
+@click.group('migraciones')
+def cli():
+    """Migraciones versionadas del esquema"""
+
+
+@cli.command('estado')
+def comando_estado():
+    """Muestra las migraciones aplicadas y pendientes"""
+    aplicadas = versiones_aplicadas()
+    for m in MIGRACIONES:
+        marca = '✅' if m.version in aplicadas else '⏳'
+        click.echo(f'{marca} {m.version:04d} {m.nombre}')
+
+
+@cli.command('aplicar')
+@click.option('--hasta', type=int, default=None, help='Aplicar solo hasta esta versión')
+def comando_aplicar(hasta):
+    """Aplica las migraciones pendientes"""
+    aplicadas = aplicar_migraciones(hasta=hasta)
+    if not aplicadas:
+        click.echo('✅ No hay migraciones pendientes')
+    for m in aplicadas:
+        click.echo(f'✅ Aplicada {m.version:04d} {m.nombre}')
+
+
+@cli.command('verificar')
+def comando_verificar():
+    """Comprueba que la base de datos tenga todos los índices de los modelos"""
+    problemas = verificar_indices()
+    if not problemas:
+        click.echo('✅ Todos los índices de los modelos existen')
+        return
+    for tabla, indice, problema in problemas:
+        click.echo(f'❌ {tabla}.{indice or "-"}: {problema}')
+    raise SystemExit(1)
+
+
+def init_app(app):
+    app.cli.add_command(cli)
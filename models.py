@@ -0,0 +1,147 @@
+from flask_sqlalchemy import SQLAlchemy
+from datetime import datetime
+
+db = SQLAlchemy()
+
+# Tipo de evaluación asignado a las notas registradas sin uno
+TIPO_EVALUACION_POR_DEFECTO = 'Parcial'
+
+# Valores válidos de Alumno.ciclo
+CICLOS = ('primero', 'segundo', 'tercero', 'cuarto', 'quinto', 'sexto')
+
+# Función auxiliar para convertir números de ciclo a texto
+def convertir_ciclo_a_texto(ciclo):
+    """Convierte números de ciclo a texto y normaliza a minúsculas"""
+    if ciclo is None:
+        return None
+    
+    # Convertir números a texto y normalizar
+    ciclo_map = {
+        '1': 'primero', '2': 'segundo', '3': 'tercero',
+        '4': 'cuarto', '5': 'quinto', '6': 'sexto',
+        'I': 'primero', 'II': 'segundo', 'III': 'tercero',
+        'IV': 'cuarto', 'V': 'quinto', 'VI': 'sexto',
+        'Primero': 'primero', 'Segundo': 'segundo', 'Tercero': 'tercero',
+        'Cuarto': 'cuarto', 'Quinto': 'quinto', 'Sexto': 'sexto',
+        'primero': 'primero', 'segundo': 'segundo', 'tercero': 'tercero',
+        'cuarto': 'cuarto', 'quinto': 'quinto', 'sexto': 'sexto'
+    }
+    
+    return ciclo_map.get(str(ciclo), str(ciclo).lower())
+
+# Modelos de la base de datos
+class Usuario(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    username = db.Column(db.String(80), unique=True, nullable=False)
+    email = db.Column(db.String(120), unique=True, nullable=False)
+    password_hash = db.Column(db.String(120), nullable=False)
+    tipo = db.Column(db.String(20), nullable=False)  # 'admin', 'docente' o 'alumno'
+    fecha_creacion = db.Column(db.DateTime, default=datetime.utcnow)
+
+class Alumno(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    dni = db.Column(db.String(20), unique=True, nullable=False)
+    nombre = db.Column(db.String(100), nullable=False)
+    apellido = db.Column(db.String(100), nullable=False)
+    email = db.Column(db.String(120))
+    telefono = db.Column(db.String(20))
+    fecha_nacimiento = db.Column(db.Date)
+    ciclo = db.Column(db.String(20), nullable=False)  # primero, segundo, tercero, cuarto, quinto, sexto
+    fecha_registro = db.Column(db.DateTime, default=datetime.utcnow)
+    usuario_id = db.Column(db.Integer, db.ForeignKey('usuario.id'), nullable=True)  # Relación con Usuario
+    usuario = db.relationship('Usuario', backref=db.backref('alumno', uselist=False))
+
+    # Índice para resolver el alumno de la sesión (usuario_id) sin recorrer la tabla
+    __table_args__ = (db.Index('ix_alumno_usuario_id', 'usuario_id'),)
+
+class Docente(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    dni = db.Column(db.String(20), unique=True, nullable=False)
+    nombre = db.Column(db.String(100), nullable=False)
+    apellido = db.Column(db.String(100), nullable=False)
+    email = db.Column(db.String(120))
+    telefono = db.Column(db.String(20))
+    direccion = db.Column(db.String(200))
+    fecha_nacimiento = db.Column(db.Date)
+    especialidad = db.Column(db.String(100))
+    fecha_registro = db.Column(db.DateTime, default=datetime.utcnow)
+    usuario_id = db.Column(db.Integer, db.ForeignKey('usuario.id'), nullable=True)  # Relación con Usuario
+    usuario = db.relationship('Usuario', backref=db.backref('docente', uselist=False))
+
+    # Campos para gestión de estado
+    estado = db.Column(db.String(20), default='activo')  # 'activo', 'inactivo', 'suspendido'
+    fecha_ultima_actividad = db.Column(db.DateTime, default=datetime.utcnow)
+    motivo_inactividad = db.Column(db.String(200))  # Razón de inactividad
+    fecha_cambio_estado = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # Índice para resolver el docente de la sesión (usuario_id) sin recorrer la tabla
+    __table_args__ = (db.Index('ix_docente_usuario_id', 'usuario_id'),)
+
+class Materia(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    nombre = db.Column(db.String(100), nullable=False)
+    codigo = db.Column(db.String(20), unique=True, nullable=False)
+    docente_id = db.Column(db.Integer, db.ForeignKey('docente.id'), nullable=False)
+    docente = db.relationship('Docente', backref=db.backref('materias', lazy=True))
+    fecha_creacion = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # Casi todas las vistas del docente filtran por Materia.docente_id
+    __table_args__ = (db.Index('ix_materia_docente_id', 'docente_id'),)
+
+class Matricula(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    alumno_id = db.Column(db.Integer, db.ForeignKey('alumno.id'), nullable=False)
+    materia_id = db.Column(db.Integer, db.ForeignKey('materia.id'), nullable=False)
+    fecha_matricula = db.Column(db.DateTime, default=datetime.utcnow)
+    estado = db.Column(db.String(20), default='activa')  # 'activa', 'completada', 'cancelada'
+    observaciones = db.Column(db.Text)
+
+    # Relaciones
+    alumno = db.relationship('Alumno', backref=db.backref('matriculas', lazy=True))
+    materia = db.relationship('Materia', backref=db.backref('matriculas', lazy=True))
+
+    # Índice único para evitar matrículas duplicadas (también cubre las búsquedas por alumno_id)
+    # e índice compuesto para los alumnos activos de una materia (docente_dashboard, agregar_nota);
+    # (fecha_matricula, id) da el orden de admin_matriculas sin ordenar toda la tabla
+    __table_args__ = (
+        db.UniqueConstraint('alumno_id', 'materia_id', name='unique_matricula'),
+        db.Index('ix_matricula_materia_estado', 'materia_id', 'estado'),
+        db.Index('ix_matricula_fecha_id', 'fecha_matricula', 'id'),
+    )
+
+class Nota(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    alumno_id = db.Column(db.Integer, db.ForeignKey('alumno.id'), nullable=False)
+    materia_id = db.Column(db.Integer, db.ForeignKey('materia.id'), nullable=False)
+    nota = db.Column(db.Float, nullable=False)
+    tipo_evaluacion = db.Column(db.String(50), nullable=False, default=TIPO_EVALUACION_POR_DEFECTO,
+                                server_default=TIPO_EVALUACION_POR_DEFECTO)  # 'parcial', 'final', 'trabajo', etc.
+    fecha = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)  # Sin NULL: cursor (fecha, id) de la paginación
+    observaciones = db.Column(db.Text)
+    publicada = db.Column(db.Boolean, default=False)  # Campo para controlar publicación
+    fecha_publicacion = db.Column(db.DateTime)  # Fecha cuando se publicó la nota
+    fecha_actualizacion = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # Último cambio (versión del boletín)
+
+    alumno = db.relationship('Alumno', backref=db.backref('notas', lazy=True))
+    materia = db.relationship('Materia', backref=db.backref('notas', lazy=True))
+
+    # Índices compuestos para las consultas más frecuentes:
+    # - notas de una materia ordenadas por fecha (docente_ver_notas_materia, contadores por materia)
+    # - notas publicadas de un alumno ordenadas por fecha (alumno_dashboard, alumno_ver_notas)
+    # - paginación por cursor (fecha, id) del listado general (admin_ver_notas)
+    __table_args__ = (
+        db.Index('ix_nota_materia_fecha', 'materia_id', 'fecha'),
+        db.Index('ix_nota_alumno_publicada_fecha', 'alumno_id', 'publicada', 'fecha'),
+        db.Index('ix_nota_fecha_id', 'fecha', 'id'),
+    )
+
+class TareaProgramada(db.Model):
+    """Última ejecución de cada tarea periódica; evita que varios procesos la repitan (ver estado_docentes.py)"""
+    __tablename__ = 'tarea_programada'
+    nombre = db.Column(db.String(100), primary_key=True)
+    ultima_ejecucion = db.Column(db.DateTime)
+
+class Contador(db.Model):
+    """Contadores agregados para el dashboard (se mantienen en contadores.py)"""
+    clave = db.Column(db.String(100), primary_key=True)  # 'usuarios:admin', 'notas:materia:3', ...
+    valor = db.Column(db.Integer, nullable=False, default=0)
@@ -0,0 +1,92 @@
+"""
+Paginación por cursor (keyset)
+
+En lugar de OFFSET, cada página continúa desde la última fila vista
+comparando (fecha, id). Así el costo de cualquier página es el mismo que
+el de la primera y las filas insertadas mientras se navega no desplazan
+los resultados. La columna de orden no puede ser NULL (en Nota.fecha lo
+garantiza la migración 3): una fila sin fecha no tiene posición.
+"""
+
+import base64
+from datetime import datetime
+
+from sqlalchemy import literal, tuple_
+
+
+def codificar_cursor(fecha, id_):
+    """Convierte la posición (fecha, id) en un texto seguro para la URL"""
+    valor = f"{fecha.isoformat() if fecha else ''}|{id_}"
+    return base64.urlsafe_b64encode(valor.encode()).decode().rstrip('=')
+
+
+def decodificar_cursor(cursor):
+    """Devuelve (fecha, id) o None si el cursor está vacío o es inválido"""
+    if not cursor:
+        return None
+    try:
+        relleno = '=' * (-len(cursor) % 4)
+        fecha, id_ = base64.urlsafe_b64decode(cursor + relleno).decode().split('|')
+        return datetime.fromisoformat(fecha), int(id_)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+class PaginaKeyset:
+    """Una página de resultados con los cursores para moverse alrededor"""
+
+    def __init__(self, items, siguiente=None, anterior=None):
+        self.items = items
+        self.siguiente = siguiente
+        self.anterior = anterior
+
+    @property
+    def tiene_siguiente(self):
+        return self.siguiente is not None
+
+    @property
+    def tiene_anterior(self):
+        return self.anterior is not None
+
+
+def _posicion(columna_orden, columna_id, cursor):
+    fecha, id_ = cursor
+    return tuple_(columna_orden, columna_id), tuple_(
+        literal(fecha, columna_orden.type), literal(id_, columna_id.type)
+    )
+
+
+def paginar_keyset(query, columna_orden, columna_id, clave, por_pagina,
+                   despues=None, antes=None):
+    """Obtiene una página ordenada de forma descendente por (columna_orden, columna_id).
+
+    `clave` recibe una fila del query y devuelve su (fecha, id); con eso se
+    arman los cursores. `despues` avanza a filas más antiguas y `antes`
+    retrocede a filas más recientes. El query no debe traer order_by.
+    """
+    cursor_despues = decodificar_cursor(despues)
+    cursor_antes = None if cursor_despues else decodificar_cursor(antes)
+
+    if cursor_antes:
+        # Retroceder: recorrer en orden ascendente y luego invertir
+        columnas, posicion = _posicion(columna_orden, columna_id, cursor_antes)
+        filas = query.filter(columnas > posicion).order_by(
+            columna_orden.asc(), columna_id.asc()
+        ).limit(por_pagina + 1).all()
+        hay_anterior = len(filas) > por_pagina
+        filas = list(reversed(filas[:por_pagina]))
+        hay_siguiente = True
+    else:
+        if cursor_despues:
+            columnas, posicion = _posicion(columna_orden, columna_id, cursor_despues)
+            query = query.filter(columnas < posicion)
+        filas = query.order_by(
+            columna_orden.desc(), columna_id.desc()
+        ).limit(por_pagina + 1).all()
+        hay_siguiente = len(filas) > por_pagina
+        filas = filas[:por_pagina]
+        hay_anterior = cursor_despues is not None
+
+    siguiente = codificar_cursor(*clave(filas[-1])) if filas and hay_siguiente else None
+    anterior = codificar_cursor(*clave(filas[0])) if filas and hay_anterior else None
+    return PaginaKeyset(filas, siguiente=siguiente, anterior=anterior)
@@ -0,0 +1,81 @@
+"""
+Plantillas en modo producción: sin recarga, con caché de bytecode y precompiladas
+
+Por defecto Jinja compila cada plantilla la primera vez que una ruta la
+usa, en cada worker, y en cada render revisa si el archivo cambió. Tras un
+despliegue o un reinicio por max_requests las primeras peticiones de cada
+página pagan la compilación de plantillas de cientos de líneas. Con
+PLANTILLAS_PRODUCCION=1 (por defecto si FLASK_ENV=production):
+
+- auto_reload queda desactivado: no se revisa el archivo en cada render
+- el bytecode compilado se guarda en PLANTILLAS_CACHE_DIR (por defecto
+  instance/jinja_cache), compartido por todos los workers y reinicios
+- precompilar(app) carga todas las plantillas de templates/; wsgi.py lo
+  llama al arrancar, en el proceso maestro si gunicorn usa preload_app,
+  así los workers nacen con todas las plantillas ya compiladas en memoria
+
+    flask plantillas precompilar   # llena la caché de bytecode en el despliegue
+
+Los cambios en las plantillas requieren reiniciar la aplicación; la caché
+de bytecode detecta sola los archivos modificados.
+"""
+
+import os
+import time
+
+import click
+from flask import current_app
+from jinja2 import FileSystemBytecodeCache, TemplateError
+
+
+def precompilar(app):
+    """Compila todas las plantillas en el entorno de Jinja de la aplicación;
+    devuelve (compiladas, errores)"""
+    compiladas = 0
+    errores = []
+    for nombre in app.jinja_env.list_templates(extensions=['html']):
+        try:
+            app.jinja_env.get_template(nombre)
+            compiladas += 1
+        except TemplateError as e:
+            errores.append((nombre, e))
+    return compiladas, errores
+
+
+def precompilar_al_arrancar(app):
+    if not app.config.get('PLANTILLAS_PRODUCCION'):
+        return
+    inicio = time.perf_counter()
+    compiladas, errores = precompilar(app)
+    for nombre, error in errores:
+        print(f"⚠️  Plantilla {nombre} no compila: {error}")
+    print(f"✅ {compiladas} plantillas precompiladas en {(time.perf_counter() - inicio) * 1000:.0f} ms")
+
+
+# Comandos de línea
+@click.group('plantillas')
+def cli():
+    """Plantillas de Jinja"""
+
+
+@cli.command('precompilar')
+def comando_precompilar():
+    """Compila todas las plantillas y guarda su bytecode en la caché"""
+    if current_app.jinja_env.bytecode_cache is None:
+        click.echo('⚠️  PLANTILLAS_PRODUCCION no está activado: el bytecode no se guarda en disco')
+    compiladas, errores = precompilar(current_app)
+    for nombre, error in errores:
+        click.echo(f'❌ {nombre}: {error}')
+    click.echo(f'✅ {compiladas} plantillas compiladas')
+
+
+def init_app(app):
+    app.cli.add_command(cli)
+    if not app.config.get('PLANTILLAS_PRODUCCION'):
+        return
+
+    app.config['TEMPLATES_AUTO_RELOAD'] = False
+    app.jinja_env.auto_reload = False
+    directorio = app.config.get('PLANTILLAS_CACHE_DIR') or os.path.join(app.instance_path, 'jinja_cache')
+    os.makedirs(directorio, exist_ok=True)
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(directorio)
@@ -6,13 +6,12 @@ Ejecuta la aplicación Flask con configuración optimizada
 
 import os
 import sys
-from app import app, db
+from app import app, db, crear_tablas
 
 def create_tables():
-    """Crear tablas de la base de datos si no existen"""
-    with app.app_context():
-        db.create_all()
-        print("✅ Base de datos inicializada correctamente")
+    """Crear tablas de la base de datos si no existen y aplicar las migraciones pendientes"""
+    crear_tablas()
+    print("✅ Base de datos inicializada correctamente")
 
 def create_admin_user():
     """Crear usuario administrador por defecto si no existe"""
@@ -0,0 +1,51 @@
+"""
+Guarda contra escrituras en peticiones GET
+
+Las vistas de notas corregían el tipo de evaluación vacío con un commit
+por fila mientras se listaban. Esa corrección ahora es una migración y
+las rutas GET solo leen. Para que no vuelva a ocurrir, con la guarda
+activa cualquier INSERT/UPDATE/DELETE que se intente dentro de una
+petición GET o HEAD lanza EscrituraEnGET en lugar de llegar a la base.
+
+Se activa con GUARDIA_ESCRITURA_GET=1 (o siempre en modo testing). Que
+las lecturas no escriban es lo que permite más adelante atenderlas con
+conexiones más baratas o de solo lectura.
+"""
+
+from flask import current_app, has_request_context, request
+from sqlalchemy import event
+
+from models import db
+
+METODOS_LECTURA = ('GET', 'HEAD')
+
+
+class EscrituraEnGET(RuntimeError):
+    """Una petición de solo lectura intentó modificar la base de datos"""
+
+
+def _guardia_activa():
+    if not has_request_context() or request.method not in METODOS_LECTURA:
+        return False
+    return current_app.testing or current_app.config.get('GUARDIA_ESCRITURA_GET', False)
+
+
+def _comprobar(descripcion):
+    if _guardia_activa():
+        raise EscrituraEnGET(f'{descripcion} durante {request.method} {request.path} ({request.endpoint})')
+
+
+def _antes_de_flush(session, contexto_flush, instancias):
+    if session.new or session.deleted or any(session.is_modified(obj) for obj in session.dirty):
+        _comprobar('Escritura en la sesión')
+
+
+def _al_ejecutar_orm(estado_orm):
+    if estado_orm.is_insert or estado_orm.is_update or estado_orm.is_delete:
+        _comprobar('INSERT/UPDATE/DELETE')
+    return None
+
+
+def init_app(app):
+    event.listen(db.session, 'before_flush', _antes_de_flush)
+    event.listen(db.session, 'do_orm_execute', _al_ejecutar_orm)
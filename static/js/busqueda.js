@@ -0,0 +1,93 @@
+// Buscador con resultados del servidor (GET /search) - Global
+// Se activa en los <input data-busqueda="alumno,materia,docente">. Cada
+// resultado enlaza a data-url-<tipo>, donde {id} se reemplaza por el id.
+document.addEventListener('DOMContentLoaded', function() {
+    document.querySelectorAll('input[data-busqueda]').forEach(iniciarBusqueda);
+});
+
+const BUSQUEDA_ESPERA_MS = 250;
+const BUSQUEDA_MINIMO = 2;
+const BUSQUEDA_ICONOS = {alumno: 'fa-user-graduate', materia: 'fa-book', docente: 'fa-chalkboard-teacher'};
+
+function iniciarBusqueda(input) {
+    const lista = document.createElement('ul');
+    lista.className = 'busqueda-resultados';
+    lista.hidden = true;
+    input.parentElement.classList.add('busqueda-contenedor');
+    input.insertAdjacentElement('afterend', lista);
+    input.setAttribute('autocomplete', 'off');
+
+    let temporizador = null;
+    let controlador = null;
+
+    input.addEventListener('input', function() {
+        clearTimeout(temporizador);
+        temporizador = setTimeout(buscar, BUSQUEDA_ESPERA_MS);
+    });
+    input.addEventListener('keydown', function(evento) {
+        if (evento.key === 'Escape') {
+            lista.hidden = true;
+        }
+    });
+    document.addEventListener('click', function(evento) {
+        if (!input.parentElement.contains(evento.target)) {
+            lista.hidden = true;
+        }
+    });
+
+    function buscar() {
+        const consulta = input.value.trim();
+        if (consulta.length < BUSQUEDA_MINIMO) {
+            lista.hidden = true;
+            return;
+        }
+        // Solo importa la respuesta de lo último que se escribió
+        if (controlador) {
+            controlador.abort();
+        }
+        controlador = new AbortController();
+
+        const parametros = new URLSearchParams({
+            q: consulta,
+            tipos: input.dataset.busqueda,
+            limite: input.dataset.limite || 8
+        });
+        fetch(`${input.dataset.fuente || '/search'}?${parametros}`, {signal: controlador.signal})
+            .then(respuesta => respuesta.ok ? respuesta.json() : {resultados: []})
+            .then(datos => mostrar(datos.resultados))
+            .catch(error => {
+                if (error.name !== 'AbortError') {
+                    lista.hidden = true;
+                }
+            });
+    }
+
+    function mostrar(resultados) {
+        lista.innerHTML = '';
+        if (!resultados.length) {
+            const vacio = document.createElement('li');
+            vacio.className = 'busqueda-vacio';
+            vacio.textContent = 'Sin resultados';
+            lista.appendChild(vacio);
+        }
+        resultados.forEach(resultado => {
+            const plantilla = input.dataset['url' + resultado.tipo.charAt(0).toUpperCase() + resultado.tipo.slice(1)];
+            const elemento = document.createElement(plantilla ? 'a' : 'span');
+            if (plantilla) {
+                elemento.href = plantilla.replace('{id}', resultado.id);
+            }
+            const icono = document.createElement('i');
+            icono.className = `fas ${BUSQUEDA_ICONOS[resultado.tipo] || 'fa-search'}`;
+            const titulo = document.createElement('strong');
+            titulo.textContent = resultado.titulo;
+            const detalle = document.createElement('small');
+            detalle.textContent = resultado.detalle || '';
+            elemento.append(icono, titulo, detalle);
+
+            const item = document.createElement('li');
+            item.appendChild(elemento);
+            lista.appendChild(item);
+        });
+        lista.hidden = false;
+    }
+}
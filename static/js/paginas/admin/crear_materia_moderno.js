@@ -0,0 +1,22 @@
+// Convertir código a mayúsculas automáticamente
+document.getElementById('codigo').addEventListener('input', function() {
+    this.value = this.value.toUpperCase();
+});
+
+// Validación del formulario
+document.querySelector('form').addEventListener('submit', function(e) {
+    const nombre = document.getElementById('nombre').value.trim();
+    const codigo = document.getElementById('codigo').value.trim();
+    
+    if (!nombre || !codigo) {
+        e.preventDefault();
+        alert('Por favor, completa todos los campos obligatorios.');
+        return;
+    }
+    
+    if (codigo.length < 3) {
+        e.preventDefault();
+        alert('El código debe tener al menos 3 caracteres.');
+        return;
+    }
+});
@@ -0,0 +1,45 @@
+document.addEventListener('DOMContentLoaded', function() {
+    const password = document.getElementById('password');
+    const confirmPassword = document.getElementById('confirm_password');
+    
+    function validatePassword() {
+        if (password.value !== confirmPassword.value) {
+            confirmPassword.setCustomValidity('Las contraseñas no coinciden');
+        } else {
+            confirmPassword.setCustomValidity('');
+        }
+    }
+    
+    password.addEventListener('change', validatePassword);
+    confirmPassword.addEventListener('keyup', validatePassword);
+
+    // Funcionalidad para mostrar/ocultar contraseña
+    const passwordToggle = document.getElementById('passwordToggle');
+    const passwordIcon = document.getElementById('passwordIcon');
+    const confirmPasswordToggle = document.getElementById('confirmPasswordToggle');
+    const confirmPasswordIcon = document.getElementById('confirmPasswordIcon');
+
+    passwordToggle.addEventListener('click', function() {
+        if (password.type === 'password') {
+            password.type = 'text';
+            passwordIcon.classList.remove('fa-eye');
+            passwordIcon.classList.add('fa-eye-slash');
+        } else {
+            password.type = 'password';
+            passwordIcon.classList.remove('fa-eye-slash');
+            passwordIcon.classList.add('fa-eye');
+        }
+    });
+
+    confirmPasswordToggle.addEventListener('click', function() {
+        if (confirmPassword.type === 'password') {
+            confirmPassword.type = 'text';
+            confirmPasswordIcon.classList.remove('fa-eye');
+            confirmPasswordIcon.classList.add('fa-eye-slash');
+        } else {
+            confirmPassword.type = 'password';
+            confirmPasswordIcon.classList.remove('fa-eye-slash');
+            confirmPasswordIcon.classList.add('fa-eye');
+        }
+    });
+});
@@ -0,0 +1,81 @@
+// Validación de contraseñas
+document.getElementById('confirm_password').addEventListener('input', function() {
+    const password = document.getElementById('password').value;
+    const confirmPassword = this.value;
+    
+    if (password !== confirmPassword) {
+        this.setCustomValidity('Las contraseñas no coinciden');
+    } else {
+        this.setCustomValidity('');
+    }
+});
+
+document.getElementById('password').addEventListener('input', function() {
+    const confirmPassword = document.getElementById('confirm_password');
+    if (confirmPassword.value) {
+        confirmPassword.dispatchEvent(new Event('input'));
+    }
+});
+
+// Funcionalidad para mostrar/ocultar contraseña
+const passwordToggle = document.getElementById('passwordToggle');
+const passwordIcon = document.getElementById('passwordIcon');
+const confirmPasswordToggle = document.getElementById('confirmPasswordToggle');
+const confirmPasswordIcon = document.getElementById('confirmPasswordIcon');
+
+passwordToggle.addEventListener('click', function() {
+    const password = document.getElementById('password');
+    if (password.type === 'password') {
+        password.type = 'text';
+        passwordIcon.classList.remove('fa-eye');
+        passwordIcon.classList.add('fa-eye-slash');
+    } else {
+        password.type = 'password';
+        passwordIcon.classList.remove('fa-eye-slash');
+        passwordIcon.classList.add('fa-eye');
+    }
+});
+
+confirmPasswordToggle.addEventListener('click', function() {
+    const confirmPassword = document.getElementById('confirm_password');
+    if (confirmPassword.type === 'password') {
+        confirmPassword.type = 'text';
+        confirmPasswordIcon.classList.remove('fa-eye');
+        confirmPasswordIcon.classList.add('fa-eye-slash');
+    } else {
+        confirmPassword.type = 'password';
+        confirmPasswordIcon.classList.remove('fa-eye-slash');
+        confirmPasswordIcon.classList.add('fa-eye');
+    }
+});
+
+// Funcionalidad dinámica para tipo de usuario
+document.getElementById('tipo').addEventListener('change', function() {
+    const tipo = this.value;
+    const docenteSelector = document.getElementById('docente-selector');
+    const alumnoSelector = document.getElementById('alumno-selector');
+    const docenteSelect = document.getElementById('docente_id');
+    const alumnoSelect = document.getElementById('alumno_id');
+    
+    // Ocultar todos los selectores
+    docenteSelector.style.display = 'none';
+    alumnoSelector.style.display = 'none';
+    
+    // Limpiar selecciones
+    docenteSelect.value = '';
+    alumnoSelect.value = '';
+    
+    // Mostrar el selector correspondiente
+    if (tipo === 'docente') {
+        docenteSelector.style.display = 'block';
+        docenteSelect.required = true;
+        alumnoSelect.required = false;
+    } else if (tipo === 'alumno') {
+        alumnoSelector.style.display = 'block';
+        alumnoSelect.required = true;
+        docenteSelect.required = false;
+    } else {
+        docenteSelect.required = false;
+        alumnoSelect.required = false;
+    }
+});
@@ -0,0 +1,7 @@
+    // Mostrar las columnas del tipo seleccionado
+    document.getElementById('tipo').addEventListener('change', function() {
+        const tipo = this.value;
+        document.querySelectorAll('.columnas-tipo').forEach(function(parrafo) {
+            parrafo.style.display = parrafo.dataset.tipo === tipo ? '' : 'none';
+        });
+    });
@@ -0,0 +1,30 @@
+$(document).ready(function() {
+    // Validación del formulario
+    $('#matriculaForm').on('submit', function(e) {
+        const alumnoId = $('#alumno_id').val();
+        const materiaId = $('#materia_id').val();
+        
+        if (!alumnoId || !materiaId) {
+            e.preventDefault();
+            alert('Por favor, selecciona tanto el alumno como la materia.');
+            return false;
+        }
+        
+        // Cambiar el botón a estado de carga
+        const submitBtn = $('#submitBtn');
+        submitBtn.html('<i class="fas fa-spinner fa-spin"></i> Procesando...');
+        submitBtn.prop('disabled', true);
+    });
+    
+    // Mejorar la experiencia del usuario con los selects
+    $('#alumno_id, #materia_id').on('change', function() {
+        const alumnoId = $('#alumno_id').val();
+        const materiaId = $('#materia_id').val();
+        
+        if (alumnoId && materiaId) {
+            // Aquí podrías agregar una verificación AJAX para ver si ya existe la matrícula
+            // Por ahora, solo mostramos un mensaje informativo
+            console.log('Alumno y materia seleccionados');
+        }
+    });
+});
@@ -0,0 +1,76 @@
+$(document).ready(function() {
+    // Inicializar DataTable
+    $('#dataTable').DataTable({
+        "language": {
+            "url": "//cdn.datatables.net/plug-ins/1.10.24/i18n/Spanish.json"
+        },
+        "pageLength": 25,
+        "order": [[ 3, "desc" ]], // Ordenar por fecha de matrícula
+        "columnDefs": [
+            { "orderable": false, "targets": 6 } // Deshabilitar ordenamiento en columna de acciones
+        ],
+        "dom": '<"top"f>rt<"bottom"lp><"clear">',
+        "initComplete": function() {
+            // Ocultar el search box de DataTable ya que tenemos uno personalizado
+            $('.dataTables_filter').hide();
+        }
+    });
+    
+    // Funcionalidad de búsqueda personalizada
+    $('#searchInput').on('keyup', function() {
+        $('#dataTable').DataTable().search(this.value).draw();
+    });
+    
+    // Animaciones suaves para los botones
+    $('.btn-action').hover(
+        function() {
+            $(this).css('transform', 'translateY(-2px)');
+        },
+        function() {
+            $(this).css('transform', 'translateY(0)');
+        }
+    );
+    
+    // Confirmación mejorada para desmatricular
+    $('form[action*="desmatricular"]').on('submit', function(e) {
+        e.preventDefault();
+        const form = this;
+        const button = $(form).find('button[type="submit"]');
+        const originalText = button.html();
+        
+        // Mostrar confirmación moderna
+        if (confirm('¿Estás seguro de que quieres desmatricular a este alumno? Esta acción eliminará todas sus notas en esta materia.')) {
+            button.html('<i class="fas fa-spinner fa-spin"></i> Procesando...');
+            button.prop('disabled', true);
+            
+            // Enviar formulario
+            setTimeout(() => {
+                form.submit();
+            }, 500);
+        }
+    });
+    
+    // Efectos de hover para las tarjetas de estadísticas
+    $('.stats-card').hover(
+        function() {
+            $(this).css('transform', 'translateY(-5px)');
+        },
+        function() {
+            $(this).css('transform', 'translateY(0)');
+        }
+    );
+    
+    // Animación de entrada para las filas de la tabla
+    $('.table-row-modern').each(function(index) {
+        $(this).css({
+            'opacity': '0',
+            'transform': 'translateY(20px)'
+        });
+        
+        setTimeout(() => {
+            $(this).animate({
+                'opacity': '1'
+            }, 300).css('transform', 'translateY(0)');
+        }, index * 100);
+    });
+});
@@ -0,0 +1,40 @@
+    // Funcionalidad para mostrar/ocultar contraseña
+    document.addEventListener('DOMContentLoaded', function() {
+        // Toggle para nueva contraseña
+        const passwordToggle = document.getElementById('passwordToggle');
+        const passwordInput = document.getElementById('password');
+        const passwordIcon = document.getElementById('passwordIcon');
+
+        if (passwordToggle) {
+            passwordToggle.addEventListener('click', function() {
+                if (passwordInput.type === 'password') {
+                    passwordInput.type = 'text';
+                    passwordIcon.classList.remove('fa-eye');
+                    passwordIcon.classList.add('fa-eye-slash');
+                } else {
+                    passwordInput.type = 'password';
+                    passwordIcon.classList.remove('fa-eye-slash');
+                    passwordIcon.classList.add('fa-eye');
+                }
+            });
+        }
+
+        // Toggle para confirmar contraseña
+        const confirmPasswordToggle = document.getElementById('confirmPasswordToggle');
+        const confirmPasswordInput = document.getElementById('confirm_password');
+        const confirmPasswordIcon = document.getElementById('confirmPasswordIcon');
+
+        if (confirmPasswordToggle) {
+            confirmPasswordToggle.addEventListener('click', function() {
+                if (confirmPasswordInput.type === 'password') {
+                    confirmPasswordInput.type = 'text';
+                    confirmPasswordIcon.classList.remove('fa-eye');
+                    confirmPasswordIcon.classList.add('fa-eye-slash');
+                } else {
+                    confirmPasswordInput.type = 'password';
+                    confirmPasswordIcon.classList.remove('fa-eye-slash');
+                    confirmPasswordIcon.classList.add('fa-eye');
+                }
+            });
+        }
+    });
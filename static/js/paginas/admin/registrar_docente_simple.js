@@ -0,0 +1,28 @@
+// Mostrar/ocultar campo de especialidad personalizada
+document.addEventListener('DOMContentLoaded', function() {
+    const especialidadSelect = document.getElementById('especialidad');
+    const especialidadPersonalizada = document.getElementById('especialidad_personalizada');
+    
+    especialidadSelect.addEventListener('change', function() {
+        if (this.value === 'Otra') {
+            especialidadPersonalizada.style.display = 'block';
+            especialidadPersonalizada.classList.add('show');
+            especialidadPersonalizada.required = true;
+        } else {
+            especialidadPersonalizada.style.display = 'none';
+            especialidadPersonalizada.classList.remove('show');
+            especialidadPersonalizada.required = false;
+            especialidadPersonalizada.value = '';
+        }
+    });
+    
+    
+    // Validación de DNI
+    const dniInput = document.getElementById('dni');
+    dniInput.addEventListener('input', function() {
+        this.value = this.value.replace(/[^0-9]/g, '');
+        if (this.value.length > 8) {
+            this.value = this.value.slice(0, 8);
+        }
+    });
+});
@@ -0,0 +1,35 @@
+// Función de búsqueda
+document.getElementById('searchAlumno').addEventListener('input', function() {
+    const searchTerm = this.value.toLowerCase();
+    const rows = document.querySelectorAll('tbody tr');
+    
+    rows.forEach(row => {
+        const nombre = row.getAttribute('data-nombre') || '';
+        const dni = row.getAttribute('data-dni') || '';
+        const ciclo = row.getAttribute('data-ciclo') || '';
+        
+        if (nombre.includes(searchTerm) || dni.includes(searchTerm) || ciclo.includes(searchTerm)) {
+            row.style.display = '';
+        } else {
+            row.style.display = 'none';
+        }
+    });
+});
+
+// Función para eliminar alumno
+function eliminarAlumno(id, nombre) {
+    let message = `¿Estás seguro de que quieres eliminar al alumno "${nombre}"?\n\n`;
+    message += '⚠️ ADVERTENCIA: Se eliminarán también todas las notas de este alumno.\n\n';
+    message += 'Esta acción no se puede deshacer.';
+    
+    if (confirm(message)) {
+        // Crear un formulario para enviar la petición POST
+        const form = document.createElement('form');
+        form.method = 'POST';
+        form.action = `/admin/eliminar_alumno/${id}`;
+        
+        // Añadir el formulario al DOM y enviarlo
+        document.body.appendChild(form);
+        form.submit();
+    }
+}
@@ -0,0 +1,20 @@
+function marcarInactivo(docenteId, docenteNombre) {
+    document.getElementById('docenteNombre').textContent = docenteNombre;
+    document.getElementById('inactivoForm').action = `/admin/marcar_docente_inactivo/${docenteId}`;
+    document.getElementById('inactivoModal').style.display = 'block';
+}
+
+function cerrarModal() {
+    document.getElementById('inactivoModal').style.display = 'none';
+}
+
+// Cerrar modal al hacer clic en X
+document.querySelector('.close').onclick = cerrarModal;
+
+// Cerrar modal al hacer clic fuera de él
+window.onclick = function(event) {
+    const modal = document.getElementById('inactivoModal');
+    if (event.target == modal) {
+        cerrarModal();
+    }
+}
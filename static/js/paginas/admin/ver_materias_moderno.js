@@ -0,0 +1,35 @@
+// Función de búsqueda
+document.getElementById('searchMateria').addEventListener('input', function() {
+    const searchTerm = this.value.toLowerCase();
+    const rows = document.querySelectorAll('tbody tr');
+    
+    rows.forEach(row => {
+        const nombre = row.getAttribute('data-nombre') || '';
+        const codigo = row.getAttribute('data-codigo') || '';
+        const docente = row.getAttribute('data-docente') || '';
+        
+        if (nombre.includes(searchTerm) || codigo.includes(searchTerm) || docente.includes(searchTerm)) {
+            row.style.display = '';
+        } else {
+            row.style.display = 'none';
+        }
+    });
+});
+
+// Función para eliminar materia
+function eliminarMateria(id, nombre) {
+    let message = `¿Estás seguro de que quieres eliminar la materia "${nombre}"?\n\n`;
+    message += '⚠️ ADVERTENCIA: Se eliminarán también todas las notas asociadas a esta materia.\n\n';
+    message += 'Esta acción no se puede deshacer.';
+    
+    if (confirm(message)) {
+        // Crear un formulario para enviar la petición POST
+        const form = document.createElement('form');
+        form.method = 'POST';
+        form.action = `/admin/eliminar_materia/${id}`;
+        
+        // Añadir el formulario al DOM y enviarlo
+        document.body.appendChild(form);
+        form.submit();
+    }
+}
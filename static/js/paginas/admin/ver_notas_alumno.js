@@ -0,0 +1,66 @@
+// Función para buscar notas
+function buscarNotas() {
+    const searchInput = document.getElementById('searchNota');
+    const searchTerm = searchInput.value.toLowerCase().trim();
+    const notaRows = document.querySelectorAll('.nota-row');
+    
+    let visibleCount = 0;
+    
+    notaRows.forEach(row => {
+        const materia = row.getAttribute('data-materia').toLowerCase();
+        const docente = row.getAttribute('data-docente').toLowerCase();
+        const tipo = row.getAttribute('data-tipo').toLowerCase();
+        const nota = row.getAttribute('data-nota');
+        
+        // Buscar por materia, docente, tipo de evaluación o nota
+        if (searchTerm === '' || 
+            materia.includes(searchTerm) || 
+            docente.includes(searchTerm) ||
+            tipo.includes(searchTerm) || 
+            nota.includes(searchTerm)) {
+            row.style.display = '';
+            visibleCount++;
+        } else {
+            row.style.display = 'none';
+        }
+    });
+    
+    // Mostrar mensaje si no hay resultados
+    mostrarMensajeSinResultados(visibleCount === 0 && searchTerm !== '');
+}
+
+// Función para mostrar mensaje cuando no hay resultados
+function mostrarMensajeSinResultados(mostrar) {
+    let mensajeElement = document.getElementById('sin-resultados');
+    
+    if (mostrar) {
+        if (!mensajeElement) {
+            mensajeElement = document.createElement('div');
+            mensajeElement.id = 'sin-resultados';
+            mensajeElement.className = 'alert alert-warning';
+            mensajeElement.style.marginTop = '20px';
+            mensajeElement.innerHTML = '<i class="fas fa-search"></i> No se encontraron notas con ese criterio de búsqueda.';
+            
+            // Insertar después del buscador
+            const searchContainer = document.querySelector('.search-container');
+            searchContainer.parentNode.insertBefore(mensajeElement, searchContainer.nextSibling);
+        }
+        mensajeElement.style.display = 'block';
+    } else if (mensajeElement) {
+        mensajeElement.style.display = 'none';
+    }
+}
+
+// Event listener para el campo de búsqueda
+document.addEventListener('DOMContentLoaded', function() {
+    const searchNotaInput = document.getElementById('searchNota');
+    if (searchNotaInput) {
+        searchNotaInput.addEventListener('input', buscarNotas);
+        searchNotaInput.addEventListener('keyup', function(e) {
+            if (e.key === 'Escape') {
+                searchNotaInput.value = '';
+                buscarNotas();
+            }
+        });
+    }
+});
@@ -0,0 +1,41 @@
+// Función de búsqueda
+document.getElementById('searchNota').addEventListener('input', function() {
+    const searchTerm = this.value.toLowerCase();
+    const rows = document.querySelectorAll('tbody tr');
+    
+    rows.forEach(row => {
+        const alumno = row.getAttribute('data-alumno') || '';
+        const materia = row.getAttribute('data-materia') || '';
+        const docente = row.getAttribute('data-docente') || '';
+        
+        if (alumno.includes(searchTerm) || materia.includes(searchTerm) || docente.includes(searchTerm)) {
+            row.style.display = '';
+        } else {
+            row.style.display = 'none';
+        }
+    });
+});
+
+// Los filtros se aplican en el servidor: enviar el formulario al cambiar un selector
+['filtroMateria', 'filtroAlumno', 'filtroDocente', 'filtroNota'].forEach(id => {
+    document.getElementById(id).addEventListener('change', function() {
+        document.getElementById('formFiltros').submit();
+    });
+});
+
+// Función para eliminar nota
+function eliminarNota(id, alumno, nota) {
+    let message = `¿Estás seguro de que quieres eliminar la nota ${nota} del alumno "${alumno}"?\n\n`;
+    message += 'Esta acción no se puede deshacer.';
+    
+    if (confirm(message)) {
+        // Crear un formulario para enviar la petición POST
+        const form = document.createElement('form');
+        form.method = 'POST';
+        form.action = `/admin/eliminar_nota/${id}`;
+        
+        // Añadir el formulario al DOM y enviarlo
+        document.body.appendChild(form);
+        form.submit();
+    }
+}
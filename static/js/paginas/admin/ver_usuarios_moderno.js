@@ -0,0 +1,40 @@
+// Función de búsqueda
+document.getElementById('searchUsuario').addEventListener('input', function() {
+    const searchTerm = this.value.toLowerCase();
+    const rows = document.querySelectorAll('tbody tr');
+    
+    rows.forEach(row => {
+        const usuario = row.getAttribute('data-usuario') || '';
+        const email = row.getAttribute('data-email') || '';
+        const tipo = row.getAttribute('data-tipo') || '';
+        
+        if (usuario.includes(searchTerm) || email.includes(searchTerm) || tipo.includes(searchTerm)) {
+            row.style.display = '';
+        } else {
+            row.style.display = 'none';
+        }
+    });
+});
+
+// Función para eliminar usuario (mantenida por compatibilidad)
+function eliminarUsuario(id, username) {
+    console.log('Función eliminarUsuario llamada con ID:', id, 'Username:', username);
+    
+    let message = `¿Estás seguro de que quieres eliminar al usuario "${username}"?\n\n`;
+    message += 'Esta acción no se puede deshacer.';
+    
+    if (confirm(message)) {
+        console.log('Usuario confirmó eliminación, enviando formulario...');
+        
+        // Crear un formulario para enviar la petición POST
+        const form = document.createElement('form');
+        form.method = 'POST';
+        form.action = `/admin/eliminar_usuario/${id}`;
+        
+        // Añadir el formulario al DOM y enviarlo
+        document.body.appendChild(form);
+        form.submit();
+    } else {
+        console.log('Usuario canceló la eliminación');
+    }
+}
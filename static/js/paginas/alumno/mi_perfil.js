@@ -0,0 +1,71 @@
+// Auto-hide flash messages
+document.addEventListener('DOMContentLoaded', function() {
+    const messages = document.querySelectorAll('.flash-message');
+    messages.forEach(function(message) {
+        setTimeout(function() {
+            message.style.animation = 'slideIn 0.3s ease reverse';
+            setTimeout(function() {
+                message.remove();
+            }, 300);
+        }, 5000);
+    });
+});
+
+// Funcionalidad para mostrar/ocultar contraseña
+document.addEventListener('DOMContentLoaded', function() {
+    const passwordToggle = document.getElementById('passwordToggle');
+    const passwordInput = document.getElementById('password');
+    const passwordIcon = document.getElementById('passwordIcon');
+
+    if (passwordToggle) {
+        passwordToggle.addEventListener('click', function() {
+            if (passwordInput.type === 'password') {
+                passwordInput.type = 'text';
+                passwordIcon.classList.remove('fa-eye');
+                passwordIcon.classList.add('fa-eye-slash');
+            } else {
+                passwordInput.type = 'password';
+                passwordIcon.classList.remove('fa-eye-slash');
+                passwordIcon.classList.add('fa-eye');
+            }
+        });
+    }
+
+    // Validación del formulario
+    const form = document.querySelector('form');
+    if (form) {
+        form.addEventListener('submit', function(e) {
+            const email = document.getElementById('email').value.trim();
+            const password = document.getElementById('password').value;
+
+            // Validar email si se proporciona
+            if (email && !isValidEmail(email)) {
+                e.preventDefault();
+                alert('Por favor, ingresa un email válido');
+                document.getElementById('email').focus();
+                return;
+            }
+
+            // Validar contraseña si se proporciona
+            if (password && password.length < 4) {
+                e.preventDefault();
+                alert('La contraseña debe tener al menos 4 caracteres');
+                document.getElementById('password').focus();
+                return;
+            }
+
+            // Mostrar mensaje de confirmación
+            if (confirm('¿Estás seguro de que quieres guardar los cambios?')) {
+                // El formulario se enviará normalmente
+            } else {
+                e.preventDefault();
+            }
+        });
+    }
+
+    // Función para validar email
+    function isValidEmail(email) {
+        const emailRegex = /^[^\s@]+@[^\s@]+\.[^\s@]+$/;
+        return emailRegex.test(email);
+    }
+});
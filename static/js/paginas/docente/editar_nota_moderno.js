@@ -0,0 +1,72 @@
+        // Función para validar formulario
+        function validarFormulario() {
+            const form = document.getElementById('editarNotaForm');
+            const submitBtn = document.getElementById('submitBtn');
+            
+            form.addEventListener('submit', function(e) {
+                const nota = document.getElementById('nota').value;
+                const notaNum = parseFloat(nota);
+                
+                if (notaNum < 0 || notaNum > 20) {
+                    e.preventDefault();
+                    alert('La nota debe estar entre 0 y 20');
+                    return false;
+                }
+                
+                // Cambiar botón a estado de carga
+                submitBtn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Guardando...';
+                submitBtn.disabled = true;
+            });
+        }
+
+        // Función para mostrar preview del estado
+        function mostrarPreviewEstado() {
+            const notaInput = document.getElementById('nota');
+            const infoSection = document.querySelector('.info-section');
+            
+            notaInput.addEventListener('input', function() {
+                const nota = parseFloat(this.value);
+                if (!isNaN(nota)) {
+                    let estado = '';
+                    let clase = '';
+                    
+                    if (nota >= 13) {
+                        estado = 'Aprobada';
+                        clase = 'aprobada';
+                    } else if (nota >= 10) {
+                        estado = 'Recuperación';
+                        clase = 'recuperacion';
+                    } else {
+                        estado = 'Desaprobada';
+                        clase = 'desaprobada';
+                    }
+                    
+                    // Actualizar el badge de estado en tiempo real
+                    const estadoElement = infoSection.querySelector('.nota-badge');
+                    if (estadoElement) {
+                        estadoElement.textContent = estado;
+                        estadoElement.className = `nota-badge ${clase}`;
+                    }
+                }
+            });
+        }
+
+        // Auto-hide flash messages
+        function autoHideFlashMessages() {
+            const flashMessages = document.querySelectorAll('.flash-message');
+            flashMessages.forEach(function(message) {
+                setTimeout(function() {
+                    message.style.animation = 'slideIn 0.3s ease reverse';
+                    setTimeout(function() {
+                        message.remove();
+                    }, 300);
+                }, 5000);
+            });
+        }
+
+        // Inicializar funciones
+        document.addEventListener('DOMContentLoaded', function() {
+            validarFormulario();
+            mostrarPreviewEstado();
+            autoHideFlashMessages();
+        });
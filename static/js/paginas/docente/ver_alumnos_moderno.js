@@ -0,0 +1,19 @@
+        // Función de búsqueda
+        document.getElementById('searchAlumno').addEventListener('input', function() {
+            const searchTerm = this.value.toLowerCase();
+            const alumnoCards = document.querySelectorAll('.alumno-card');
+            
+            alumnoCards.forEach(card => {
+                const nombre = card.dataset.nombre;
+                const apellido = card.dataset.apellido;
+                const dni = card.dataset.dni;
+                const ciclo = card.dataset.ciclo;
+                
+                if (nombre.includes(searchTerm) || apellido.includes(searchTerm) || 
+                    dni.includes(searchTerm) || ciclo.includes(searchTerm)) {
+                    card.style.display = 'block';
+                } else {
+                    card.style.display = 'none';
+                }
+            });
+        });
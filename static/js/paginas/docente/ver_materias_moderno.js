@@ -0,0 +1,16 @@
+        // Función de búsqueda
+        document.getElementById('searchMateria').addEventListener('input', function() {
+            const searchTerm = this.value.toLowerCase();
+            const materiaCards = document.querySelectorAll('.materia-card');
+            
+            materiaCards.forEach(card => {
+                const nombre = card.dataset.nombre;
+                const codigo = card.dataset.codigo;
+                
+                if (nombre.includes(searchTerm) || codigo.includes(searchTerm)) {
+                    card.style.display = 'block';
+                } else {
+                    card.style.display = 'none';
+                }
+            });
+        });
@@ -0,0 +1,42 @@
+        // Función de búsqueda
+        document.getElementById('searchNota').addEventListener('input', function() {
+            const searchTerm = this.value.toLowerCase();
+            const rows = document.querySelectorAll('.nota-row');
+            
+            rows.forEach(row => {
+                const alumno = row.dataset.alumno;
+                const tipo = row.dataset.tipo;
+                const nota = row.dataset.nota;
+                const fecha = row.dataset.fecha;
+                
+                if (alumno.includes(searchTerm) || 
+                    tipo.includes(searchTerm) || 
+                    nota.includes(searchTerm) || 
+                    fecha.includes(searchTerm)) {
+                    row.style.display = '';
+                } else {
+                    row.style.display = 'none';
+                }
+            });
+        });
+
+        // Función para eliminar nota
+        function eliminarNota(notaId, alumnoNombre) {
+            if (confirm(`¿Estás seguro de que quieres eliminar la nota de ${alumnoNombre}?`)) {
+                // Aquí puedes agregar la lógica para eliminar la nota
+                alert('Función de eliminar nota no implementada');
+            }
+        }
+
+        // Auto-hide flash messages
+        document.addEventListener('DOMContentLoaded', function() {
+            const messages = document.querySelectorAll('.flash-message');
+            messages.forEach(function(message) {
+                setTimeout(function() {
+                    message.style.animation = 'slideIn 0.3s ease reverse';
+                    setTimeout(function() {
+                        message.remove();
+                    }, 300);
+                }, 5000);
+            });
+        });
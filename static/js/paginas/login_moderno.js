@@ -0,0 +1,54 @@
+        document.addEventListener('DOMContentLoaded', function() {
+            const loginForm = document.getElementById('loginForm');
+            const loginBtn = document.getElementById('loginBtn');
+            
+            if (loginForm && loginBtn) {
+                loginForm.addEventListener('submit', function(e) {
+                    // Cambiar el botón a estado de carga
+                    loginBtn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Procesando...';
+                    loginBtn.disabled = true;
+                    
+                    // Permitir que el formulario se envíe normalmente
+                    // No prevenir el envío con e.preventDefault()
+                    
+                    // Forzar el envío del formulario después de un pequeño delay
+                    setTimeout(function() {
+                        if (loginForm.checkValidity()) {
+                            loginForm.submit();
+                        } else {
+                            // Si hay errores de validación, restaurar el botón
+                            loginBtn.innerHTML = '<i class="fas fa-sign-in-alt"></i> Iniciar Sesión';
+                            loginBtn.disabled = false;
+                        }
+                    }, 100);
+                });
+            }
+
+            // Auto-hide flash messages after 5 seconds
+            const flashMessages = document.querySelectorAll('.flash-message');
+            flashMessages.forEach(function(message) {
+                setTimeout(function() {
+                    message.style.animation = 'slideIn 0.3s ease reverse';
+                    setTimeout(function() {
+                        message.remove();
+                    }, 300);
+                }, 5000);
+            });
+
+            // Funcionalidad para mostrar/ocultar contraseña
+            const passwordToggle = document.getElementById('passwordToggle');
+            const passwordInput = document.getElementById('password');
+            const passwordIcon = document.getElementById('passwordIcon');
+
+            passwordToggle.addEventListener('click', function() {
+                if (passwordInput.type === 'password') {
+                    passwordInput.type = 'text';
+                    passwordIcon.classList.remove('fa-eye');
+                    passwordIcon.classList.add('fa-eye-slash');
+                } else {
+                    passwordInput.type = 'password';
+                    passwordIcon.classList.remove('fa-eye-slash');
+                    passwordIcon.classList.add('fa-eye');
+                }
+            });
+        });
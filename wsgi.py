@@ -2,6 +2,20 @@
 """
 Archivo WSGI para Koyeb
 Este archivo es el punto de entrada para la aplicación en producción
+
+    gunicorn -c gunicorn.conf.py wsgi:application
+
+Con preload_app (ver gunicorn.conf.py) este módulo se importa una sola vez
+en el proceso maestro y los workers heredan la aplicación ya inicializada.
+Al arrancar crea las tablas que falten, aplica las migraciones pendientes
+(los modelos dependen de ellas) y crea el administrador; si algo falla, el
+proceso termina sin atender peticiones. Si eso se hace aparte (`flask
+init-db` y `flask seed-admin` en la fase de despliegue), INICIALIZAR_BD=0
+evita todo acceso a la base de datos al arrancar. Con CONSTRUIR_ESTATICOS=1
+el maestro genera también los archivos estáticos con huella (`flask
+estaticos construir`) antes de crear los workers, y con
+PLANTILLAS_PRODUCCION=1 compila todas las plantillas para que los workers
+las hereden listas.
 """
 
 import os
@@ -10,22 +24,26 @@ import sys
 def init_app():
     """Inicializar la aplicación de forma segura"""
     print("🚀 Inicializando aplicación...")
-    
+
     try:
-        from app import app, db
-        from error_handler import init_database_safely, create_admin_user_safely
-        
-        # Inicializar base de datos de forma segura
-        if not init_database_safely():
-            print("⚠️  Base de datos no se pudo inicializar completamente")
-        
-        # Crear usuario administrador de forma segura
-        if not create_admin_user_safely():
-            print("⚠️  Usuario administrador no se pudo crear completamente")
-        
+        from app import app, init_db
+
+        # Crear las tablas, aplicar las migraciones y crear el administrador si faltan
+        if os.environ.get('INICIALIZAR_BD', '1') == '1':
+            init_db()
+
+        # CSS/JS con hash en el nombre y variantes comprimidas
+        if os.environ.get('CONSTRUIR_ESTATICOS', '0') == '1':
+            import estaticos
+            estaticos.construir(app)
+
+        # Plantillas compiladas antes del fork (ver plantillas.py)
+        import plantillas
+        plantillas.precompilar_al_arrancar(app)
+
         print("✅ Aplicación inicializada correctamente")
         return app
-        
+
     except Exception as e:
         print(f"❌ Error crítico al inicializar la aplicación: {e}")
         import traceback